@@ -0,0 +1,200 @@
+#> Interpolation order auto-tuner for the coupled Laplace example.
+#>
+#> Times coupled_laplace_equation.py over candidate combinations of the interpolation type of each region, the
+#> interpolation type of the interfaces and the element counts, and picks the fastest candidate whose rms solution error
+#> is within a target. Every region can have its own type so a higher order can be tried in only the regions where it
+#> pays, e.g. next to an interface. The cost of a candidate is the median over the repeats of its setup and solve time
+#> (OpenCMISS assembles the matrices in the solve). The solution of each candidate is exported in the binary format and
+#> compared against a reference at the nodes it shares with the reference mesh:
+#>
+#>   finest   a reference solve on the largest element counts refined --reference-refinement times with the highest
+#>            order of the candidates
+#>   linear   the linear solution of a strip with its x- face fixed to 0 and its x+ face fixed to 1 (a patch test, see
+#>            refinement_study.py)
+#>
+#> Usage: python autotune_interpolation.py --target-error 1e-4 [--elements 2x2x0 4x4x0 8x8x0] [--orders 1 2 3]
+#>                                         [--interface-orders 1 2] [--number-of-regions 2] [--uniform]
+#>                                         [--reference finest|linear] [--repeats 3] [--warmup 1]
+#>                                         [--options "..."] [--output autotune.csv]
+#>
+
+import argparse,itertools,math,shlex,statistics,sys
+
+from bases import LINEAR_LAGRANGE,QUADRATIC_LAGRANGE,CUBIC_LAGRANGE,INTERPOLATION_TYPES,InterpolationNameGet, \
+    NumberOfNodesXiGet,IsSimplex
+from benchmark_sweep import CaseRun,CsvWrite,ElementsParse,ReportSummarise
+from refinement_study import LatticeNodesGet,SolutionRead,CoincidentNodesGet, \
+    LinearSolutionCalculate,ErrorNormsCalculate,CheapestRowGet,ValueFormat
+
+#================================================================================================================================
+#  Candidates
+#================================================================================================================================
+
+# The candidates as (elements,regionInterpolationTypes,interfaceInterpolationType). Without interface orders the
+# interfaces take the lowest order of the regions. Simplex and tensor product types are not mixed.
+def CandidatesGet(arguments):
+    if arguments.uniform:
+        regionTypesList = [(interpolationType,)*arguments.number_of_regions for interpolationType in arguments.orders]
+    else:
+        regionTypesList = list(itertools.product(arguments.orders,repeat=arguments.number_of_regions))
+    candidates = []
+    for elements in arguments.elements:
+        for regionTypes in regionTypesList:
+            if arguments.interface_orders:
+                interfaceTypes = arguments.interface_orders
+            else:
+                interfaceTypes = [min(regionTypes,key=NumberOfNodesXiGet)]
+            for interfaceType in interfaceTypes:
+                if len(set(IsSimplex(interpolationType) \
+                           for interpolationType in regionTypes+(interfaceType,))) == 1:
+                    candidates.append((elements,regionTypes,interfaceType))
+    return candidates
+
+# Options of the example that select the interpolation types of a candidate
+def CandidateOptionsGet(regionTypes,interfaceType,numberOfRegions):
+    return ['--number-of-regions',str(numberOfRegions),'--region-interpolation-types']+ \
+        [str(regionType) for regionType in regionTypes]+['--interface-interpolation-type',str(interfaceType)]
+
+# Options of the example to run a candidate, exporting the solution to compare against the reference
+def CandidateArgumentsGet(regionTypes,interfaceType,arguments):
+    extraArguments = CandidateOptionsGet(regionTypes,interfaceType,arguments.number_of_regions)+ \
+                     ['--export','solution','--export-format','binary','--post-processing']
+    if (arguments.reference == 'linear'):
+        extraArguments += ['--boundary-face','1:x-=0.0','--boundary-face','{0:d}:x+=1.0'.format(arguments.number_of_regions)]
+    return extraArguments+shlex.split(arguments.options)
+
+def CandidateName(elements,regionTypes,interfaceType):
+    return 'x'.join(str(count) for count in elements)+' regions '+','.join(str(regionType) for regionType in regionTypes)+ \
+        ' interface '+str(interfaceType)
+
+#================================================================================================================================
+#  Reference
+#================================================================================================================================
+
+# The reference solve on the largest element counts, refined, with the highest order of the candidates. Returns
+# (elements,interpolationType,solutions).
+def ReferenceRun(arguments):
+    interpolationType = max(arguments.orders,key=NumberOfNodesXiGet)
+    elements = tuple(count*arguments.reference_refinement for count in max(arguments.elements,key=lambda elements: \
+                                                                               [count for count in elements if count > 0]))
+    print('Running reference '+CandidateName(elements,(interpolationType,)*arguments.number_of_regions,interpolationType)+
+          ' ...')
+    report = CaseRun(elements,interpolationType,CandidateArgumentsGet((interpolationType,)*arguments.number_of_regions,
+                                                                       interpolationType,arguments),
+                     shlex.split(arguments.launcher),timeout=arguments.timeout,
+                     outputRead=lambda workingDirectory: SolutionRead(workingDirectory,arguments.number_of_regions))
+    return (elements,interpolationType,report['output'])
+
+# Max and rms error of the solution of a candidate over all the regions against the reference
+def CandidateErrorsCalculate(elements,regionTypes,solutions,reference,arguments):
+    errors = []
+    for regionIdx,(regionType,values) in enumerate(zip(regionTypes,solutions)):
+        latticeNodes = LatticeNodesGet(elements,regionType)
+        if (arguments.reference == 'linear'):
+            errors.append(ErrorNormsCalculate(values,LinearSolutionCalculate(latticeNodes,regionIdx,
+                                                                             arguments.number_of_regions)))
+        else:
+            referenceElements,referenceType,referenceSolutions = reference
+            nodes,referenceNodes = CoincidentNodesGet(latticeNodes,LatticeNodesGet(referenceElements,referenceType))
+            if nodes.shape[0] > 0:
+                errors.append(ErrorNormsCalculate(values[nodes-1],referenceSolutions[regionIdx][referenceNodes-1]))
+    if not errors:
+        return (None,None)
+    return (max(error['max'] for error in errors),math.sqrt(sum(error['rms']**2 for error in errors)/len(errors)))
+
+#================================================================================================================================
+#  Tuning
+#================================================================================================================================
+
+def CandidatesRun(candidates,reference,arguments):
+    launcher = shlex.split(arguments.launcher)
+    solutionRead = lambda workingDirectory: SolutionRead(workingDirectory,arguments.number_of_regions)
+    rows = []
+    for elements,regionTypes,interfaceType in candidates:
+        print('Running '+CandidateName(elements,regionTypes,interfaceType)+' ...')
+        extraArguments = CandidateArgumentsGet(regionTypes,interfaceType,arguments)
+        for warmupIdx in range(arguments.warmup):
+            CaseRun(elements,regionTypes[0],extraArguments,launcher,timeout=arguments.timeout)
+        # The solution is only read from the first repeat
+        repeatRows = []
+        for repeatIdx in range(arguments.repeats):
+            report = CaseRun(elements,regionTypes[0],extraArguments,launcher,timeout=arguments.timeout,
+                             outputRead=solutionRead if repeatIdx == 0 else None)
+            if (repeatIdx == 0):
+                solutions = report['output']
+            repeatRows.append(ReportSummarise(report))
+        solutionErrorMax,solutionErrorRms = CandidateErrorsCalculate(elements,regionTypes,solutions,reference,arguments)
+        interfaceJumps = report['metadata'].get('interfaceJumps') or []
+        row = { 'elements' : 'x'.join(str(count) for count in elements),
+                'regionInterpolationTypes' : ','.join(InterpolationNameGet(regionType) for regionType in regionTypes),
+                'interfaceInterpolationType' : InterpolationNameGet(interfaceType),
+                'arguments' : ' '.join([str(count) for count in elements]+[str(regionTypes[0])]+
+                                       CandidateOptionsGet(regionTypes,interfaceType,arguments.number_of_regions)) }
+        row['numberOfDofs'] = repeatRows[-1]['numberOfDofs']
+        for metric in ['setupTime','solveTime','peakRss']:
+            row[metric] = statistics.median(repeatRow[metric] for repeatRow in repeatRows)
+        row['totalTime'] = row['setupTime']+row['solveTime']
+        row['solutionErrorMax'] = solutionErrorMax
+        row['solutionErrorRms'] = solutionErrorRms
+        row['interfaceJumpMax'] = max(jump['max'] for jump in interfaceJumps if jump['max'] is not None) \
+                                  if any(jump['max'] is not None for jump in interfaceJumps) else None
+        row['withinTarget'] = solutionErrorRms is not None and solutionErrorRms <= arguments.target_error
+        rows.append(row)
+    return rows
+
+def CandidatesPrint(rows):
+    print('{0:<12s} {1:<40s} {2:<20s} {3:>10s} {4:>12s} {5:>12s} {6:>12s} {7:>12s} {8:>7s}'. \
+          format('elements','region interpolation','interface','dofs','setup time','solve time','error rms','jump max',
+                 'target'))
+    for row in sorted(rows,key=lambda row: row['totalTime']):
+        print('{0:<12s} {1:<40s} {2:<20s} {3:>10d} '.format(row['elements'],row['regionInterpolationTypes'],
+                                                             row['interfaceInterpolationType'],int(row['numberOfDofs'] or 0))+
+              ' '.join([ValueFormat(row['setupTime'],'{0:>12.4f}'),ValueFormat(row['solveTime'],'{0:>12.4f}'),
+                        ValueFormat(row['solutionErrorRms']),ValueFormat(row['interfaceJumpMax']),
+                        '{0:>7s}'.format('yes' if row['withinTarget'] else 'no')]))
+
+def ArgumentParserCreate():
+    parser = argparse.ArgumentParser(description='Pick the fastest interpolation orders and element counts of the '
+                                                 'coupled Laplace example within a target error.')
+    parser.add_argument('--target-error',type=float,required=True,help='Target rms solution error.')
+    parser.add_argument('--elements',nargs='+',type=ElementsParse,default=[ElementsParse('2x2x0'),ElementsParse('4x4x0'),
+                                                                           ElementsParse('8x8x0')],
+                        help='Candidate element counts of each region as XxYxZ (Z = 0 for 2D).')
+    parser.add_argument('--orders',nargs='+',type=int,default=[LINEAR_LAGRANGE,QUADRATIC_LAGRANGE,CUBIC_LAGRANGE],
+                        choices=sorted(INTERPOLATION_TYPES),help='Candidate interpolation types of the regions.')
+    parser.add_argument('--interface-orders',nargs='+',type=int,choices=sorted(INTERPOLATION_TYPES),
+                        help='Candidate interpolation types of the interfaces (default the lowest of the regions).')
+    parser.add_argument('--uniform',action='store_true',help='Only try the same interpolation type in every region.')
+    parser.add_argument('--number-of-regions',type=int,default=2,help='Number of regions in the strip.')
+    parser.add_argument('--reference',choices=['finest','linear'],default='finest',
+                        help='Compare against a refined reference solve or the linear solution of fixed x faces.')
+    parser.add_argument('--reference-refinement',type=int,default=2,
+                        help='Refinement of the largest candidate element counts for the reference solve.')
+    parser.add_argument('--repeats',type=int,default=3,help='Number of timed runs of each candidate.')
+    parser.add_argument('--warmup',type=int,default=1,help='Number of discarded warm-up runs of each candidate.')
+    parser.add_argument('--options',default='',help='Extra options passed to the example.')
+    parser.add_argument('--launcher',default='',help='Command used to launch each case, e.g. "mpiexec -n 4".')
+    parser.add_argument('--output',default='autotune.csv',help='CSV file to write the results to.')
+    parser.add_argument('--timeout',type=float,help='Timeout in seconds for each run.')
+    return parser
+
+if __name__ == '__main__':
+    arguments = ArgumentParserCreate().parse_args()
+    if (arguments.repeats < 1):
+        sys.exit('Error: At least one repeat is needed to time the candidates.')
+    reference = ReferenceRun(arguments) if arguments.reference == 'finest' else None
+    rows = CandidatesRun(CandidatesGet(arguments),reference,arguments)
+    CsvWrite(arguments.output,rows)
+    print(' ')
+    CandidatesPrint(rows)
+    print(' ')
+    print('Results written to '+arguments.output)
+    fastestRow = CheapestRowGet(rows,arguments.target_error)
+    if fastestRow is None:
+        print('No candidate is within an rms error of {0:e}'.format(arguments.target_error))
+        sys.exit(1)
+    print('Fastest within an rms error of {0:e}: {1:s} regions {2:s} interface {3:s} ({4:d} DOFs, {5:.4f} s)'. \
+          format(arguments.target_error,fastestRow['elements'],fastestRow['regionInterpolationTypes'],
+                 fastestRow['interfaceInterpolationType'],int(fastestRow['numberOfDofs'] or 0),fastestRow['totalTime']))
+    print('  python coupled_laplace_equation.py '+fastestRow['arguments'])
+    sys.exit(0)
@@ -0,0 +1,113 @@
+#> Interpolation types and bases of the coupled Laplace example.
+#>
+#> Every region, the interface and the interface mapping can use their own interpolation type. The properties of each
+#> type, the number of nodes in each xi direction, the quadrature and whether it is a simplex or has derivatives, are
+#> kept in one table here and BasisCreate creates the basis of a type. OpenCMISS is only imported to create the bases,
+#> so the scripts that run the example, such as the benchmarks, can use the table without it.
+#>
+#> OpenCMISS evaluates the shape functions of a basis at its Gauss points once, when the basis is finished, and every
+#> mesh using the basis shares the tables. BasisRegistry creates each distinct basis once and hands the same basis to
+#> all the regions, interfaces and interface mappings that ask for it, so identical regions do not each build their own.
+#>
+
+import math
+
+LINEAR_LAGRANGE = 1
+QUADRATIC_LAGRANGE = 2
+CUBIC_LAGRANGE = 3
+CUBIC_HERMITE = 4
+LINEAR_SIMPLEX = 5
+QUADRATIC_SIMPLEX = 6
+CUBIC_SIMPLEX = 7
+
+# The name, which is also the name of its basis interpolation specification, the number of nodes in each xi direction
+# and the number of Gauss points in each xi direction (tensor product) or the quadrature order (simplex) of each
+# interpolation type
+INTERPOLATION_TYPES = { LINEAR_LAGRANGE : ('LINEAR_LAGRANGE',2,2),
+                        QUADRATIC_LAGRANGE : ('QUADRATIC_LAGRANGE',3,3),
+                        CUBIC_LAGRANGE : ('CUBIC_LAGRANGE',4,3),
+                        CUBIC_HERMITE : ('CUBIC_HERMITE',2,3),
+                        LINEAR_SIMPLEX : ('LINEAR_SIMPLEX',2,2),
+                        QUADRATIC_SIMPLEX : ('QUADRATIC_SIMPLEX',3,4),
+                        CUBIC_SIMPLEX : ('CUBIC_SIMPLEX',4,5) }
+
+SIMPLEX_INTERPOLATION_TYPES = [LINEAR_SIMPLEX,QUADRATIC_SIMPLEX,CUBIC_SIMPLEX]
+
+def InterpolationNameGet(interpolationType):
+    return INTERPOLATION_TYPES[interpolationType][0]
+
+def NumberOfNodesXiGet(interpolationType):
+    return INTERPOLATION_TYPES[interpolationType][1]
+
+def IsSimplex(interpolationType):
+    return interpolationType in SIMPLEX_INTERPOLATION_TYPES
+
+# Number of elements the generated meshes split each cell of the regular lattice into, numberOfXi! simplices (2
+# triangles or 6 tetrahedra) or the one tensor product element
+def NumberOfCellElementsGet(interpolationType,numberOfXi):
+    if IsSimplex(interpolationType):
+        return math.factorial(numberOfXi)
+    return 1
+
+# Number of derivatives at each node, 2^xi for cubic Hermite and 1 otherwise
+def NumberOfNodeDerivativesGet(interpolationType,numberOfXi):
+    if (interpolationType == CUBIC_HERMITE):
+        return 2**numberOfXi
+    return 1
+
+# Create a basis of an interpolation type with numberOfXi xi directions
+def BasisCreate(userNumber,context,interpolationType,numberOfXi):
+    from opencmiss.opencmiss import OpenCMISS_Python as oc
+    name,numberOfNodesXi,quadrature = INTERPOLATION_TYPES[interpolationType]
+    interpolationSpecification = getattr(oc.BasisInterpolationSpecifications,name)
+    basis = oc.Basis()
+    basis.CreateStart(userNumber,context)
+    basis.NumberOfXiSet(numberOfXi)
+    if IsSimplex(interpolationType):
+        basis.TypeSet(oc.BasisTypes.SIMPLEX)
+        basis.InterpolationXiSet([interpolationSpecification]*numberOfXi)
+        basis.QuadratureOrderSet(quadrature)
+    else:
+        basis.TypeSet(oc.BasisTypes.LAGRANGE_HERMITE_TP)
+        basis.InterpolationXiSet([interpolationSpecification]*numberOfXi)
+        basis.QuadratureNumberOfGaussXiSet([quadrature]*numberOfXi)
+    basis.CreateFinish()
+    return basis
+
+# The specification of the basis of an interpolation type with numberOfXi xi directions. Bases with equal
+# specifications are identical.
+def BasisSpecificationGet(interpolationType,numberOfXi):
+    name,numberOfNodesXi,quadrature = INTERPOLATION_TYPES[interpolationType]
+    return (name,IsSimplex(interpolationType),numberOfXi,quadrature)
+
+class BasisRegistry(object):
+    """The bases of a context, created on first use and shared by everything with the same basis specification. The
+    bases are numbered from firstUserNumber in the order they are created."""
+
+    def __init__(self,context,firstUserNumber=1):
+        self.context = context
+        self.nextUserNumber = firstUserNumber
+        self.bases = {}
+
+    def __len__(self):
+        return len(self.bases)
+
+    # Whether the basis of an interpolation type has been created
+    def Contains(self,interpolationType,numberOfXi):
+        return BasisSpecificationGet(interpolationType,numberOfXi) in self.bases
+
+    # The basis of an interpolation type, created if it does not exist yet
+    def BasisGet(self,interpolationType,numberOfXi):
+        specification = BasisSpecificationGet(interpolationType,numberOfXi)
+        basis = self.bases.get(specification)
+        if basis is None:
+            basis = BasisCreate(self.nextUserNumber,self.context,interpolationType,numberOfXi)
+            self.bases[specification] = basis
+            self.nextUserNumber += 1
+        return basis
+
+    # Destroy all the bases. Only once nothing uses them any more.
+    def Destroy(self):
+        for basis in self.bases.values():
+            basis.Destroy()
+        self.bases = {}
@@ -0,0 +1,143 @@
+#> Strong and weak scaling benchmark for the coupled Laplace example.
+#>
+#> Runs coupled_laplace_equation.py under mpiexec over a list of rank counts, reusing the case runner and the profile
+#> reduction of benchmark_sweep.py. For strong scaling the problem is fixed and the ranks grow. For weak scaling the
+#> strip of regions grows with the ranks, --regions-per-rank regions for every rank (with at least two regions), so
+#> the work per rank stays fixed. The speedup and parallel efficiency of the setup, the solve and their sum are taken
+#> from the medians of the repeats against the smallest rank count and tabulated to a CSV file.
+#>
+#> Usage: python benchmark_scaling.py [--mode strong|weak] [--ranks 1 2 4 8] [--elements 16x16x0]
+#>                                    [--interpolation-type 1] [--number-of-regions 2] [--regions-per-rank 1]
+#>                                    [--placement partitioned|co-located|strip] [--repeats 3] [--warmup 1]
+#>                                    [--mpiexec "mpiexec -n"] [--output scaling.csv]
+#>
+
+import argparse,shlex,statistics,sys
+
+from bases import INTERPOLATION_TYPES,InterpolationNameGet
+from benchmark_sweep import CaseRun,CsvWrite,ElementsParse,ReportSummarise
+
+# Metrics the speedup and efficiency are calculated for
+SCALED_METRICS = ['setupTime','solveTime','totalTime']
+
+#================================================================================================================================
+#  Running cases
+#================================================================================================================================
+
+# Number of regions of the strip for a rank count
+def NumberOfRegionsGet(arguments,numberOfRanks):
+    if arguments.mode == 'weak':
+        return max(2,arguments.regions_per_rank*numberOfRanks)
+    return arguments.number_of_regions
+
+def ScalingRun(arguments):
+    rows = []
+    elementsName = 'x'.join(str(count) for count in arguments.elements)
+    for numberOfRanks in arguments.ranks:
+        numberOfRegions = NumberOfRegionsGet(arguments,numberOfRanks)
+        launcher = shlex.split(arguments.mpiexec)+[str(numberOfRanks)]
+        extraArguments = ['--number-of-regions',str(numberOfRegions),'--placement',arguments.placement]+ \
+                         shlex.split(arguments.options)
+        print('Running '+arguments.mode+' '+elementsName+' '+InterpolationNameGet(arguments.interpolation_type)+
+              ' on {0:d} ranks with {1:d} regions ...'.format(numberOfRanks,numberOfRegions))
+        for warmupIdx in range(arguments.warmup):
+            CaseRun(arguments.elements,arguments.interpolation_type,extraArguments,launcher,timeout=arguments.timeout)
+        for repeatIdx in range(arguments.repeats):
+            report = CaseRun(arguments.elements,arguments.interpolation_type,extraArguments,launcher,
+                             timeout=arguments.timeout)
+            row = { 'mode' : arguments.mode,
+                    'elements' : elementsName,
+                    'interpolationType' : InterpolationNameGet(arguments.interpolation_type),
+                    'placement' : arguments.placement,
+                    'numberOfRegions' : numberOfRegions,
+                    'repeat' : repeatIdx+1 }
+            row.update(ReportSummarise(report))
+            row['numberOfRanks'] = numberOfRanks
+            row['totalTime'] = row['setupTime']+row['solveTime']
+            rows.append(row)
+    return rows
+
+#================================================================================================================================
+#  Speedup and efficiency
+#================================================================================================================================
+
+# Median of each scaled metric over the repeats of each rank count, in order of the rank counts
+def ScalingMedians(rows):
+    values = {}
+    for row in rows:
+        rankValues = values.setdefault(row['numberOfRanks'],{})
+        for metric in SCALED_METRICS+['numberOfDofs','numberOfRegions']:
+            if row.get(metric) is not None:
+                rankValues.setdefault(metric,[]).append(float(row[metric]))
+    return [ (numberOfRanks,{ metric : statistics.median(metricValues) for metric,metricValues in rankValues.items() }) \
+             for numberOfRanks,rankValues in sorted(values.items()) ]
+
+# Speedup and efficiency of each rank count against the smallest. For strong scaling the ideal speedup is the ratio of
+# the rank counts, for weak scaling the ideal time stays constant and the efficiency is the ratio of the times.
+def ScalingCalculate(medians,mode):
+    baseRanks,baseMedians = medians[0]
+    summary = []
+    for numberOfRanks,rankMedians in medians:
+        row = { 'numberOfRanks' : numberOfRanks,
+                'numberOfRegions' : int(rankMedians['numberOfRegions']),
+                'numberOfDofs' : rankMedians.get('numberOfDofs') }
+        for metric in SCALED_METRICS:
+            row[metric] = rankMedians[metric]
+            speedup = baseMedians[metric]/rankMedians[metric] if rankMedians[metric] > 0.0 else None
+            if mode == 'weak' and speedup is not None:
+                speedup *= float(numberOfRanks)/baseRanks
+            row[metric+'Speedup'] = speedup
+            row[metric+'Efficiency'] = speedup*baseRanks/numberOfRanks if speedup is not None else None
+        summary.append(row)
+    return summary
+
+def ScalingPrint(summary):
+    print('{0:>8s} {1:>8s} {2:>12s}'.format('ranks','regions','dofs')+ \
+          ''.join(' {0:>12s} {1:>9s} {2:>9s}'.format(metric,'speedup','eff.') for metric in SCALED_METRICS))
+    for row in summary:
+        line = '{0:>8d} {1:>8d} {2:>12.6g}'.format(row['numberOfRanks'],row['numberOfRegions'],row['numberOfDofs'] or 0)
+        for metric in SCALED_METRICS:
+            if row[metric+'Speedup'] is None:
+                line += ' {0:>12.6g} {1:>9s} {2:>9s}'.format(row[metric],'-','-')
+            else:
+                line += ' {0:>12.6g} {1:>9.3f} {2:>9.3f}'.format(row[metric],row[metric+'Speedup'],
+                                                                  row[metric+'Efficiency'])
+        print(line)
+
+#================================================================================================================================
+#  Scaling study
+#================================================================================================================================
+
+def ArgumentParserCreate():
+    parser = argparse.ArgumentParser(description='Strong and weak scaling of the coupled Laplace example.')
+    parser.add_argument('--mode',choices=['strong','weak'],default='strong',
+                        help='Strong scaling fixes the problem, weak scaling grows the regions with the ranks.')
+    parser.add_argument('--ranks',nargs='+',type=int,default=[1,2,4,8],help='Rank counts to run.')
+    parser.add_argument('--elements',type=ElementsParse,default=ElementsParse('16x16x0'),
+                        help='Element counts of each region as XxYxZ (Z = 0 for 2D).')
+    parser.add_argument('--interpolation-type',type=int,default=1,choices=sorted(INTERPOLATION_TYPES),
+                        help='Interpolation type of the regions.')
+    parser.add_argument('--number-of-regions',type=int,default=2,help='Number of regions for strong scaling.')
+    parser.add_argument('--regions-per-rank',type=int,default=1,help='Number of regions per rank for weak scaling.')
+    parser.add_argument('--placement',choices=['partitioned','co-located','strip'],default='strip',
+                        help='Placement of the subdomains onto the ranks.')
+    parser.add_argument('--options',default='',help='Extra options passed to the example.')
+    parser.add_argument('--repeats',type=int,default=3,help='Number of timed runs of each rank count.')
+    parser.add_argument('--warmup',type=int,default=1,help='Number of discarded warm-up runs of each rank count.')
+    parser.add_argument('--mpiexec',default='mpiexec -n',help='Command used to launch a case, followed by the rank count.')
+    parser.add_argument('--output',default='scaling.csv',help='CSV file to write the results to.')
+    parser.add_argument('--summary',default='scaling_summary.csv',help='CSV file to write the speedups to.')
+    parser.add_argument('--timeout',type=float,help='Timeout in seconds for each run.')
+    return parser
+
+if __name__ == '__main__':
+    arguments = ArgumentParserCreate().parse_args()
+    rows = ScalingRun(arguments)
+    summary = ScalingCalculate(ScalingMedians(rows),arguments.mode)
+    CsvWrite(arguments.output,rows)
+    CsvWrite(arguments.summary,summary)
+    print(' ')
+    ScalingPrint(summary)
+    print(' ')
+    print('Results written to '+arguments.output+' and '+arguments.summary)
+    sys.exit(0)
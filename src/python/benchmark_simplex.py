@@ -0,0 +1,137 @@
+#> Simplex against tensor product Lagrange benchmark for the coupled Laplace example.
+#>
+#> Runs coupled_laplace_equation.py with the Lagrange elements and with the simplex elements of the same order on the
+#> same node lattices, reusing the case runner and the profile reduction of benchmark_sweep.py. The simplex meshes split
+#> each cell into 2 triangles or 6 tetrahedra, so both paths have the same DOFs and differ in the elements and their
+#> quadrature. OpenCMISS assembles the equations within the solve, so the solve time includes the assembly. The setup
+#> and solve times per DOF are taken from the medians of the repeats and the simplex to Lagrange ratios are tabulated
+#> to a CSV file.
+#>
+#> Usage: python benchmark_simplex.py [--elements 8x8x0 16x16x0] [--orders 1 2 3] [--number-of-regions 2]
+#>                                    [--options "..."] [--repeats 3] [--warmup 1] [--output simplex.csv]
+#>
+
+import argparse,shlex,statistics,sys
+
+from bases import LINEAR_LAGRANGE,QUADRATIC_LAGRANGE,CUBIC_LAGRANGE,LINEAR_SIMPLEX,QUADRATIC_SIMPLEX,CUBIC_SIMPLEX, \
+    InterpolationNameGet
+from benchmark_sweep import CaseRun,CsvWrite,ElementsParse,ReportSummarise
+
+# The Lagrange and simplex interpolation types of each order
+ORDER_INTERPOLATION_TYPES = { 1 : (LINEAR_LAGRANGE,LINEAR_SIMPLEX),
+                              2 : (QUADRATIC_LAGRANGE,QUADRATIC_SIMPLEX),
+                              3 : (CUBIC_LAGRANGE,CUBIC_SIMPLEX) }
+
+# Metrics compared per DOF
+COMPARED_METRICS = ['setupTime','solveTime']
+
+#================================================================================================================================
+#  Running cases
+#================================================================================================================================
+
+def SimplexRun(arguments):
+    rows = []
+    extraArguments = ['--number-of-regions',str(arguments.number_of_regions)]+shlex.split(arguments.options)
+    for elements in arguments.elements:
+        elementsName = 'x'.join(str(count) for count in elements)
+        for order in arguments.orders:
+            for interpolationType in ORDER_INTERPOLATION_TYPES[order]:
+                print('Running '+elementsName+' '+InterpolationNameGet(interpolationType)+' ...')
+                for warmupIdx in range(arguments.warmup):
+                    CaseRun(elements,interpolationType,extraArguments,timeout=arguments.timeout)
+                for repeatIdx in range(arguments.repeats):
+                    report = CaseRun(elements,interpolationType,extraArguments,timeout=arguments.timeout)
+                    row = { 'elements' : elementsName,
+                            'order' : order,
+                            'interpolationType' : InterpolationNameGet(interpolationType),
+                            'repeat' : repeatIdx+1 }
+                    row.update(ReportSummarise(report))
+                    for metric in COMPARED_METRICS:
+                        row[metric+'PerDof'] = row[metric]/row['numberOfDofs'] if row['numberOfDofs'] else None
+                    rows.append(row)
+    return rows
+
+#================================================================================================================================
+#  Comparison
+#================================================================================================================================
+
+# Medians of the times per DOF of each case, keyed by (elements,order,interpolationType)
+def SimplexMedians(rows):
+    values = {}
+    for row in rows:
+        caseValues = values.setdefault((row['elements'],row['order'],row['interpolationType']),{})
+        for metric in ['numberOfDofs','peakRss']+[metric+'PerDof' for metric in COMPARED_METRICS]:
+            if row.get(metric) is not None:
+                caseValues.setdefault(metric,[]).append(float(row[metric]))
+    return { key : { metric : statistics.median(metricValues) for metric,metricValues in caseValues.items() } \
+             for key,caseValues in values.items() }
+
+# The Lagrange and simplex medians of each element count and order with the simplex to Lagrange ratios
+def SimplexCompare(medians,arguments):
+    summary = []
+    for elements in arguments.elements:
+        elementsName = 'x'.join(str(count) for count in elements)
+        for order in arguments.orders:
+            lagrangeType,simplexType = ORDER_INTERPOLATION_TYPES[order]
+            lagrangeMedians = medians.get((elementsName,order,InterpolationNameGet(lagrangeType)))
+            simplexMedians = medians.get((elementsName,order,InterpolationNameGet(simplexType)))
+            if lagrangeMedians is None or simplexMedians is None:
+                continue
+            row = { 'elements' : elementsName,
+                    'order' : order,
+                    'numberOfDofs' : lagrangeMedians.get('numberOfDofs'),
+                    'simplexNumberOfDofs' : simplexMedians.get('numberOfDofs') }
+            for metric in [metric+'PerDof' for metric in COMPARED_METRICS]+['peakRss']:
+                lagrangeValue = lagrangeMedians.get(metric)
+                simplexValue = simplexMedians.get(metric)
+                row['lagrange'+metric[0].upper()+metric[1:]] = lagrangeValue
+                row['simplex'+metric[0].upper()+metric[1:]] = simplexValue
+                row[metric+'Ratio'] = simplexValue/lagrangeValue if lagrangeValue and simplexValue is not None else None
+            summary.append(row)
+    return summary
+
+def SimplexPrint(summary):
+    print('{0:>12s} {1:>6s} {2:>10s}'.format('elements','order','dofs')+ \
+          ''.join(' {0:>18s} {1:>18s} {2:>8s}'.format('lagrange '+metric,'simplex '+metric,'ratio') \
+                  for metric in COMPARED_METRICS))
+    for row in summary:
+        line = '{0:>12s} {1:>6d} {2:>10.6g}'.format(row['elements'],row['order'],row['numberOfDofs'] or 0)
+        for metric in COMPARED_METRICS:
+            metric += 'PerDof'
+            lagrangeValue = row['lagrange'+metric[0].upper()+metric[1:]]
+            simplexValue = row['simplex'+metric[0].upper()+metric[1:]]
+            ratio = row[metric+'Ratio']
+            line += ' {0:>18.6g} {1:>18.6g} {2:>8s}'.format(lagrangeValue or 0.0,simplexValue or 0.0,
+                                                            '-' if ratio is None else '{0:.3f}'.format(ratio))
+        print(line)
+
+#================================================================================================================================
+#  Simplex benchmark
+#================================================================================================================================
+
+def ArgumentParserCreate():
+    parser = argparse.ArgumentParser(description='Simplex against Lagrange elements of the coupled Laplace example.')
+    parser.add_argument('--elements',nargs='+',type=ElementsParse,
+                        default=[ElementsParse('8x8x0'),ElementsParse('16x16x0')],help='Element counts of each region as XxYxZ (Z = 0 for 2D).')
+    parser.add_argument('--orders',nargs='+',type=int,default=[1,2,3],choices=sorted(ORDER_INTERPOLATION_TYPES),
+                        help='Orders of the elements to compare.')
+    parser.add_argument('--number-of-regions',type=int,default=2,help='Number of regions of the strip.')
+    parser.add_argument('--options',default='',help='Extra options passed to the example.')
+    parser.add_argument('--repeats',type=int,default=3,help='Number of timed runs of each case.')
+    parser.add_argument('--warmup',type=int,default=1,help='Number of discarded warm-up runs of each case.')
+    parser.add_argument('--output',default='simplex.csv',help='CSV file to write the results to.')
+    parser.add_argument('--summary',default='simplex_summary.csv',help='CSV file to write the ratios to.')
+    parser.add_argument('--timeout',type=float,help='Timeout in seconds for each run.')
+    return parser
+
+if __name__ == '__main__':
+    arguments = ArgumentParserCreate().parse_args()
+    rows = SimplexRun(arguments)
+    summary = SimplexCompare(SimplexMedians(rows),arguments)
+    CsvWrite(arguments.output,rows)
+    CsvWrite(arguments.summary,summary)
+    print(' ')
+    SimplexPrint(summary)
+    print(' ')
+    print('Results written to '+arguments.output+' and '+arguments.summary)
+    sys.exit(0)
@@ -0,0 +1,205 @@
+#> Per-case startup overhead benchmark for the coupled Laplace example.
+#>
+#> Runs the same cases two ways. As a process per case, the way benchmark_sweep.py runs them, every case pays for the
+#> interpreter, the OpenCMISS import and the context creation. As a worker, one process imports coupled_laplace.py,
+#> creates one CoupledLaplaceContext and builds, solves and tears down every case in it one after the other, so those
+#> costs are paid once. For each case the time outside the profiled setup, solve, post-processing and export phases is
+#> the startup overhead of the case. The medians of both ways and the worker's one-off import and context creation
+#> times are tabulated to a CSV file.
+#>
+#> Usage: python benchmark_startup.py [--elements 2x2x0 4x4x0] [--interpolation-types 1] [--number-of-regions 2]
+#>                                    [--cases 20] [--warmup 1] [--output startup.csv]
+#>
+
+import argparse,json,os,shutil,statistics,subprocess,sys,tempfile,time
+
+from bases import INTERPOLATION_TYPES,InterpolationNameGet
+from benchmark_sweep import CaseRun,CsvWrite,ElementsParse,ReportSummarise
+
+# Phases of the profiling report that are startup rather than work of the case
+STARTUP_PHASES = ['Initialise','Teardown']
+
+WORKER_RESULTS_FILENAME = 'StartupWorker.json'
+
+# Metrics compared between the two ways of running the cases
+COMPARED_METRICS = ['caseTime','workTime','overheadTime']
+
+#================================================================================================================================
+#  Worker
+#================================================================================================================================
+
+# The work of a case, the wall time of the phases that are not startup
+def WorkTimeGet(report):
+    return sum(phase['wallTime']['max'] for phase in report['phases'] if phase['name'] not in STARTUP_PHASES)
+
+# Run the cases of a specification one after the other in one context of this process and write the reduced report of
+# every case to the results file. Run as python benchmark_startup.py --worker <specification file>.
+def WorkerRun(specificationFilename):
+    with open(specificationFilename) as specificationFile:
+        specification = json.load(specificationFile)
+    start = time.perf_counter()
+    from coupled_laplace import CoupledLaplaceParameters,CoupledLaplaceContext,CoupledLaplaceProblem
+    from profiling import PhaseProfiler,ReportsReduce
+    importTime = time.perf_counter()-start
+    parameters = CoupledLaplaceParameters(**specification['parameters'])
+    parameters.Resolve()
+    laplaceContext = CoupledLaplaceContext(parameters.PetscOptionsGet(),parameters.diagnostics)
+    reports = []
+    for caseIdx in range(specification['numberOfCases']):
+        start = time.perf_counter()
+        profiler = PhaseProfiler()
+        laplaceProblem = CoupledLaplaceProblem(CoupledLaplaceParameters(**specification['parameters']),laplaceContext,
+                                               profiler)
+        laplaceProblem.Build()
+        laplaceProblem.Solve()
+        if (laplaceProblem.parameters.postProcessing):
+            laplaceProblem.PostProcess()
+        laplaceProblem.Export()
+        laplaceProblem.Teardown()
+        report = ReportsReduce([profiler.RankReportGet()])
+        report['processTime'] = time.perf_counter()-start
+        reports.append(report)
+    laplaceContext.Destroy()
+    with open(WORKER_RESULTS_FILENAME,'w') as resultsFile:
+        json.dump({ 'importTime' : importTime,
+                    'contextCreateTime' : laplaceContext.createTime,
+                    'reports' : reports },resultsFile)
+
+# Run a worker for the cases of one element count and interpolation type in a fresh process in its own scratch directory
+def WorkerCasesRun(elements,interpolationType,numberOfRegions,numberOfCases,timeout=None):
+    workingDirectory = tempfile.mkdtemp(prefix='coupled_laplace_startup_')
+    try:
+        specificationFilename = os.path.join(workingDirectory,'specification.json')
+        with open(specificationFilename,'w') as specificationFile:
+            json.dump({ 'parameters' : { 'numberOfGlobalXElements' : elements[0],
+                                         'numberOfGlobalYElements' : elements[1],
+                                         'numberOfGlobalZElements' : elements[2],
+                                         'interpolationType' : interpolationType,
+                                         'numberOfRegions' : numberOfRegions,
+                                         'exportPolicy' : 'none',
+                                         'setupOutput' : False,
+                                         'diagnostics' : 'quiet' },
+                        'numberOfCases' : numberOfCases },specificationFile)
+        command = [sys.executable,os.path.abspath(__file__),'--worker',specificationFilename]
+        completedProcess = subprocess.run(command,cwd=workingDirectory,stdout=subprocess.PIPE,
+                                          stderr=subprocess.STDOUT,universal_newlines=True,timeout=timeout)
+        if completedProcess.returncode != 0:
+            raise RuntimeError('Worker '+' '.join(command)+' failed with return code '+ \
+                               str(completedProcess.returncode)+':\n'+completedProcess.stdout[-4000:])
+        with open(os.path.join(workingDirectory,WORKER_RESULTS_FILENAME)) as resultsFile:
+            return json.load(resultsFile)
+    finally:
+        shutil.rmtree(workingDirectory,ignore_errors=True)
+
+#================================================================================================================================
+#  Running cases
+#================================================================================================================================
+
+def CaseRowGet(mode,elementsName,interpolationType,caseIdx,report):
+    row = { 'mode' : mode,
+            'elements' : elementsName,
+            'interpolationType' : InterpolationNameGet(interpolationType),
+            'case' : caseIdx+1 }
+    row.update(ReportSummarise(report))
+    row['caseTime'] = report['processTime']
+    row['workTime'] = WorkTimeGet(report)
+    row['overheadTime'] = row['caseTime']-row['workTime']
+    return row
+
+def StartupRun(arguments):
+    rows = []
+    workers = []
+    extraArguments = ['--number-of-regions',str(arguments.number_of_regions),'--export','none','--diagnostics','quiet']
+    for elements in arguments.elements:
+        elementsName = 'x'.join(str(count) for count in elements)
+        for interpolationType in arguments.interpolation_types:
+            print('Running '+elementsName+' '+InterpolationNameGet(interpolationType)+' as a process per case ...')
+            for warmupIdx in range(arguments.warmup):
+                CaseRun(elements,interpolationType,extraArguments,timeout=arguments.timeout)
+            for caseIdx in range(arguments.cases):
+                report = CaseRun(elements,interpolationType,extraArguments,timeout=arguments.timeout)
+                rows.append(CaseRowGet('process',elementsName,interpolationType,caseIdx,report))
+            print('Running '+elementsName+' '+InterpolationNameGet(interpolationType)+' in one worker ...')
+            for warmupIdx in range(arguments.warmup):
+                WorkerCasesRun(elements,interpolationType,arguments.number_of_regions,1,arguments.timeout)
+            workerResults = WorkerCasesRun(elements,interpolationType,arguments.number_of_regions,arguments.cases,
+                                           arguments.timeout)
+            for caseIdx,report in enumerate(workerResults['reports']):
+                rows.append(CaseRowGet('worker',elementsName,interpolationType,caseIdx,report))
+            workers.append({ 'elements' : elementsName,
+                             'interpolationType' : InterpolationNameGet(interpolationType),
+                             'importTime' : workerResults['importTime'],
+                             'contextCreateTime' : workerResults['contextCreateTime'] })
+    return rows,workers
+
+#================================================================================================================================
+#  Comparison
+#================================================================================================================================
+
+# The process per case and worker medians of each case with the worker's one-off costs and the overhead saved per case.
+# The first case of a worker includes its first use of the bases so it is left out of the medians.
+def StartupCompare(rows,workers,numberOfCases):
+    values = {}
+    for row in rows:
+        if row['mode'] == 'worker' and row['case'] == 1 and numberOfCases > 1:
+            continue
+        caseValues = values.setdefault((row['elements'],row['interpolationType']),{})
+        for metric in COMPARED_METRICS:
+            caseValues.setdefault(row['mode'],{}).setdefault(metric,[]).append(row[metric])
+        caseValues['numberOfDofs'] = row['numberOfDofs']
+    summary = []
+    for worker in workers:
+        caseValues = values[(worker['elements'],worker['interpolationType'])]
+        row = dict(worker)
+        row['numberOfDofs'] = caseValues['numberOfDofs']
+        for mode in ['process','worker']:
+            for metric in COMPARED_METRICS:
+                row[mode+metric[0].upper()+metric[1:]] = statistics.median(caseValues[mode][metric])
+        row['overheadSaved'] = row['processOverheadTime']-row['workerOverheadTime']
+        row['caseTimeRatio'] = row['workerCaseTime']/row['processCaseTime'] if row['processCaseTime'] else None
+        summary.append(row)
+    return summary
+
+def StartupPrint(summary):
+    print('{0:>10s} {1:>20s} {2:>8s} {3:>10s} {4:>10s} {5:>14s} {6:>14s} {7:>14s} {8:>14s} {9:>8s}'. \
+          format('elements','interpolation','dofs','import','context','process case','process ovh','worker case',
+                 'worker ovh','ratio'))
+    for row in summary:
+        print('{0:>10s} {1:>20s} {2:>8d} {3:>10.4f} {4:>10.4f} {5:>14.4f} {6:>14.4f} {7:>14.4f} {8:>14.4f} {9:>8s}'. \
+              format(row['elements'],row['interpolationType'],row['numberOfDofs'] or 0,row['importTime'],
+                     row['contextCreateTime'],row['processCaseTime'],row['processOverheadTime'],row['workerCaseTime'],
+                     row['workerOverheadTime'],'-' if row['caseTimeRatio'] is None else '{0:.3f}'.format(row['caseTimeRatio'])))
+
+#================================================================================================================================
+#  Startup benchmark
+#================================================================================================================================
+
+def ArgumentParserCreate():
+    parser = argparse.ArgumentParser(description='Per-case startup overhead of a process per case against one worker.')
+    parser.add_argument('--elements',nargs='+',type=ElementsParse,
+                        default=[ElementsParse('2x2x0'),ElementsParse('4x4x0')],help='Element counts of each region as XxYxZ (Z = 0 for 2D).')
+    parser.add_argument('--interpolation-types',nargs='+',type=int,default=[1],choices=sorted(INTERPOLATION_TYPES),
+                        help='Interpolation types of the cases.')
+    parser.add_argument('--number-of-regions',type=int,default=2,help='Number of regions of the strip.')
+    parser.add_argument('--cases',type=int,default=20,help='Number of timed cases run each way.')
+    parser.add_argument('--warmup',type=int,default=1,help='Number of discarded warm-up processes each way.')
+    parser.add_argument('--output',default='startup.csv',help='CSV file to write the results to.')
+    parser.add_argument('--summary',default='startup_summary.csv',help='CSV file to write the medians to.')
+    parser.add_argument('--timeout',type=float,help='Timeout in seconds for each process.')
+    parser.add_argument('--worker',metavar='SPECIFICATION',help=argparse.SUPPRESS)
+    return parser
+
+if __name__ == '__main__':
+    arguments = ArgumentParserCreate().parse_args()
+    if arguments.worker:
+        WorkerRun(arguments.worker)
+        sys.exit(0)
+    rows,workers = StartupRun(arguments)
+    summary = StartupCompare(rows,workers,arguments.cases)
+    CsvWrite(arguments.output,rows)
+    CsvWrite(arguments.summary,summary)
+    print(' ')
+    StartupPrint(summary)
+    print(' ')
+    print('Results written to '+arguments.output+' and '+arguments.summary)
+    sys.exit(0)
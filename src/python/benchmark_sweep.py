@@ -0,0 +1,255 @@
+#> Parameter sweep benchmark harness for the coupled Laplace example.
+#>
+#> Runs coupled_laplace_equation.py over a grid of element counts and interpolation types. Each run is done in a fresh
+#> process in its own scratch directory, with a number of warm-up runs that are discarded followed by the timed repeats.
+#> The DOFs, startup time, setup time, solve time and peak memory of each run are taken from the profiling report written
+#> by the example and tabulated to a CSV file. The startup, the OpenCMISS import and context creation, and the teardown
+#> of the problem are kept out of the setup time. Given a baseline CSV file from an earlier sweep the medians of each
+#> case are compared and any case that is slower (or uses more memory) than the baseline by more than the threshold is
+#> flagged.
+#>
+#> Variants of the example's options can be swept as well, e.g. to compare the linear solvers as the mesh grows:
+#>
+#>   python benchmark_sweep.py --variant direct="--linear-solver direct" --variant fieldsplit="--linear-solver fieldsplit"
+#>
+#> Usage: python benchmark_sweep.py [--elements 4x4x0 8x8x0 4x4x4] [--interpolation-types 1 2 3 4] [--repeats 3]
+#>                                  [--warmup 1] [--variant name="options"] [--output benchmark.csv]
+#>                                  [--baseline baseline.csv] [--threshold 0.1]
+#>
+
+import argparse,csv,json,os,shlex,shutil,statistics,subprocess,sys,tempfile,time
+
+from bases import INTERPOLATION_TYPES,InterpolationNameGet
+
+DEFAULT_ELEMENTS = ['2x2x0','4x4x0','8x8x0','16x16x0','32x32x0','2x2x2','4x4x4','8x8x8']
+
+EXAMPLE_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)),'coupled_laplace_equation.py')
+PROFILE_FILENAME = 'CoupledLaplaceProfile.json'
+
+# Phases of the profiling report that are not part of the setup. The startup is the import of OpenCMISS and the creation
+# of its context, paid once per process.
+STARTUP_PHASES = ['Initialise']
+SOLVE_PHASES = ['Run Solvers','Run boundary cases']
+EXPORT_PHASES = ['Export geometry','Export solution','Export solution binary']
+POST_PROCESS_PHASES = ['DOF labels','Post-process','Communication report']
+TEARDOWN_PHASES = ['Teardown']
+
+# Metrics compared against the baseline
+COMPARED_METRICS = ['setupTime','solveTime','peakRss']
+
+#================================================================================================================================
+#  Running cases
+#================================================================================================================================
+
+# Parse an element count specification such as 8x8x0
+def ElementsParse(elements):
+    counts = elements.lower().split('x')
+    if len(counts) != 3 or not all(count.isdigit() for count in counts):
+        raise argparse.ArgumentTypeError('Invalid element counts '+elements+'. Expected XxYxZ, e.g. 8x8x0.')
+    return tuple(int(count) for count in counts)
+
+# Parse a variant specification such as fieldsplit="--linear-solver fieldsplit"
+def VariantParse(variant):
+    name,separator,options = variant.partition('=')
+    if not separator or not name:
+        raise argparse.ArgumentTypeError('Invalid variant '+variant+'. Expected name="options".')
+    return (name,shlex.split(options))
+
+# Run one case of the example in a fresh process and return its reduced profiling report. outputRead, if given, is
+# called with the working directory of the case before it is removed and its result is added to the report as 'output'.
+def CaseRun(elements,interpolationType,extraArguments=None,launcher=None,python=sys.executable,timeout=None,
+            outputRead=None):
+    workingDirectory = tempfile.mkdtemp(prefix='coupled_laplace_benchmark_')
+    try:
+        command = list(launcher or [])+[python,EXAMPLE_SCRIPT]+[str(count) for count in elements]+[str(interpolationType)]+ \
+                  list(extraArguments or [])
+        start = time.perf_counter()
+        completedProcess = subprocess.run(command,cwd=workingDirectory,stdout=subprocess.PIPE,
+                                          stderr=subprocess.STDOUT,universal_newlines=True,timeout=timeout)
+        processTime = time.perf_counter()-start
+        if completedProcess.returncode != 0:
+            raise RuntimeError('Case '+' '.join(command)+' failed with return code '+ \
+                               str(completedProcess.returncode)+':\n'+completedProcess.stdout[-4000:])
+        with open(os.path.join(workingDirectory,PROFILE_FILENAME)) as profileFile:
+            report = json.load(profileFile)
+        report['processTime'] = processTime
+        if outputRead is not None:
+            report['output'] = outputRead(workingDirectory)
+        return report
+    finally:
+        shutil.rmtree(workingDirectory,ignore_errors=True)
+
+# Summarise a profiling report into a row of the results table. Times are the maximum over the ranks. With
+# phaseColumns the wall time of each phase is added as a column as well.
+def ReportSummarise(report,phaseColumns=False):
+    startupTime = 0.0
+    setupTime = 0.0
+    solveTime = 0.0
+    exportTime = 0.0
+    postProcessTime = 0.0
+    teardownTime = 0.0
+    for phase in report['phases']:
+        if phase['name'] in STARTUP_PHASES:
+            startupTime += phase['wallTime']['max']
+        elif phase['name'] in SOLVE_PHASES:
+            solveTime += phase['wallTime']['max']
+        elif phase['name'] in EXPORT_PHASES:
+            exportTime += phase['wallTime']['max']
+        elif phase['name'] in POST_PROCESS_PHASES:
+            postProcessTime += phase['wallTime']['max']
+        elif phase['name'] in TEARDOWN_PHASES:
+            teardownTime += phase['wallTime']['max']
+        else:
+            setupTime += phase['wallTime']['max']
+    row = {}
+    row['numberOfDofs'] = report['metadata'].get('numberOfDofs')
+    row['numberOfRanks'] = report['numberOfRanks']
+    row['startupTime'] = startupTime
+    row['setupTime'] = setupTime
+    row['solveTime'] = solveTime
+    row['exportTime'] = exportTime
+    row['postProcessTime'] = postProcessTime
+    row['teardownTime'] = teardownTime
+    row['processTime'] = report['processTime']
+    row['peakRss'] = report['total']['peakRss']['max']
+    row['linearIterations'] = report['metadata'].get('linearIterations')
+    row['couplingIterations'] = report['metadata'].get('couplingIterations')
+    row['textExportBytes'] = report['metadata'].get('textExportBytes')
+    row['binaryExportBytes'] = report['metadata'].get('binaryExportBytes')
+    row['meshCacheHit'] = report['metadata'].get('meshCacheHit')
+    row['solvesPerSecond'] = report['metadata'].get('solvesPerSecond')
+    row['ghostNodes'] = report['metadata'].get('ghostNodes')
+    row['remoteInterfaceCouplings'] = report['metadata'].get('remoteInterfaceCouplings')
+    if phaseColumns:
+        for phase in report['phases']:
+            row['phase:'+phase['name']] = phase['wallTime']['max']
+    return row
+
+#================================================================================================================================
+#  Results tables
+#================================================================================================================================
+
+def CaseKey(row):
+    return (row['case'],row['elements'],row['interpolationType'])
+
+def CsvWrite(filename,rows):
+    fieldNames = []
+    for row in rows:
+        for fieldName in row:
+            if fieldName not in fieldNames:
+                fieldNames.append(fieldName)
+    with open(filename,'w',newline='') as csvFile:
+        writer = csv.DictWriter(csvFile,fieldnames=fieldNames)
+        writer.writeheader()
+        writer.writerows(rows)
+
+def CsvRead(filename):
+    with open(filename,newline='') as csvFile:
+        return list(csv.DictReader(csvFile))
+
+# Median of each metric over the repeats of each case
+def RowsMedians(rows,metrics):
+    values = {}
+    for row in rows:
+        caseValues = values.setdefault(CaseKey(row),{})
+        for metric in metrics:
+            if row.get(metric) not in (None,''):
+                caseValues.setdefault(metric,[]).append(float(row[metric]))
+    return { key : { metric : statistics.median(metricValues) for metric,metricValues in caseValues.items() }
+             for key,caseValues in values.items() }
+
+# Compare the medians of each case against a baseline. Returns a list of regressions.
+def BaselineCompare(rows,baselineRows,threshold,metrics=COMPARED_METRICS):
+    medians = RowsMedians(rows,metrics)
+    baselineMedians = RowsMedians(baselineRows,metrics)
+    regressions = []
+    for key,caseMedians in medians.items():
+        if key not in baselineMedians:
+            continue
+        for metric,value in caseMedians.items():
+            baselineValue = baselineMedians[key].get(metric)
+            if baselineValue is None or baselineValue <= 0.0:
+                continue
+            change = (value-baselineValue)/baselineValue
+            if change > threshold:
+                regressions.append((key,metric,baselineValue,value,change))
+    return regressions
+
+def TablePrint(rows,metrics=['numberOfDofs','setupTime','solveTime','exportTime','peakRss','linearIterations']):
+    medians = RowsMedians(rows,metrics)
+    print('{0:<12s} {1:<10s} {2:<20s}'.format('case','elements','interpolation')+ \
+          ''.join(' {0:>14s}'.format(metric) for metric in metrics))
+    for key,caseMedians in medians.items():
+        print('{0:<12s} {1:<10s} {2:<20s}'.format(*key)+ \
+              ''.join(' {0:>14.6g}'.format(caseMedians[metric]) if metric in caseMedians else ' {0:>14s}'.format('-') \
+                      for metric in metrics))
+
+#================================================================================================================================
+#  Sweep
+#================================================================================================================================
+
+def ArgumentParserCreate(description):
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument('--elements',nargs='+',type=ElementsParse,default=[ElementsParse(elements) for elements in DEFAULT_ELEMENTS],
+                        help='Element counts to sweep as XxYxZ (Z = 0 for 2D).')
+    parser.add_argument('--interpolation-types',nargs='+',type=int,default=sorted(INTERPOLATION_TYPES),
+                        choices=sorted(INTERPOLATION_TYPES),help='Interpolation types to sweep.')
+    parser.add_argument('--repeats',type=int,default=3,help='Number of timed runs of each case.')
+    parser.add_argument('--warmup',type=int,default=1,help='Number of discarded warm-up runs of each case.')
+    parser.add_argument('--variant',action='append',type=VariantParse,dest='variants',
+                        help='A named set of extra example options to sweep, as name="options". May be repeated.')
+    parser.add_argument('--phase-columns',action='store_true',help='Add the wall time of every profiled phase to the results.')
+    parser.add_argument('--output',default='benchmark.csv',help='CSV file to write the results to.')
+    parser.add_argument('--baseline',help='CSV file of an earlier sweep to compare the results against.')
+    parser.add_argument('--threshold',type=float,default=0.1,help='Relative increase over the baseline flagged as a regression.')
+    parser.add_argument('--launcher',default='',help='Command used to launch each case, e.g. "mpiexec -n 4".')
+    parser.add_argument('--timeout',type=float,help='Timeout in seconds for each run.')
+    return parser
+
+def CasesGet(arguments):
+    cases = []
+    variants = arguments.variants or [('default',[])]
+    for elements in arguments.elements:
+        for interpolationType in arguments.interpolation_types:
+            for variantName,extraArguments in variants:
+                cases.append((variantName,elements,interpolationType,extraArguments))
+    return cases
+
+def SweepRun(cases,arguments):
+    rows = []
+    launcher = arguments.launcher.split()
+    for caseName,elements,interpolationType,extraArguments in cases:
+        elementsName = 'x'.join(str(count) for count in elements)
+        print('Running '+caseName+' '+elementsName+' '+InterpolationNameGet(interpolationType)+' ...')
+        for warmupIdx in range(arguments.warmup):
+            CaseRun(elements,interpolationType,extraArguments,launcher,timeout=arguments.timeout)
+        for repeatIdx in range(arguments.repeats):
+            report = CaseRun(elements,interpolationType,extraArguments,launcher,timeout=arguments.timeout)
+            row = { 'case' : caseName,
+                    'elements' : elementsName,
+                    'interpolationType' : InterpolationNameGet(interpolationType),
+                    'repeat' : repeatIdx+1 }
+            row.update(ReportSummarise(report,arguments.phase_columns))
+            rows.append(row)
+    return rows
+
+def SweepReport(rows,arguments):
+    CsvWrite(arguments.output,rows)
+    print(' ')
+    TablePrint(rows)
+    print(' ')
+    print('Results written to '+arguments.output)
+    if arguments.baseline:
+        regressions = BaselineCompare(rows,CsvRead(arguments.baseline),arguments.threshold)
+        for key,metric,baselineValue,value,change in regressions:
+            print('REGRESSION: {0:s} {1:s} {2:s} {3:s} {4:.6g} -> {5:.6g} (+{6:.1f}%)'. \
+                  format(key[0],key[1],key[2],metric,baselineValue,value,100.0*change))
+        if regressions:
+            return 1
+        print('No regressions above {0:.1f}% against {1:s}'.format(100.0*arguments.threshold,arguments.baseline))
+    return 0
+
+if __name__ == '__main__':
+    arguments = ArgumentParserCreate('Sweep the coupled Laplace example over element counts and interpolation types.').parse_args()
+    rows = SweepRun(CasesGet(arguments),arguments)
+    sys.exit(SweepReport(rows,arguments))
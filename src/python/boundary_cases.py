@@ -0,0 +1,156 @@
+#> Batches of boundary value cases for the coupled Laplace example.
+#>
+#> The coupled problem is set up once and the boundary values of each case are then solved against it in turn. A case
+#> only changes the values of the fixed DOFs in the dependent fields, so the matrices are unchanged and with the
+#> factorisation reuse options (petsc_options.FactorisationReuseOptionsGet) the factorisation of the first solve is kept
+#> and every later case costs a forward/back substitution.
+#>
+#> The problem is linear in the boundary values, so a block of cases can also be solved by superposition: one solve with
+#> all the boundary values zero and one with each boundary DOF in turn set to one give the response of every owned DOF
+#> to every boundary DOF, and the solutions of all the cases then follow from a single matrix product. OpenCMISS solves
+#> one right hand side at a time, so this turns k cases into (boundary DOFs + 1) substitutions and one blocked product.
+#> If the problem is homogeneous, with no source and no fixed DOFs other than the boundary DOFs, the solution for zero
+#> boundary values is zero and its solve is skipped. The block only pays off for more cases than it takes solves.
+#>
+#> A batch is a (cases, boundary DOFs) array of values, one row per case. It can be read from a NumPy .npy file or a
+#> whitespace separated text file with a row per case.
+#>
+
+import time
+import numpy
+
+from opencmiss.opencmiss import OpenCMISS_Python as oc
+
+from field_export import DEFAULT_CHUNK_SIZE,FieldRecordsGet
+
+# Read a batch of cases for numberOfBoundaryDofs boundary DOFs. Returns a (cases, boundary DOFs) array.
+def BoundaryCasesRead(filename,numberOfBoundaryDofs):
+    if filename.endswith('.npy'):
+        cases = numpy.load(filename)
+    else:
+        cases = numpy.loadtxt(filename,ndmin=2)
+    cases = numpy.asarray(cases,dtype=numpy.float64)
+    if (cases.ndim == 1):
+        cases = cases.reshape(-1,numberOfBoundaryDofs)
+    if (cases.ndim != 2 or cases.shape[1] != numberOfBoundaryDofs):
+        raise ValueError('Expected a (cases, {0:d}) array of boundary values in {1:s} but found shape {2}.'. \
+                         format(numberOfBoundaryDofs,filename,cases.shape))
+    return cases
+
+# Find which of the boundary DOFs this rank owns. boundaryDofs is a list of (field,decomposition,nodeNumber) of the DOFs
+# fixed in component 1, derivative 1 of the U variable of the fields.
+def BoundaryDofsOwnedGet(boundaryDofs,computationalNodeNumber):
+    return [decomposition.NodeDomainGet(1,nodeNumber) == computationalNodeNumber \
+            for field,decomposition,nodeNumber in boundaryDofs]
+
+# Set the values of the boundary DOFs this rank owns and update the fields onto the ghost DOFs of the other ranks
+def BoundaryValuesSet(boundaryDofs,boundaryDofsOwned,values):
+    fields = []
+    for (field,decomposition,nodeNumber),owned,value in zip(boundaryDofs,boundaryDofsOwned,values):
+        if owned:
+            field.ParameterSetUpdateNodeDP(oc.FieldVariableTypes.U,oc.FieldParameterSetTypes.VALUES,1,1,nodeNumber,1,
+                                           float(value))
+        if not any(field is updatedField for updatedField in fields):
+            fields.append(field)
+    for field in fields:
+        field.ParameterSetUpdateStart(oc.FieldVariableTypes.U,oc.FieldParameterSetTypes.VALUES)
+    for field in fields:
+        field.ParameterSetUpdateFinish(oc.FieldVariableTypes.U,oc.FieldParameterSetTypes.VALUES)
+
+# Solve every case of a batch against the set up problem. resultFields is a list of (name,field,numberOfDerivatives) of
+# fields labelled with field_export.FieldDofLabelsSet whose owned DOFs are gathered after each solve.
+#
+# Returns (solveTimes,results) where results maps each name to (nodes,derivatives,values) of the owned DOFs with values
+# a (cases, owned DOFs) array.
+def BoundaryCasesSolve(problem,boundaryDofs,cases,computationalNodeNumber,resultFields=None,chunkSize=DEFAULT_CHUNK_SIZE):
+    resultFields = resultFields or []
+    boundaryDofsOwned = BoundaryDofsOwnedGet(boundaryDofs,computationalNodeNumber)
+    numberOfCases = cases.shape[0]
+    solveTimes = numpy.empty(numberOfCases)
+    results = {}
+    for caseIdx in range(numberOfCases):
+        BoundaryValuesSet(boundaryDofs,boundaryDofsOwned,cases[caseIdx])
+        start = time.perf_counter()
+        problem.Solve()
+        solveTimes[caseIdx] = time.perf_counter()-start
+        for name,field,numberOfDerivatives in resultFields:
+            records = FieldRecordsGet(field,numberOfDerivatives,chunkSize)
+            if name not in results:
+                results[name] = (records['node'],records['derivative'],
+                                 numpy.empty((numberOfCases,records.shape[0]),dtype=numpy.float64))
+            results[name][2][caseIdx,:] = records['value']
+    return (solveTimes,results)
+
+# Solve a block of cases by superposition. boundaryValues is a (boundary DOFs, cases) array and resultFields is as for
+# BoundaryCasesSolve. homogeneous skips the solve for zero boundary values of a problem whose solution is then zero.
+# With an iterative solver each solution is only as accurate as the solver tolerances.
+#
+# Returns (solveTimes,totalTime,results) where solveTimes are the times of the boundary DOFs (+ 1 unless homogeneous)
+# solves and results maps each name to (nodes,derivatives,values) of the owned DOFs with values an (owned DOFs, cases)
+# array.
+def BoundaryCasesBlockSolve(problem,boundaryDofs,boundaryValues,computationalNodeNumber,resultFields=None,
+                            chunkSize=DEFAULT_CHUNK_SIZE,homogeneous=False):
+    resultFields = resultFields or []
+    boundaryValues = numpy.asarray(boundaryValues,dtype=numpy.float64)
+    numberOfBoundaryDofs = len(boundaryDofs)
+    if (boundaryValues.ndim != 2 or boundaryValues.shape[0] != numberOfBoundaryDofs):
+        raise ValueError('Expected a ({0:d}, cases) array of boundary values but found shape {1}.'. \
+                         format(numberOfBoundaryDofs,boundaryValues.shape))
+    start = time.perf_counter()
+    # Solve for no boundary values, unless the solution is then zero, then for a unit value on each boundary DOF in turn
+    unitCases = numpy.eye(numberOfBoundaryDofs)
+    if not homogeneous:
+        unitCases = numpy.vstack([numpy.zeros((1,numberOfBoundaryDofs)),unitCases])
+    solveTimes,unitResults = BoundaryCasesSolve(problem,boundaryDofs,unitCases,computationalNodeNumber,resultFields,
+                                                chunkSize)
+    results = {}
+    for name,(nodes,derivatives,unitValues) in unitResults.items():
+        if homogeneous:
+            offset = numpy.zeros(unitValues.shape[1])
+            response = unitValues
+        else:
+            offset = unitValues[0,:]
+            response = unitValues[1:,:]-offset
+        results[name] = (nodes,derivatives,offset[:,numpy.newaxis]+numpy.dot(response.T,boundaryValues))
+    totalTime = time.perf_counter()-start
+    return (solveTimes,totalTime,results)
+
+# The method a batch of numberOfCases cases is solved with for boundaryCasesMethod sequential, block or auto. auto only
+# solves a block for more cases than the block takes solves.
+def BoundaryCasesMethodGet(boundaryCasesMethod,numberOfCases,numberOfBoundaryDofs,homogeneous=False):
+    if (boundaryCasesMethod != 'auto'):
+        return boundaryCasesMethod
+    numberOfBlockSolves = numberOfBoundaryDofs if homogeneous else numberOfBoundaryDofs+1
+    return 'block' if numberOfCases > numberOfBlockSolves else 'sequential'
+
+# Summarise the solve times of a batch. The first solve includes the factorisation, the later ones reuse it.
+def SolveTimesSummarise(solveTimes):
+    summary = {}
+    summary['numberOfBoundaryCases'] = int(solveTimes.shape[0])
+    summary['firstSolveTime'] = float(solveTimes[0])
+    if (solveTimes.shape[0] > 1):
+        summary['repeatSolveTime'] = float(numpy.median(solveTimes[1:]))
+        summary['solvesPerSecond'] = float((solveTimes.shape[0]-1)/numpy.sum(solveTimes[1:]))
+    else:
+        summary['repeatSolveTime'] = None
+        summary['solvesPerSecond'] = float(1.0/solveTimes[0])
+    return summary
+
+# Summarise the solve times of a block of numberOfCases cases solved by superposition in totalTime
+def BlockSolveTimesSummarise(solveTimes,numberOfCases,totalTime):
+    summary = SolveTimesSummarise(solveTimes)
+    summary['numberOfBoundaryCases'] = int(numberOfCases)
+    summary['numberOfBasisSolves'] = int(solveTimes.shape[0])
+    summary['solvesPerSecond'] = float(numberOfCases/totalTime)
+    return summary
+
+# Write the cases, solve times and results of this rank to <filename>.part<rank>.npz. Returns the file name.
+def BoundaryCaseResultsWrite(filename,computationalNodeNumber,cases,solveTimes,results):
+    arrays = { 'cases' : cases, 'solveTimes' : solveTimes }
+    for name,(nodes,derivatives,values) in results.items():
+        arrays[name+'Nodes'] = nodes
+        arrays[name+'Derivatives'] = derivatives
+        arrays[name+'Values'] = values
+    partFilename = filename+'.part{0:d}.npz'.format(computationalNodeNumber)
+    numpy.savez(partFilename,**arrays)
+    return partFilename
@@ -0,0 +1,68 @@
+#> Boundary conditions from arrays for the coupled Laplace example.
+#>
+#> Boundary conditions are given as arrays of node numbers, components and values. The nodes are filtered down to the
+#> nodes this rank owns with one ownership lookup for the whole array, either from a field_arrays.FieldDofMap that has
+#> already been built or from the decomposition for the distinct nodes only. The owned conditions are then applied from
+#> a single tight loop. OpenCMISS only has a per-node setter, so that loop is the one remaining per-node call.
+#>
+#> Node sets of the faces of the regular generated meshes are selected by name: x-, x+, y-, y+, z- and z+.
+#>
+
+import argparse
+import numpy
+
+from opencmiss.opencmiss import OpenCMISS_Python as oc
+
+LATTICE_FACES = ['x-','x+','y-','y+','z-','z+']
+
+# Parse a boundary face specification such as 1:x-=0.0 (region 1, the x = 0 face, fixed to 0.0)
+def BoundaryFaceParse(boundaryFace):
+    location,separator,value = boundaryFace.partition('=')
+    regionNumber,regionSeparator,face = location.partition(':')
+    try:
+        if not separator or not regionSeparator or face not in LATTICE_FACES:
+            raise ValueError(boundaryFace)
+        return (int(regionNumber),face,float(value))
+    except ValueError:
+        raise argparse.ArgumentTypeError('Invalid boundary face '+boundaryFace+'. Expected REGION:FACE=VALUE with FACE '
+                                         'one of '+', '.join(LATTICE_FACES)+', e.g. 1:x-=0.0.')
+
+# Node numbers of a face of a regular generated lattice with numberOfGlobalNodes nodes in each direction (x fastest).
+# The face nodes are ordered with the lower of the remaining directions fastest, e.g., y then z for an x face. With a
+# step only every step-th node in each direction of the face is taken, e.g. the element vertices with a step of the
+# number of nodes in each xi direction - 1.
+def LatticeFaceNodesGet(numberOfGlobalNodes,face,step=1):
+    numberOfDimensions = len(numberOfGlobalNodes)
+    axis = 'xyz'.index(face[0])
+    if (axis >= numberOfDimensions):
+        raise ValueError('A {0:d}D lattice has no {1:s} face.'.format(numberOfDimensions,face))
+    nodes = numpy.arange(1,int(numpy.prod(numberOfGlobalNodes))+1,dtype=numpy.int64).reshape(numberOfGlobalNodes[::-1])
+    nodeIdx = 0 if face[1] == '-' else numberOfGlobalNodes[axis]-1
+    faceNodes = numpy.take(nodes,nodeIdx,axis=numberOfDimensions-1-axis)
+    return faceNodes[(slice(None,None,step),)*faceNodes.ndim].ravel()
+
+# Mask of the nodes this rank owns. With a FieldDofMap the ownership is looked up for the whole array at once, otherwise
+# the decomposition is asked once for each distinct node.
+def NodesOwnedGet(nodes,computationalNodeNumber=None,decomposition=None,dofMap=None):
+    if dofMap is not None:
+        return dofMap.LocalDofsGet(nodes) >= 0
+    distinctNodes,inverse = numpy.unique(nodes,return_inverse=True)
+    nodeDomainGet = decomposition.NodeDomainGet
+    distinctOwned = numpy.array([nodeDomainGet(1,nodeNumber) == computationalNodeNumber \
+                                 for nodeNumber in distinctNodes.tolist()],dtype=bool)
+    return distinctOwned[inverse]
+
+# Set boundary conditions on a variable of a field (U by default, DELUDELN for fluxes) at arrays of nodes. components
+# and values are broadcast against nodes. Conditions on nodes this rank does not own are dropped. Returns the number of
+# conditions set on this rank.
+def BoundaryNodesSet(boundaryConditions,field,nodes,values,components=1,derivative=1,
+                     conditionType=oc.BoundaryConditionsTypes.FIXED,computationalNodeNumber=None,decomposition=None,
+                     dofMap=None,variableType=oc.FieldVariableTypes.U):
+    nodes,components,values = numpy.broadcast_arrays(numpy.asarray(nodes,dtype=numpy.int64),
+                                                     numpy.asarray(components,dtype=numpy.int64),
+                                                     numpy.asarray(values,dtype=numpy.float64))
+    owned = NodesOwnedGet(nodes,computationalNodeNumber,decomposition,dofMap)
+    setNode = boundaryConditions.SetNode
+    for nodeNumber,componentNumber,value in zip(nodes[owned].tolist(),components[owned].tolist(),values[owned].tolist()):
+        setNode(field,variableType,1,derivative,nodeNumber,componentNumber,conditionType,value)
+    return int(numpy.count_nonzero(owned))
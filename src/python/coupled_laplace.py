@@ -0,0 +1,1853 @@
+#> The coupled Laplace problem as a library.
+#>
+#> Solves Laplace equations in a strip of regions where each neighbouring pair of regions is coupled through an
+#> interface. CoupledLaplaceParameters holds the parameters of a problem, CoupledLaplaceContext the OpenCMISS context
+#> the problems are built in and CoupledLaplaceProblem builds, solves, post-processes, exports and tears down one
+#> problem. A context is created once and reused by any number of problems one after the other, so a long-lived worker
+#> only pays for the interpreter, the OpenCMISS import and the context creation once:
+#>
+#>   context = CoupledLaplaceContext(parameters.PetscOptionsGet())
+#>   for parameters in cases:
+#>       problem = CoupledLaplaceProblem(parameters,context)
+#>       problem.Build()
+#>       problem.Solve()
+#>       results = problem.PostProcess()
+#>       problem.Teardown()
+#>   context.Destroy()
+#>
+#> coupled_laplace_equation.py is the command line interface to it.
+#>
+
+import contextlib,os,time,uuid
+import numpy
+
+from opencmiss.opencmiss import OpenCMISS_Python as oc
+
+from profiling import PhaseProfiler,WorldCommunicatorGet
+from petsc_options import PetscOptionsSet,PetscOptionsRestore,ResidualHistoryOptionsGet,ResidualHistoryRead, \
+    FieldSplitOptionsGet,FactorisationReuseOptionsGet,SolverViewOptionsGet
+from bases import LINEAR_LAGRANGE,CUBIC_HERMITE,BasisRegistry,InterpolationNameGet,NumberOfNodesXiGet, \
+    NumberOfNodeDerivativesGet,NumberOfCellElementsGet,IsSimplex
+from interface_connectivity import GeneratedInterfaceConnectivityCalculate,InterfaceMeshConnectivitySet
+from interface_detection import GeneratedMeshArraysCalculate,GeneratedSimplexMeshArraysGet,InterfaceConnectivityDetect
+from mesh_cache import MeshCache,CacheKeyCalculate
+from partitioned_coupling import DirichletNeumannInterface,DirichletNeumannSolve,CouplingRecordPrint
+from placement import StripElementDomainsCalculate,ColocatedElementDomainsGet,DecompositionElementDomainsGet, \
+    DecompositionNodeDomainsGet,CommunicationVolumeCalculate
+from field_export import FieldDofLabelsSet,FieldBinaryExport,TextExportSizeGet
+from field_arrays import FieldParameterSetView,FieldDofMap,ValuesNormsCalculate,InterfaceWeightsCalculate, \
+    TriangleWeightsCalculate,InterfaceFluxCalculate,InterfaceJumpCalculate
+from boundary_conditions import LatticeFaceNodesGet,BoundaryNodesSet
+from boundary_cases import BoundaryCasesRead,BoundaryCasesSolve,BoundaryCasesBlockSolve,BoundaryCasesMethodGet, \
+    SolveTimesSummarise,BlockSolveTimesSummarise,BoundaryCaseResultsWrite
+from telemetry import TelemetryDestinationParse,TelemetrySink,SolveTelemetry,MeshNonzerosCalculate, \
+    CouplingNonzerosCalculate
+
+LINEAR_PRECONDITIONER_TYPES = ['none','jacobi','block-jacobi','sor','incomplete-lu','additive-schwarz']
+
+# The arrays of the connectivity of each interface that are kept in the mesh cache
+MESH_CACHE_CONNECTIVITY_NAMES = ['ElementNumbers','Mesh1ElementNumbers','Mesh1Xi','Mesh2ElementNumbers','Mesh2Xi']
+
+# The diagnostic output of each diagnostics profile: the progress messages of the example, the OpenCMISS output file,
+# and the output of the decomposer, the equations sets and their equations, the interface conditions and their
+# equations and the solvers. Anything a profile leaves off is not set up at all.
+DIAGNOSTICS_PROFILES = { 'quiet' : { 'progress' : False,
+                                     'outputFile' : False,
+                                     'decomposerOutputType' : None,
+                                     'equationsSetOutputType' : None,
+                                     'equationsOutputType' : None,
+                                     'interfaceConditionOutputType' : None,
+                                     'interfaceEquationsOutputType' : None,
+                                     'solverOutputType' : None },
+                         'progress' : { 'progress' : True,
+                                        'outputFile' : False,
+                                        'decomposerOutputType' : None,
+                                        'equationsSetOutputType' : oc.EquationsSetOutputTypes.PROGRESS,
+                                        'equationsOutputType' : None,
+                                        'interfaceConditionOutputType' : oc.InterfaceConditionOutputTypes.PROGRESS,
+                                        'interfaceEquationsOutputType' : None,
+                                        'solverOutputType' : oc.SolverOutputTypes.PROGRESS },
+                         'debug' : { 'progress' : True,
+                                     'outputFile' : True,
+                                     'decomposerOutputType' : oc.DecomposerOutputTypes.ALL,
+                                     'equationsSetOutputType' : oc.EquationsSetOutputTypes.PROGRESS,
+                                     'equationsOutputType' : oc.EquationsOutputTypes.TIMING,
+                                     'interfaceConditionOutputType' : oc.InterfaceConditionOutputTypes.PROGRESS,
+                                     'interfaceEquationsOutputType' : oc.EquationsOutputTypes.TIMING,
+                                     'solverOutputType' : oc.SolverOutputTypes.MONITOR },
+                         'matrix-dump' : { 'progress' : True,
+                                           'outputFile' : True,
+                                           'decomposerOutputType' : oc.DecomposerOutputTypes.ALL,
+                                           'equationsSetOutputType' : oc.EquationsSetOutputTypes.MATRIX,
+                                           'equationsOutputType' : oc.EquationsOutputTypes.MATRIX,
+                                           'interfaceConditionOutputType' : oc.InterfaceConditionOutputTypes.MATRIX,
+                                           'interfaceEquationsOutputType' : oc.EquationsOutputTypes.MATRIX,
+                                           'solverOutputType' : oc.SolverOutputTypes.MATRIX } }
+
+# The OpenCMISS output file of the debug and matrix-dump profiles
+DIAGNOSTICS_OUTPUT_FILENAME = "Testing"
+
+contextUserNumber = 1
+
+# The coordinate systems, regions, generated meshes, meshes and decompositions of region i are numbered i and those
+# of interface i are numbered numberOfRegions+i. The interfaces are numbered i. The bases are shared between
+# everything with the same interpolation and numbered from 1 in the order they are first used. The following are
+# numbered within each region or interface.
+geometricFieldUserNumber = 1
+equationsSetUserNumber = 1
+equationsSetFieldUserNumber = 4
+dependentFieldUserNumber = 5
+
+interfaceGeometricFieldUserNumber = 1
+interfaceConditionUserNumber = 2
+lagrangeFieldUserNumber = 2
+
+decomposerUserNumber = 1
+regionDecomposerUserNumber = 2
+
+problemUserNumber = 1
+
+#================================================================================================================================
+#  Parameters
+#================================================================================================================================
+
+class CoupledLaplaceParameters(object):
+    """The parameters of a coupled Laplace problem, with the defaults of the example. Any of them can be given as
+    keyword arguments."""
+
+    def __init__(self,**parameters):
+        self.height = 1.0
+        self.width = 2.0
+        self.length = 3.0
+
+        self.numberOfGlobalXElements = 2
+        self.numberOfGlobalYElements = 2
+        self.numberOfGlobalZElements = 0
+
+        self.interpolationType = LINEAR_LAGRANGE
+
+        # Interpolation types of each region and of the interface (None for interpolationType everywhere). The interface
+        # type interpolates the Lagrange multipliers and maps the interface onto the regions. The regions coupled through
+        # an interface may have different types, e.g. a higher order only in the regions next to the interfaces that
+        # need it.
+        self.regionInterpolationTypes = None
+        self.interfaceInterpolationType = None
+
+        # Number of regions laid out in a strip along x, each width wide, coupled through the numberOfRegions-1
+        # interfaces between them
+        self.numberOfRegions = 2
+
+        self.setupOutput = True
+        # The diagnostic output (quiet/progress/debug/matrix-dump, see DIAGNOSTICS_PROFILES). The progress messages
+        # follow the profile unless progressDiagnostics is given.
+        self.diagnostics = 'progress'
+        self.progressDiagnostics = None
+        self.debugLevel = 3
+
+        self.linearMaximumIterations      = 100000000 #default: 100000
+        self.linearRelativeTolerance      = 1.0E-4    #default: 1.0E-05
+        self.linearAbsoluteTolerance      = 1.0E-4    #default: 1.0E-10
+        self.linearDivergenceTolerance    = 1.0E5     #default: 1.0E5
+        self.linearRestartValue           = 30        #default: 30
+
+        # Linear solver for the coupled system (direct/gmres/minres/fieldsplit) and the preconditioner for the iterative
+        # solvers (None for the default of the solver: jacobi, or none for fieldsplit). fieldsplit is GMRES with a Schur
+        # complement block preconditioner for the Lagrange multiplier saddle point system which uses
+        # fieldSplitBlockPreconditionerType (a PETSc PC type) for the two Laplace blocks.
+        self.linearSolverType = 'direct'
+        self.linearPreconditionerType = None
+        self.fieldSplitBlockPreconditionerType = 'gamg'
+        self.residualHistoryFilename = "CoupledLaplaceResidualHistory.txt"
+
+        # Where a telemetry record of every solve is written (None to disable): a JSON lines file or a tcp://host:port,
+        # udp://host:port or unix:///path socket (see telemetry.py). The records include the PETSc view of the solver,
+        # written to solverViewFilename, if telemetry was enabled when the context was created.
+        self.telemetryDestination = None
+        self.solverViewFilename = "CoupledLaplaceSolverView.txt"
+
+        # How the interface mesh connectivity is found: from the numbering of the generated meshes (generated) or by
+        # matching the interface elements to the coupled element faces geometrically (geometric)
+        self.interfaceConnectivityType = 'generated'
+
+        # How the regions are placed onto the ranks: partitioned together by the decomposer (partitioned), partitioned by
+        # the decomposer with the interface elements placed with the region elements before them (co-located) or each
+        # region given to its own group of ranks with the interfaces placed with the region before them (strip)
+        self.subdomainPlacement = 'partitioned'
+
+        # Report the communication volume of the placement on each rank
+        self.communicationReport = False
+
+        # How the regions are coupled: monolithically through Lagrange multiplier interface conditions (lagrange) or by
+        # Dirichlet-Neumann iterations between the separately solved regions (dirichlet-neumann). The iterations stop
+        # once the rms of the interface residual is within couplingTolerance. The interface values are relaxed by
+        # couplingRelaxation, adapted after every iteration by Aitken's method with couplingAcceleration = 'aitken' or
+        # kept constant.
+        self.couplingMethod = 'lagrange'
+        self.couplingTolerance = 1.0e-6
+        self.couplingMaximumIterations = 100
+        self.couplingRelaxation = 0.5
+        self.couplingAcceleration = 'aitken'
+
+        # Directory of the on-disk cache of the interface connectivity and mesh partitioning (None to disable) and the
+        # size the cache is kept within by evicting the least recently used entries
+        self.meshCacheDirectory = None
+        self.meshCacheMaximumBytes = 1024**3
+
+        # Faces of the meshes to fix, as a list of (region number, face, value) with the face one of x-, x+, y-, y+, z-
+        # or z+. If there are none the first node of the first region is fixed to 0.0 and the last node of the last
+        # region to 1.0.
+        self.boundaryFaces = []
+
+        # File of a batch of boundary value cases to solve against the one set up problem (None to solve the problem
+        # once). Each row holds the values of the first node of the first region and the last node of the last region
+        # for one case.
+        self.boundaryCasesFilename = None
+        self.boundaryCasesResultsFilename = "CoupledLaplaceBoundaryCases"
+        # How the cases are solved: one solve per case (sequential), as the problem is linear by superposing the
+        # solutions for a unit value on each boundary DOF (block) or by superposition only when there are more cases than
+        # boundary DOFs (auto)
+        self.boundaryCasesMethod = 'auto'
+
+        # Post-process the solution in-process: the norms of the solutions, the jump in the solution across the
+        # interface and the flux through the interface. The post-processing needs the DOF maps, which take a binding
+        # call per node to set up, so it is off by default.
+        self.postProcessing = False
+
+        # What is exported: nothing (none), the geometry before the solve (geometry), the solution (solution) or both.
+        # The geometry nodes are written to <name>Geometry files and the element topology is written once for both.
+        self.exportPolicy = 'solution'
+        # Format of the solution export: exformat text files (text), per-rank NumPy binary files (binary) or both. The
+        # binary export is streamed in chunks of exportChunkSize DOFs.
+        self.exportFormat = 'text'
+        self.exportChunkSize = 65536
+
+        for name,value in parameters.items():
+            if not hasattr(self,name):
+                raise ValueError('Unknown coupled Laplace parameter '+name+'.')
+            setattr(self,name,value)
+
+    # Fill in the parameters that follow from the others and check they are consistent. Raises ValueError if not.
+    def Resolve(self):
+        if (self.diagnostics not in DIAGNOSTICS_PROFILES):
+            raise ValueError('Unknown diagnostics profile ' + str(self.diagnostics) + '. The profile should be one of ' + ', '.join(DIAGNOSTICS_PROFILES) + '.')
+        if (self.progressDiagnostics is None):
+            self.progressDiagnostics = DIAGNOSTICS_PROFILES[self.diagnostics]['progress']
+        if (self.numberOfGlobalXElements < 0):
+            raise ValueError('The specified numberXElements of ' + str(self.numberOfGlobalXElements) + ' is invalid. The number should be >= 0')
+        if (self.numberOfGlobalYElements < 0):
+            raise ValueError('The specified numberYElements of ' + str(self.numberOfGlobalYElements) + ' is invalid. The number should be >= 0')
+        if (self.numberOfGlobalZElements < 0):
+            raise ValueError('The specified numberZElements of ' + str(self.numberOfGlobalZElements) + ' is invalid. The number should be >= 0')
+        if (self.numberOfRegions < 2):
+            raise ValueError('The specified number of regions of ' + str(self.numberOfRegions) + ' is invalid. The number should be >= 2')
+        self.regionInterpolationTypes = list(self.regionInterpolationTypes or [self.interpolationType])
+        if (len(self.regionInterpolationTypes) == 1):
+            self.regionInterpolationTypes = self.regionInterpolationTypes*self.numberOfRegions
+        if (len(self.regionInterpolationTypes) != self.numberOfRegions):
+            raise ValueError('The ' + str(len(self.regionInterpolationTypes)) + ' region interpolation types do not match the ' + str(self.numberOfRegions) + ' regions.')
+        self.interfaceInterpolationType = self.interfaceInterpolationType or self.interpolationType
+        if (len(set(IsSimplex(regionInterpolationType) for regionInterpolationType in self.regionInterpolationTypes+[self.interfaceInterpolationType])) > 1):
+            raise ValueError('Simplex and tensor product interpolation types cannot be mixed.')
+        if (self.linearSolverType == 'fieldsplit'):
+            if (self.linearPreconditionerType not in (None,'none')):
+                raise ValueError('The fieldsplit solver brings its own block preconditioner and cannot be used with the ' + str(self.linearPreconditionerType) + ' preconditioner.')
+            self.linearPreconditionerType = 'none'
+        elif (self.linearPreconditionerType is None):
+            self.linearPreconditionerType = 'jacobi'
+        # The generated connectivity follows the element numbering of tensor product meshes so simplex meshes are always
+        # connected geometrically
+        if (IsSimplex(self.interfaceInterpolationType)):
+            self.interfaceConnectivityType = 'geometric'
+        if any(regionNumber < 1 or regionNumber > self.numberOfRegions for regionNumber,face,value in self.boundaryFaces):
+            raise ValueError('The boundary faces must be on regions 1 to ' + str(self.numberOfRegions) + '.')
+        if (self.boundaryFaces and self.boundaryCasesFilename is not None):
+            raise ValueError('The boundary cases vary the values of the first and last nodes and cannot be used with boundary faces.')
+        if (self.telemetryDestination is not None):
+            TelemetryDestinationParse(self.telemetryDestination)
+        if (self.exportChunkSize < 1):
+            raise ValueError('The specified export chunk size of ' + str(self.exportChunkSize) + ' is invalid. The size should be >= 1')
+        if (self.couplingMethod == 'dirichlet-neumann'):
+            if (CUBIC_HERMITE in self.regionInterpolationTypes):
+                raise ValueError('The Dirichlet-Neumann coupling only exchanges nodal values and needs a Lagrange interpolation.')
+            if (len(set(self.regionInterpolationTypes)) > 1):
+                raise ValueError('The Dirichlet-Neumann coupling exchanges the values of matching interface nodes and needs the same interpolation type in every region.')
+            if (self.linearSolverType == 'fieldsplit'):
+                raise ValueError('The fieldsplit solver is for the Lagrange multiplier system and cannot be used with the Dirichlet-Neumann coupling.')
+            if (self.boundaryCasesFilename is not None):
+                raise ValueError('The boundary cases are solved against the monolithic system and cannot be used with the Dirichlet-Neumann coupling.')
+
+    # The options passed through to PETSc for the solvers. These need to be set before the context is created.
+    def PetscOptionsGet(self):
+        options = []
+        if (self.linearSolverType != 'direct'):
+            options += ResidualHistoryOptionsGet(self.residualHistoryFilename)
+            if (self.linearSolverType == 'minres'):
+                # OpenCMISS has no MINRES solver type so switch the Krylov method over in PETSc
+                options += ['-ksp_type','minres']
+            elif (self.linearSolverType == 'fieldsplit'):
+                options += FieldSplitOptionsGet(self.fieldSplitBlockPreconditionerType)
+        # Keep the factorisation of the first boundary case for the other cases, or of the first Dirichlet-Neumann
+        # iteration for the later iterations
+        if (self.boundaryCasesFilename is not None or self.couplingMethod == 'dirichlet-neumann'):
+            options += FactorisationReuseOptionsGet()
+        if (self.telemetryDestination is not None):
+            options += SolverViewOptionsGet(self.solverViewFilename)
+        return options
+
+#================================================================================================================================
+#  Context
+#================================================================================================================================
+
+class CoupledLaplaceContext(object):
+    """An OpenCMISS context with its world region and work group and the bases shared by the problems built in it. The
+    problems are built and torn down in it one after the other. PETSc reads its options when the context is created, so
+    the problems of a context have to ask for the PETSc options it was created with. The OpenCMISS output file is only
+    opened for the diagnostics profiles that write to it."""
+
+    def __init__(self,petscOptions=None,diagnostics='progress',userNumber=contextUserNumber):
+        start = time.perf_counter()
+        self.petscOptions = list(petscOptions or [])
+        # The options are only for this context, so the original options are put back when it is destroyed
+        self.originalPetscOptions = PetscOptionsSet(self.petscOptions)
+
+        # Diagnostics
+        #DiagnosticsSetOn(oc.DiagnosticTypes.ALL,[1,2,3,4,5],"Diagnostics",[""])
+        # Error Handling
+        #ErrorHandlingModeSet(oc.ErrorHandlingModes.TRAP_ERROR)
+        # Output
+        if DIAGNOSTICS_PROFILES[diagnostics]['outputFile']:
+            oc.OutputSetOn(DIAGNOSTICS_OUTPUT_FILENAME)
+
+        self.context = oc.Context()
+        self.context.Create(userNumber)
+
+        self.worldRegion = oc.Region()
+        self.context.WorldRegionGet(self.worldRegion)
+
+        # Get the computational nodes info
+        self.computationEnvironment = oc.ComputationEnvironment()
+        self.context.ComputationEnvironmentGet(self.computationEnvironment)
+
+        self.worldWorkGroup = oc.WorkGroup()
+        self.computationEnvironment.WorldWorkGroupGet(self.worldWorkGroup)
+        self.numberOfComputationalNodes = self.worldWorkGroup.NumberOfGroupNodesGet()
+        self.computationalNodeNumber = self.worldWorkGroup.GroupNodeNumberGet()
+
+        self.basisRegistry = BasisRegistry(self.context)
+        self.createTime = time.perf_counter()-start
+
+    # Destroy the shared bases and the context and restore the PETSc options. Any problems built in the context have to
+    # be torn down first.
+    def Destroy(self):
+        self.basisRegistry.Destroy()
+        self.context.Destroy()
+        PetscOptionsRestore(self.originalPetscOptions)
+
+#================================================================================================================================
+#  Problem
+#================================================================================================================================
+
+class CoupledLaplaceProblem(object):
+    """A coupled Laplace problem built in a context. Build sets the problem up, Solve solves it, PostProcess and Export
+    work on the solution and Teardown destroys everything but the context and its bases so the next problem can be built
+    in the same context. The phases are timed with the profiler."""
+
+    def __init__(self,parameters,laplaceContext,profiler=None):
+        parameters.Resolve()
+        # PETSc only reads its options when the context is created so a problem asking for other options would silently
+        # be solved with the options of the context
+        if (parameters.PetscOptionsGet() != laplaceContext.petscOptions):
+            raise ValueError('The problem needs the PETSc options "{0}" but the context was created with "{1}".'.format(
+                ' '.join(parameters.PetscOptionsGet()),' '.join(laplaceContext.petscOptions)))
+        self.parameters = parameters
+        self.laplaceContext = laplaceContext
+        self.context = laplaceContext.context
+        self.worldRegion = laplaceContext.worldRegion
+        self.worldWorkGroup = laplaceContext.worldWorkGroup
+        self.numberOfComputationalNodes = laplaceContext.numberOfComputationalNodes
+        self.computationalNodeNumber = laplaceContext.computationalNodeNumber
+        self.profiler = profiler if profiler is not None else PhaseProfiler()
+        self.profiler.RankSet(self.computationalNodeNumber,self.numberOfComputationalNodes)
+        if (parameters.couplingMethod == 'dirichlet-neumann' and self.numberOfComputationalNodes > 1 and
+            WorldCommunicatorGet() is None):
+            raise ValueError('The Dirichlet-Neumann coupling needs mpi4py to exchange the interface values between the ranks.')
+
+        # The generated meshes split each cell of the lattice into triangles or tetrahedra with simplex interpolation
+        self.simplex = IsSimplex(parameters.interfaceInterpolationType)
+        # Interface meshes and conditions are only needed to couple the regions with Lagrange multipliers
+        if (parameters.couplingMethod == 'lagrange'):
+            self.numberOfInterfaces = parameters.numberOfRegions-1
+        else:
+            self.numberOfInterfaces = 0
+
+        # (None/TIMING/MATRIX/ELEMENT_MATRIX/NODAL_MATRIX), None leaves the output at the OpenCMISS default of none
+        self.diagnosticsProfile = DIAGNOSTICS_PROFILES[parameters.diagnostics]
+        self.equationsSetOutputType = self.diagnosticsProfile['equationsSetOutputType']
+        self.equationsOutputType = self.diagnosticsProfile['equationsOutputType']
+        self.interfaceConditionOutputType = self.diagnosticsProfile['interfaceConditionOutputType']
+        self.interfaceEquationsOutputType = self.diagnosticsProfile['interfaceEquationsOutputType']
+        self.coupledSolverOutputType = self.diagnosticsProfile['solverOutputType']
+
+        self.linearPreconditionerTypes = { 'none' : oc.IterativePreconditionerTypes.NO_PRECONDITIONER,
+                                           'jacobi' : oc.IterativePreconditionerTypes.JACOBI,
+                                           'block-jacobi' : oc.IterativePreconditionerTypes.BLOCK_JACOBI,
+                                           'sor' : oc.IterativePreconditionerTypes.SOR,
+                                           'incomplete-lu' : oc.IterativePreconditionerTypes.INCOMPLETE_LU,
+                                           'additive-schwarz' : oc.IterativePreconditionerTypes.ADDITIVE_SCHWARZ }
+
+        self.SizesCalculate()
+        if (parameters.setupOutput):
+            self.SummaryPrint()
+        self.MetadataSet()
+
+        self.coordinateSystems = []
+        self.interfaceCoordinateSystem = None
+        self.regions = []
+        self.interfaces = []
+        self.decomposers = []
+        self.problems = []
+        self.dofMaps = None
+        self.lagrangeDofMaps = None
+        self.telemetrySink = None
+
+    # Count the degrees of freedom in each block of the coupled system. The nodes of each region and of the interfaces
+    # follow their own interpolation type.
+    def SizesCalculate(self):
+        parameters = self.parameters
+        if (parameters.numberOfGlobalZElements == 0):
+            self.numberOfDimensions = 2
+            self.numberOfInterfaceDimensions = 1
+            self.numberOfGlobalElements = [parameters.numberOfGlobalXElements,parameters.numberOfGlobalYElements]
+        else:
+            self.numberOfDimensions = 3
+            self.numberOfInterfaceDimensions = 2
+            self.numberOfGlobalElements = [parameters.numberOfGlobalXElements,parameters.numberOfGlobalYElements,
+                                           parameters.numberOfGlobalZElements]
+        self.extent = [parameters.width,parameters.height,parameters.length][:self.numberOfDimensions]
+        self.numberOfRegionElements = int(numpy.prod(self.numberOfGlobalElements))* \
+                                      NumberOfCellElementsGet(parameters.interfaceInterpolationType,self.numberOfDimensions)
+        self.numberOfInterfaceElements = int(numpy.prod(self.numberOfGlobalElements[1:]))* \
+                                         NumberOfCellElementsGet(parameters.interfaceInterpolationType,
+                                                                 self.numberOfInterfaceDimensions)
+        self.regionNumberOfNodesXi = [NumberOfNodesXiGet(regionInterpolationType) \
+                                      for regionInterpolationType in parameters.regionInterpolationTypes]
+        self.regionNumberOfGlobalNodes = [[count*(numberOfNodesXi-1)+1 for count in self.numberOfGlobalElements] \
+                                          for numberOfNodesXi in self.regionNumberOfNodesXi]
+        self.regionNumberOfNodes = [int(numpy.prod(numberOfGlobalNodes)) for numberOfGlobalNodes in self.regionNumberOfGlobalNodes]
+        self.regionNumberOfNodeDerivatives = [NumberOfNodeDerivativesGet(regionInterpolationType,self.numberOfDimensions) \
+                                              for regionInterpolationType in parameters.regionInterpolationTypes]
+        self.regionNumberOfDofs = [numberOfRegionNodes*numberOfNodeDerivatives for numberOfRegionNodes,numberOfNodeDerivatives \
+                                   in zip(self.regionNumberOfNodes,self.regionNumberOfNodeDerivatives)]
+        self.interfaceNumberOfNodesXi = NumberOfNodesXiGet(parameters.interfaceInterpolationType)
+        self.numberOfInterfaceNodes = int(numpy.prod([count*(self.interfaceNumberOfNodesXi-1)+1 \
+                                                      for count in self.numberOfGlobalElements[1:]]))
+        self.numberOfInterfaceNodeDerivatives = NumberOfNodeDerivativesGet(parameters.interfaceInterpolationType,
+                                                                           self.numberOfInterfaceDimensions)
+        self.numberOfInterfaceDofs = self.numberOfInterfaceNodes*self.numberOfInterfaceNodeDerivatives
+        self.numberOfDofs = sum(self.regionNumberOfDofs)+self.numberOfInterfaces*self.numberOfInterfaceDofs
+
+    def SummaryPrint(self):
+        parameters = self.parameters
+        print('SUMMARY')
+        print('=======')
+        print(' ')
+        if (len(set(parameters.regionInterpolationTypes+[parameters.interfaceInterpolationType])) == 1):
+            print('    Interpolation type: '+InterpolationNameGet(parameters.interfaceInterpolationType))
+        else:
+            for regionIdx,regionInterpolationType in enumerate(parameters.regionInterpolationTypes):
+                print('    Region {0:d} interpolation type: '.format(regionIdx+1)+InterpolationNameGet(regionInterpolationType))
+            print('    Interface interpolation type: '+InterpolationNameGet(parameters.interfaceInterpolationType))
+        print(' ')
+        print('    Height: {0:f}'.format(parameters.height))
+        print('    Width : {0:f}'.format(parameters.width))
+        print('    Length: {0:f}'.format(parameters.length))
+        print(' ')
+        print('    Number of X elements: {0:d}'.format(parameters.numberOfGlobalXElements))
+        print('    Number of Y elements: {0:d}'.format(parameters.numberOfGlobalYElements))
+        print('    Number of Z elements: {0:d}'.format(parameters.numberOfGlobalZElements))
+        print('    Number of regions: {0:d}'.format(parameters.numberOfRegions))
+        print(' ')
+        print('    Number of DOFs: {0:d}'.format(self.numberOfDofs))
+        print(' ')
+        print('    Linear solver: '+parameters.linearSolverType)
+        if (parameters.linearSolverType == 'fieldsplit'):
+            print('    Preconditioner: Schur complement fieldsplit ('+parameters.fieldSplitBlockPreconditionerType+' Laplace blocks)')
+        elif (parameters.linearSolverType != 'direct'):
+            print('    Preconditioner: '+parameters.linearPreconditionerType)
+
+    def MetadataSet(self):
+        parameters = self.parameters
+        profiler = self.profiler
+        profiler.MetadataSet('height',parameters.height)
+        profiler.MetadataSet('width',parameters.width)
+        profiler.MetadataSet('length',parameters.length)
+        profiler.MetadataSet('numberOfGlobalXElements',parameters.numberOfGlobalXElements)
+        profiler.MetadataSet('numberOfGlobalYElements',parameters.numberOfGlobalYElements)
+        profiler.MetadataSet('numberOfGlobalZElements',parameters.numberOfGlobalZElements)
+        profiler.MetadataSet('interpolationType',parameters.interpolationType)
+        profiler.MetadataSet('regionInterpolationTypes',parameters.regionInterpolationTypes)
+        profiler.MetadataSet('interfaceInterpolationType',parameters.interfaceInterpolationType)
+        profiler.MetadataSet('numberOfRegions',parameters.numberOfRegions)
+        profiler.MetadataSet('subdomainPlacement',parameters.subdomainPlacement)
+        profiler.MetadataSet('numberOfRegionDofs',self.regionNumberOfDofs)
+        profiler.MetadataSet('numberOfInterfaceDofs',self.numberOfInterfaceDofs)
+        profiler.MetadataSet('numberOfDofs',self.numberOfDofs)
+        profiler.MetadataSet('interfaceConnectivityType',parameters.interfaceConnectivityType)
+        profiler.MetadataSet('diagnostics',parameters.diagnostics)
+        profiler.MetadataSet('exportPolicy',parameters.exportPolicy)
+        profiler.MetadataSet('exportFormat',parameters.exportFormat)
+        profiler.MetadataSet('linearSolverType',parameters.linearSolverType)
+        if (parameters.linearSolverType == 'fieldsplit'):
+            profiler.MetadataSet('linearPreconditionerType','fieldsplit-'+parameters.fieldSplitBlockPreconditionerType)
+        elif (parameters.linearSolverType != 'direct'):
+            profiler.MetadataSet('linearPreconditionerType',parameters.linearPreconditionerType)
+
+    # Set the problem up, from the coordinate systems to the boundary conditions, and export the geometry
+    def Build(self):
+        self.CoordinateSystemsCreate()
+        self.RegionsCreate()
+        self.BasesCreate()
+        self.GeneratedMeshesCreate()
+        self.InterfacesCreate()
+        self.InterfaceMeshConnectivityCreate()
+        self.DecompositionsCreate()
+        self.DecomposerCreate()
+        if (self.parameters.communicationReport):
+            self.CommunicationReport()
+        self.GeometricFieldsCreate()
+        self.EquationsSetsCreate()
+        self.DependentFieldsCreate()
+        self.EquationsCreate()
+        self.InterfaceConditionsCreate()
+        self.ProblemsCreate()
+        self.ControlLoopsCreate()
+        self.SolversCreate()
+        self.SolverEquationsCreate()
+        # The boundary conditions of faces and boundary cases and the Dirichlet-Neumann coupling work through the DOF maps
+        if (self.parameters.boundaryFaces or self.parameters.boundaryCasesFilename is not None or
+            self.parameters.couplingMethod == 'dirichlet-neumann'):
+            self.DofLabelsSet()
+        self.BoundaryConditionsCreate()
+        if (self.parameters.telemetryDestination is not None):
+            self.TelemetryCreate()
+        self.GeometryExport()
+
+    #============================================================================================================================
+    #  Coordinate Systems
+    #============================================================================================================================
+
+    def CoordinateSystemsCreate(self):
+        self.profiler.PhaseStart('Coordinate Systems')
+
+        if (self.parameters.progressDiagnostics):
+            print(' ')
+            print('Coordinate systems ...')
+
+        for regionIdx in range(self.parameters.numberOfRegions):
+            if (self.parameters.progressDiagnostics):
+                print('  Creating coordinate system {0:d} ...'.format(regionIdx+1))
+
+            coordinateSystem = oc.CoordinateSystem()
+            coordinateSystem.CreateStart(regionIdx+1,self.context)
+            coordinateSystem.DimensionSet(self.numberOfDimensions)
+            coordinateSystem.CreateFinish()
+            self.coordinateSystems.append(coordinateSystem)
+
+        if (self.parameters.progressDiagnostics):
+            print('  Creating interface coordinate system ...')
+
+        self.interfaceCoordinateSystem = oc.CoordinateSystem()
+        self.interfaceCoordinateSystem.CreateStart(self.parameters.numberOfRegions+1,self.context)
+        self.interfaceCoordinateSystem.DimensionSet(self.numberOfDimensions)
+        self.interfaceCoordinateSystem.CreateFinish()
+
+        self.profiler.PhaseFinish()
+
+        if (self.parameters.progressDiagnostics):
+            print('Coordinate systems ... Done')
+
+    #============================================================================================================================
+    #  Regions
+    #============================================================================================================================
+
+    def RegionsCreate(self):
+        self.profiler.PhaseStart('Regions')
+
+        if (self.parameters.progressDiagnostics):
+            print('Regions ...')
+
+        for regionIdx in range(self.parameters.numberOfRegions):
+            if (self.parameters.progressDiagnostics):
+                print('  Creating region {0:d} ...'.format(regionIdx+1))
+
+            region = oc.Region()
+            region.CreateStart(regionIdx+1,self.worldRegion)
+            region.LabelSet('Region{0:d}'.format(regionIdx+1))
+            region.CoordinateSystemSet(self.coordinateSystems[regionIdx])
+            region.CreateFinish()
+            self.regions.append(region)
+
+        self.profiler.PhaseFinish()
+
+        if (self.parameters.progressDiagnostics):
+            print('Regions ... Done')
+
+    #============================================================================================================================
+    #  Bases
+    #============================================================================================================================
+
+    def BasesCreate(self):
+        self.profiler.PhaseStart('Bases')
+
+        if (self.parameters.progressDiagnostics):
+            print('Basis functions ...')
+
+        # Regions with the same interpolation type share one basis, as do the problems built in the same context
+        basisRegistry = self.laplaceContext.basisRegistry
+        self.bases = []
+        for regionInterpolationType in self.parameters.regionInterpolationTypes:
+            if (self.parameters.progressDiagnostics and not basisRegistry.Contains(regionInterpolationType,self.numberOfDimensions)):
+                print('  Creating basis {0:d} ...'.format(basisRegistry.nextUserNumber))
+
+            self.bases.append(basisRegistry.BasisGet(regionInterpolationType,self.numberOfDimensions))
+
+        self.profiler.PhaseFinish()
+
+        if (self.parameters.progressDiagnostics):
+            print('Basis functions ... Done')
+
+    #============================================================================================================================
+    #  Generated meshes
+    #============================================================================================================================
+
+    def GeneratedMeshesCreate(self):
+        parameters = self.parameters
+        self.profiler.PhaseStart('Generated meshes')
+
+        if (parameters.progressDiagnostics):
+            print('Generated meshes ...')
+
+        # The regions are laid out in a strip along x, region i (0 based) starting at x = i*width
+        self.generatedMeshes = []
+        self.meshes = []
+        for regionIdx in range(parameters.numberOfRegions):
+            if (parameters.progressDiagnostics):
+                print('  Creating generated mesh {0:d} ...'.format(regionIdx+1))
+
+            generatedMesh = oc.GeneratedMesh()
+            generatedMesh.CreateStart(regionIdx+1,self.regions[regionIdx])
+            generatedMesh.TypeSet(oc.GeneratedMeshTypes.REGULAR)
+            generatedMesh.BasisSet([self.bases[regionIdx]])
+            generatedMesh.OriginSet([regionIdx*parameters.width]+[0.0]*(self.numberOfDimensions-1))
+            generatedMesh.ExtentSet(self.extent)
+            generatedMesh.NumberOfElementsSet(self.numberOfGlobalElements)
+            mesh = oc.Mesh()
+            generatedMesh.CreateFinish(regionIdx+1,mesh)
+            self.generatedMeshes.append(generatedMesh)
+            self.meshes.append(mesh)
+
+        # The generated simplex meshes number their triangles or tetrahedra themselves so the element nodes are read back,
+        # for the geometric interface connectivity, the placement and the interface weights
+        self.simplexMeshArrays = []
+        if (self.simplex):
+            for regionIdx in range(parameters.numberOfRegions):
+                meshElements = oc.MeshElements()
+                self.meshes[regionIdx].ElementsGet(1,meshElements)
+                self.simplexMeshArrays.append(GeneratedSimplexMeshArraysGet(meshElements,self.numberOfRegionElements,
+                                                                            [regionIdx*parameters.width]+[0.0]*(self.numberOfDimensions-1),
+                                                                            self.extent,self.numberOfGlobalElements,
+                                                                            self.regionNumberOfNodesXi[regionIdx]))
+
+        self.profiler.PhaseFinish()
+
+        if (parameters.progressDiagnostics):
+            print('Generated meshes ... Done')
+
+    #============================================================================================================================
+    #  Interface
+    #============================================================================================================================
+
+    def InterfacesCreate(self):
+        parameters = self.parameters
+        self.profiler.PhaseStart('Interface')
+
+        if (parameters.progressDiagnostics):
+            print('Interface ...')
+
+        # Create an interface between each pair of neighbouring meshes
+        self.mesh1Indices = []
+        self.mesh2Indices = []
+        for interfaceIdx in range(self.numberOfInterfaces):
+            if (parameters.progressDiagnostics):
+                print('  Creating interface {0:d} ...'.format(interfaceIdx+1))
+
+            interface = oc.Interface()
+            interface.CreateStart(interfaceIdx+1,self.worldRegion)
+            interface.LabelSet('Interface{0:d}'.format(interfaceIdx+1))
+            # Add in the two meshes
+            self.mesh1Indices.append(interface.MeshAdd(self.meshes[interfaceIdx]))
+            self.mesh2Indices.append(interface.MeshAdd(self.meshes[interfaceIdx+1]))
+            interface.CoordinateSystemSet(self.interfaceCoordinateSystem)
+            interface.CreateFinish()
+            self.interfaces.append(interface)
+
+        # The interface meshes and the interface mappings share one basis
+        basisRegistry = self.laplaceContext.basisRegistry
+        if (self.numberOfInterfaces > 0):
+            if (parameters.progressDiagnostics and
+                not basisRegistry.Contains(parameters.interfaceInterpolationType,self.numberOfInterfaceDimensions)):
+                print('  Creating interface basis ...')
+
+            self.interfaceBasis = basisRegistry.BasisGet(parameters.interfaceInterpolationType,
+                                                         self.numberOfInterfaceDimensions)
+            self.interfaceMappingBasis = basisRegistry.BasisGet(parameters.interfaceInterpolationType,
+                                                                self.numberOfInterfaceDimensions)
+        self.profiler.MetadataSet('numberOfBases',len(basisRegistry))
+
+        # Interface i (0 based) is the x = (i+1)*width face between regions i and i+1
+        self.interfaceGeneratedMeshes = []
+        self.interfaceMeshes = []
+        for interfaceIdx in range(self.numberOfInterfaces):
+            if (parameters.progressDiagnostics):
+                print('  Creating interface generated mesh {0:d} ...'.format(interfaceIdx+1))
+
+            interfaceGeneratedMesh = oc.GeneratedMesh()
+            interfaceGeneratedMesh.CreateStartInterface(parameters.numberOfRegions+interfaceIdx+1,
+                                                        self.interfaces[interfaceIdx])
+            interfaceGeneratedMesh.TypeSet(oc.GeneratedMeshTypes.REGULAR)
+            interfaceGeneratedMesh.BasisSet([self.interfaceBasis])
+            interfaceGeneratedMesh.OriginSet([(interfaceIdx+1)*parameters.width]+[0.0]*(self.numberOfDimensions-1))
+            interfaceGeneratedMesh.ExtentSet([0.0]+self.extent[1:])
+            interfaceGeneratedMesh.NumberOfElementsSet(self.numberOfGlobalElements[1:])
+            interfaceMesh = oc.Mesh()
+            interfaceGeneratedMesh.CreateFinish(parameters.numberOfRegions+interfaceIdx+1,interfaceMesh)
+            self.interfaceGeneratedMeshes.append(interfaceGeneratedMesh)
+            self.interfaceMeshes.append(interfaceMesh)
+
+        self.simplexInterfaceMeshArrays = []
+        if (self.simplex):
+            for interfaceIdx in range(self.numberOfInterfaces):
+                interfaceMeshElements = oc.MeshElements()
+                self.interfaceMeshes[interfaceIdx].ElementsGet(1,interfaceMeshElements)
+                self.simplexInterfaceMeshArrays.append(
+                    GeneratedSimplexMeshArraysGet(interfaceMeshElements,self.numberOfInterfaceElements,
+                                                  [(interfaceIdx+1)*parameters.width]+[0.0]*(self.numberOfDimensions-1),
+                                                  [0.0]+self.extent[1:],self.numberOfGlobalElements[1:],
+                                                  self.interfaceNumberOfNodesXi))
+
+        self.profiler.PhaseFinish()
+
+        if (parameters.progressDiagnostics):
+            print('Interface ... Done')
+
+    #============================================================================================================================
+    #  Interface mesh connectivity
+    #============================================================================================================================
+
+    def InterfaceMeshConnectivityCreate(self):
+        parameters = self.parameters
+        self.profiler.PhaseStart('Interface mesh connectivity')
+
+        if (parameters.progressDiagnostics):
+            print('Interface mesh connectivity ...')
+
+        # Look up the interface connectivity and mesh partitioning of earlier runs of the same problem in the mesh cache
+        self.meshCacheEntry = None
+        if (parameters.meshCacheDirectory is not None):
+            self.meshCache = MeshCache(parameters.meshCacheDirectory,parameters.meshCacheMaximumBytes)
+            self.meshCacheKey = CacheKeyCalculate({ 'height' : parameters.height, 'width' : parameters.width,
+                                                    'length' : parameters.length,
+                                                    'numberOfGlobalXElements' : parameters.numberOfGlobalXElements,
+                                                    'numberOfGlobalYElements' : parameters.numberOfGlobalYElements,
+                                                    'numberOfGlobalZElements' : parameters.numberOfGlobalZElements,
+                                                    'regionInterpolationTypes' : parameters.regionInterpolationTypes,
+                                                    'interfaceInterpolationType' : parameters.interfaceInterpolationType,
+                                                    'numberOfRegions' : parameters.numberOfRegions,
+                                                    'numberOfInterfaces' : self.numberOfInterfaces,
+                                                    'subdomainPlacement' : parameters.subdomainPlacement,
+                                                    'numberOfComputationalNodes' : self.numberOfComputationalNodes })
+            meshCacheNames = ['mesh{0:d}ElementDomains'.format(regionIdx+1) for regionIdx in range(parameters.numberOfRegions)]
+            for interfaceIdx in range(self.numberOfInterfaces):
+                meshCacheNames += ['interface{0:d}{1:s}'.format(interfaceIdx+1,name) for name in MESH_CACHE_CONNECTIVITY_NAMES]
+                meshCacheNames.append('interfaceMesh{0:d}ElementDomains'.format(interfaceIdx+1))
+            # Rank 0 loads the entry for all the ranks so they all take the same branch below
+            self.meshCacheEntry = self.meshCache.SharedLoad(self.meshCacheKey,meshCacheNames,self.computationalNodeNumber,
+                                                            self.numberOfComputationalNodes)
+            self.profiler.MetadataSet('meshCacheHit',self.meshCacheEntry is not None)
+            if (parameters.progressDiagnostics and self.meshCacheEntry is not None):
+                print('  Using cached interface connectivity and partitioning ...')
+
+        # Calculate the connectivity of all interface elements at once and apply it in bulk
+        self.interfaceConnectivities = []
+        self.interfaceMeshConnectivities = []
+        for interfaceIdx in range(self.numberOfInterfaces):
+            # Couple the interface meshes
+            interfaceMeshConnectivity = oc.InterfaceMeshConnectivity()
+            interfaceMeshConnectivity.CreateStart(self.interfaces[interfaceIdx],self.interfaceMeshes[interfaceIdx])
+            interfaceMeshConnectivity.BasisSet(self.interfaceMappingBasis)
+            if (self.meshCacheEntry is not None):
+                interfaceConnectivity = tuple(self.meshCacheEntry['interface{0:d}{1:s}'.format(interfaceIdx+1,name)] \
+                                              for name in MESH_CACHE_CONNECTIVITY_NAMES)
+            elif (parameters.interfaceConnectivityType == 'geometric'):
+                # Match the interface elements to the faces of the coupled elements geometrically. The generated mesh
+                # arrays stand in for the node coordinates and element nodes an imported mesh would be created from.
+                if (self.simplex):
+                    mesh1Arrays = self.simplexMeshArrays[interfaceIdx]
+                    mesh2Arrays = self.simplexMeshArrays[interfaceIdx+1]
+                    interfaceMeshArrays = self.simplexInterfaceMeshArrays[interfaceIdx]
+                else:
+                    mesh1Arrays = GeneratedMeshArraysCalculate([interfaceIdx*parameters.width]+[0.0]*(self.numberOfDimensions-1),
+                                                               self.extent,self.numberOfGlobalElements,
+                                                               self.regionNumberOfNodesXi[interfaceIdx])
+                    mesh2Arrays = GeneratedMeshArraysCalculate([(interfaceIdx+1)*parameters.width]+[0.0]*(self.numberOfDimensions-1),
+                                                               self.extent,self.numberOfGlobalElements,
+                                                               self.regionNumberOfNodesXi[interfaceIdx+1])
+                    interfaceMeshArrays = GeneratedMeshArraysCalculate([(interfaceIdx+1)*parameters.width]+
+                                                                       [0.0]*(self.numberOfDimensions-1),
+                                                                       [0.0]+self.extent[1:],self.numberOfGlobalElements[1:],
+                                                                       self.interfaceNumberOfNodesXi)
+                interfaceElementNumbers,mesh1ElementNumbers,mesh1Xi = InterfaceConnectivityDetect(interfaceMeshArrays,mesh1Arrays)
+                interfaceElementNumbers,mesh2ElementNumbers,mesh2Xi = InterfaceConnectivityDetect(interfaceMeshArrays,mesh2Arrays)
+                interfaceConnectivity = (interfaceElementNumbers,mesh1ElementNumbers,mesh1Xi,mesh2ElementNumbers,mesh2Xi)
+            else:
+                interfaceConnectivity = GeneratedInterfaceConnectivityCalculate(self.numberOfGlobalElements,
+                                                                                self.interfaceNumberOfNodesXi)
+            interfaceElementNumbers,mesh1ElementNumbers,mesh1Xi,mesh2ElementNumbers,mesh2Xi = interfaceConnectivity
+            #Map the interface elements to the elements in the mesh before the interface
+            InterfaceMeshConnectivitySet(interfaceMeshConnectivity,self.mesh1Indices[interfaceIdx],interfaceElementNumbers,
+                                         mesh1ElementNumbers,mesh1Xi)
+            #Map the interface elements to the elements in the mesh after the interface
+            InterfaceMeshConnectivitySet(interfaceMeshConnectivity,self.mesh2Indices[interfaceIdx],interfaceElementNumbers,
+                                         mesh2ElementNumbers,mesh2Xi)
+            interfaceMeshConnectivity.CreateFinish()
+            self.interfaceConnectivities.append(interfaceConnectivity)
+            self.interfaceMeshConnectivities.append(interfaceMeshConnectivity)
+
+        self.profiler.PhaseFinish()
+
+        if (parameters.progressDiagnostics):
+            print('Interface mesh connectivity ... Done')
+
+    #============================================================================================================================
+    #  Decomposition
+    #============================================================================================================================
+
+    def DecompositionsCreate(self):
+        parameters = self.parameters
+        self.profiler.PhaseStart('Decomposition')
+
+        if (parameters.progressDiagnostics):
+            print('Decomposition ...')
+
+        # Element domains for user defined decompositions, either from the mesh cache or from the placement of the
+        # regions onto the ranks. Otherwise the decomposer partitions the meshes.
+        regionElementDomains = None
+        interfaceElementDomains = None
+        if (self.meshCacheEntry is not None):
+            regionElementDomains = [self.meshCacheEntry['mesh{0:d}ElementDomains'.format(regionIdx+1)] \
+                                    for regionIdx in range(parameters.numberOfRegions)]
+            interfaceElementDomains = [self.meshCacheEntry['interfaceMesh{0:d}ElementDomains'.format(interfaceIdx+1)] \
+                                       for interfaceIdx in range(self.numberOfInterfaces)]
+        elif (parameters.subdomainPlacement == 'strip'):
+            # The simplices are placed by the lattice cell their centroid is in
+            elementXIdx = None
+            if (self.simplex):
+                elementXIdx = numpy.floor(numpy.mean(self.simplexMeshArrays[0].ElementNodeCoordinatesGet()[:,:,0],axis=1)/
+                                          parameters.width*parameters.numberOfGlobalXElements).astype(numpy.int64)
+            regionElementDomains,interfaceElementDomains = \
+                StripElementDomainsCalculate(parameters.numberOfRegions,self.numberOfGlobalElements,
+                                             self.numberOfComputationalNodes,
+                                             [interfaceConnectivity[:2] for interfaceConnectivity in self.interfaceConnectivities],
+                                             elementXIdx)
+
+        self.decompositions = []
+        for regionIdx in range(parameters.numberOfRegions):
+            if (parameters.progressDiagnostics):
+                print('  Creating decomposition {0:d} ...'.format(regionIdx+1))
+
+            # Create a decomposition for the mesh
+            decomposition = oc.Decomposition()
+            decomposition.CreateStart(regionIdx+1,self.meshes[regionIdx])
+            if (regionElementDomains is not None):
+                # Use the given partitioning rather than partitioning the mesh
+                decomposition.TypeSet(oc.DecompositionTypes.USER_DEFINED)
+                for elementNumber,elementDomain in enumerate(regionElementDomains[regionIdx].tolist(),1):
+                    decomposition.ElementDomainSet(elementNumber,elementDomain)
+            decomposition.CalculateFacesSet(True)
+            decomposition.CreateFinish()
+            self.decompositions.append(decomposition)
+
+        # With co-located placement the regions are partitioned on their own first and the interface elements are then
+        # placed with the region elements before them, so the interface terms coupling to them are assembled locally
+        self.colocatedPlacement = (parameters.subdomainPlacement == 'co-located' and interfaceElementDomains is None)
+        if (self.colocatedPlacement):
+            if (parameters.progressDiagnostics):
+                print('  Partitioning the regions ...')
+            regionDecomposer = oc.Decomposer()
+            regionDecomposer.CreateStart(regionDecomposerUserNumber,self.worldRegion,self.worldWorkGroup)
+            for decomposition in self.decompositions:
+                regionDecomposer.DecompositionAdd(decomposition)
+            regionDecomposer.CreateFinish()
+            self.decomposers.append(regionDecomposer)
+            interfaceElementDomains = [ColocatedElementDomainsGet(interfaceConnectivity[0],interfaceConnectivity[1],
+                                                                  self.decompositions[interfaceIdx]) \
+                                       for interfaceIdx,interfaceConnectivity in enumerate(self.interfaceConnectivities)]
+
+        self.interfaceDecompositions = []
+        for interfaceIdx in range(self.numberOfInterfaces):
+            if (parameters.progressDiagnostics):
+                print('  Creating interface decomposition {0:d} ...'.format(interfaceIdx+1))
+
+            # Create a decomposition for the interface mesh
+            interfaceDecomposition = oc.Decomposition()
+            interfaceDecomposition.CreateStart(parameters.numberOfRegions+interfaceIdx+1,self.interfaceMeshes[interfaceIdx])
+            if (interfaceElementDomains is not None):
+                interfaceDecomposition.TypeSet(oc.DecompositionTypes.USER_DEFINED)
+                for elementNumber,elementDomain in enumerate(interfaceElementDomains[interfaceIdx].tolist(),1):
+                    interfaceDecomposition.ElementDomainSet(elementNumber,elementDomain)
+            interfaceDecomposition.CreateFinish()
+            self.interfaceDecompositions.append(interfaceDecomposition)
+
+        self.profiler.PhaseFinish()
+
+        if (parameters.progressDiagnostics):
+            print('Decomposition ... Done')
+
+    #============================================================================================================================
+    #  Decomposer
+    #============================================================================================================================
+
+    def DecomposerCreate(self):
+        parameters = self.parameters
+        self.profiler.PhaseStart('Decomposer')
+
+        if (parameters.progressDiagnostics):
+            print('Decomposer ...')
+
+        decomposer = oc.Decomposer()
+        decomposer.CreateStart(decomposerUserNumber,self.worldRegion,self.worldWorkGroup)
+        for decomposition in (self.interfaceDecompositions if self.colocatedPlacement else
+                              self.decompositions+self.interfaceDecompositions):
+            decomposer.DecompositionAdd(decomposition)
+        if (self.diagnosticsProfile['decomposerOutputType'] is not None):
+            decomposer.OutputTypeSet(self.diagnosticsProfile['decomposerOutputType'])
+        decomposer.CreateFinish()
+        self.decomposers.append(decomposer)
+
+        # Store the connectivity and partitioning in the mesh cache for later runs
+        if (parameters.meshCacheDirectory is not None and self.meshCacheEntry is None and self.computationalNodeNumber == 0):
+            meshCacheArrays = {}
+            for interfaceIdx,interfaceConnectivity in enumerate(self.interfaceConnectivities):
+                for name,array in zip(MESH_CACHE_CONNECTIVITY_NAMES,interfaceConnectivity):
+                    meshCacheArrays['interface{0:d}{1:s}'.format(interfaceIdx+1,name)] = array
+            for regionIdx,decomposition in enumerate(self.decompositions):
+                meshCacheArrays['mesh{0:d}ElementDomains'.format(regionIdx+1)] = \
+                    DecompositionElementDomainsGet(decomposition,self.numberOfRegionElements)
+            for interfaceIdx,interfaceDecomposition in enumerate(self.interfaceDecompositions):
+                meshCacheArrays['interfaceMesh{0:d}ElementDomains'.format(interfaceIdx+1)] = \
+                    DecompositionElementDomainsGet(interfaceDecomposition,self.numberOfInterfaceElements)
+            self.meshCache.Store(self.meshCacheKey,meshCacheArrays)
+
+        self.profiler.PhaseFinish()
+
+        if (parameters.progressDiagnostics):
+            print('Decomposer ... Done')
+
+    #============================================================================================================================
+    #  Communication report
+    #============================================================================================================================
+
+    # The element nodes of the meshes of the regions and of the interfaces, from the generated meshes
+    def ElementNodesGet(self):
+        if (self.simplex):
+            regionElementNodes = [meshArrays.elementNodes for meshArrays in self.simplexMeshArrays]
+            interfaceElementNodes = [meshArrays.elementNodes for meshArrays in self.simplexInterfaceMeshArrays]
+        else:
+            regionElementNodes = [GeneratedMeshArraysCalculate([0.0]*self.numberOfDimensions,self.extent,
+                                                               self.numberOfGlobalElements,numberOfNodesXi).elementNodes \
+                                  for numberOfNodesXi in self.regionNumberOfNodesXi]
+            interfaceElementNodes = [GeneratedMeshArraysCalculate([0.0]*self.numberOfDimensions,[0.0]+self.extent[1:],
+                                                                  self.numberOfGlobalElements[1:],
+                                                                  self.interfaceNumberOfNodesXi).elementNodes]*self.numberOfInterfaces
+        return regionElementNodes,interfaceElementNodes
+
+    def CommunicationReport(self):
+        parameters = self.parameters
+        self.profiler.PhaseStart('Communication report')
+
+        if (parameters.progressDiagnostics):
+            print('Communication report ...')
+
+        # The ghost nodes of every rank and the interface elements coupled to elements on another rank, from the element
+        # and node domains of all the meshes
+        regionElementNodes,interfaceElementNodes = self.ElementNodesGet()
+        regionElementDomains = [DecompositionElementDomainsGet(decomposition,self.numberOfRegionElements) \
+                                for decomposition in self.decompositions]
+        interfaceElementDomains = [DecompositionElementDomainsGet(interfaceDecomposition,self.numberOfInterfaceElements) \
+                                   for interfaceDecomposition in self.interfaceDecompositions]
+        communicationMeshes = [(regionElementNodes[regionIdx],regionElementDomains[regionIdx],
+                                DecompositionNodeDomainsGet(self.decompositions[regionIdx],self.regionNumberOfNodes[regionIdx])) \
+                               for regionIdx in range(parameters.numberOfRegions)]+ \
+                              [(interfaceElementNodes[interfaceIdx],interfaceElementDomains[interfaceIdx],
+                                DecompositionNodeDomainsGet(self.interfaceDecompositions[interfaceIdx],
+                                                            self.numberOfInterfaceNodes)) \
+                               for interfaceIdx in range(self.numberOfInterfaces)]
+        communicationCouplings = []
+        for interfaceIdx,interfaceConnectivity in enumerate(self.interfaceConnectivities):
+            interfaceElementNumbers,mesh1ElementNumbers,mesh1Xi,mesh2ElementNumbers,mesh2Xi = interfaceConnectivity
+            communicationCouplings.append((interfaceElementNumbers,mesh1ElementNumbers,interfaceElementDomains[interfaceIdx],
+                                           regionElementDomains[interfaceIdx]))
+            communicationCouplings.append((interfaceElementNumbers,mesh2ElementNumbers,interfaceElementDomains[interfaceIdx],
+                                           regionElementDomains[interfaceIdx+1]))
+        communicationVolume = CommunicationVolumeCalculate(communicationMeshes,communicationCouplings,
+                                                           self.numberOfComputationalNodes)
+        self.profiler.MetadataSet('communicationVolume',communicationVolume)
+        self.profiler.MetadataSet('ghostNodes',sum(rankVolume['ghostNodes'] for rankVolume in communicationVolume))
+        self.profiler.MetadataSet('remoteInterfaceCouplings',
+                                  sum(rankVolume['remoteInterfaceCouplings'] for rankVolume in communicationVolume))
+        if (self.computationalNodeNumber == 0):
+            print('Communication volume ({0:s} placement):'.format(parameters.subdomainPlacement))
+            print('{0:>8s} {1:>10s} {2:>12s} {3:>10s} {4:>20s} {5:>26s}'.format('rank','elements','ghost nodes','neighbours',
+                                                                              'interface couplings','remote interface couplings'))
+            for rankVolume in communicationVolume:
+                print('{rank:>8d} {elements:>10d} {ghostNodes:>12d} {neighbourRanks:>10d} {interfaceCouplings:>20d} '
+                      '{remoteInterfaceCouplings:>26d}'.format(**rankVolume))
+
+        self.profiler.PhaseFinish()
+
+        if (parameters.progressDiagnostics):
+            print('Communication report ... Done')
+
+    #============================================================================================================================
+    #  Geometric Field
+    #============================================================================================================================
+
+    def GeometricFieldsCreate(self):
+        parameters = self.parameters
+        self.profiler.PhaseStart('Geometric Field')
+
+        if (parameters.progressDiagnostics):
+            print('Geometric field ...')
+
+        self.geometricFields = []
+        for regionIdx in range(parameters.numberOfRegions):
+            if (parameters.progressDiagnostics):
+                print('  Creating geometric field {0:d} ...'.format(regionIdx+1))
+
+            # Start to create a default (geometric) field on the region
+            geometricField = oc.Field()
+            geometricField.CreateStart(geometricFieldUserNumber,self.regions[regionIdx])
+            # Set the decomposition to use
+            geometricField.DecompositionSet(self.decompositions[regionIdx])
+            # Set the scaling to use
+            if (parameters.regionInterpolationTypes[regionIdx] == CUBIC_HERMITE):
+                geometricField.ScalingTypeSet(oc.FieldScalingTypes.ARITHMETIC_MEAN)
+            else:
+                geometricField.ScalingTypeSet(oc.FieldScalingTypes.NONE)
+            geometricField.VariableLabelSet(oc.FieldVariableTypes.U,'Geometry{0:d}Variable'.format(regionIdx+1))
+            # Set the domain to be used by the field components.
+            for componentIdx in range(1,self.numberOfDimensions+1):
+                geometricField.ComponentMeshComponentSet(oc.FieldVariableTypes.U,componentIdx,1)
+            # Finish creating the field
+            geometricField.CreateFinish()
+            self.geometricFields.append(geometricField)
+
+        self.interfaceGeometricFields = []
+        for interfaceIdx in range(self.numberOfInterfaces):
+            if (parameters.progressDiagnostics):
+                print('  Creating interface geometric field {0:d} ...'.format(interfaceIdx+1))
+
+            # Start to create a default (geometric) field on the interface
+            interfaceGeometricField = oc.Field()
+            interfaceGeometricField.CreateStartInterface(interfaceGeometricFieldUserNumber,self.interfaces[interfaceIdx])
+            # Set the decomposition to use
+            interfaceGeometricField.DecompositionSet(self.interfaceDecompositions[interfaceIdx])
+            # Set the scaling to use
+            if (parameters.interfaceInterpolationType == CUBIC_HERMITE):
+                interfaceGeometricField.ScalingTypeSet(oc.FieldScalingTypes.ARITHMETIC_MEAN)
+            else:
+                interfaceGeometricField.ScalingTypeSet(oc.FieldScalingTypes.NONE)
+            interfaceGeometricField.VariableLabelSet(oc.FieldVariableTypes.U,'Interface{0:d}GeometryVariable'.format(interfaceIdx+1))
+            # Set the domain to be used by the field components.
+            for componentIdx in range(1,self.numberOfDimensions+1):
+                interfaceGeometricField.ComponentMeshComponentSet(oc.FieldVariableTypes.U,componentIdx,1)
+            # Finish creating the field
+            interfaceGeometricField.CreateFinish()
+            self.interfaceGeometricFields.append(interfaceGeometricField)
+
+        # Update the geometric field parameters
+        for generatedMesh,geometricField in zip(self.generatedMeshes,self.geometricFields):
+            generatedMesh.GeometricParametersCalculate(geometricField)
+        for interfaceGeneratedMesh,interfaceGeometricField in zip(self.interfaceGeneratedMeshes,self.interfaceGeometricFields):
+            interfaceGeneratedMesh.GeometricParametersCalculate(interfaceGeometricField)
+
+        self.profiler.PhaseFinish()
+
+        if (parameters.progressDiagnostics):
+            print('Geometric field ... Done')
+
+    #============================================================================================================================
+    #  Equations Set
+    #============================================================================================================================
+
+    def EquationsSetsCreate(self):
+        parameters = self.parameters
+        self.profiler.PhaseStart('Equations Set')
+
+        if (parameters.progressDiagnostics):
+            print('Equations sets ...')
+
+        self.equationsSets = []
+        for regionIdx in range(parameters.numberOfRegions):
+            if (parameters.progressDiagnostics):
+                print('  Creating equations set {0:d} ...'.format(regionIdx+1))
+
+            equationsSetField = oc.Field()
+            equationsSet = oc.EquationsSet()
+            equationsSetSpecification = [ oc.EquationsSetClasses.CLASSICAL_FIELD,
+                                          oc.EquationsSetTypes.LAPLACE_EQUATION,
+                                          oc.EquationsSetSubtypes.STANDARD_LAPLACE ]
+            equationsSet.CreateStart(equationsSetUserNumber,self.regions[regionIdx],self.geometricFields[regionIdx], \
+                                     equationsSetSpecification,equationsSetFieldUserNumber,equationsSetField)
+            if (self.equationsSetOutputType is not None):
+                equationsSet.OutputTypeSet(self.equationsSetOutputType)
+            equationsSet.CreateFinish()
+            self.equationsSets.append(equationsSet)
+
+        self.profiler.PhaseFinish()
+
+        if (parameters.progressDiagnostics):
+            print('Equations sets ... Done')
+
+    #============================================================================================================================
+    #  Dependent fields
+    #============================================================================================================================
+
+    def DependentFieldsCreate(self):
+        parameters = self.parameters
+        self.profiler.PhaseStart('Dependent fields')
+
+        if (parameters.progressDiagnostics):
+            print('Dependent fields ...')
+
+        self.dependentFields = []
+        for regionIdx in range(parameters.numberOfRegions):
+            if (parameters.progressDiagnostics):
+                print('  Creating dependent field {0:d} ...'.format(regionIdx+1))
+
+            dependentField = oc.Field()
+            self.equationsSets[regionIdx].DependentCreateStart(dependentFieldUserNumber,dependentField)
+            self.equationsSets[regionIdx].DependentCreateFinish()
+            self.dependentFields.append(dependentField)
+
+        self.profiler.PhaseFinish()
+
+        if (parameters.progressDiagnostics):
+            print('Dependent fields ... Done')
+
+    #============================================================================================================================
+    #  Equations
+    #============================================================================================================================
+
+    def EquationsCreate(self):
+        parameters = self.parameters
+        self.profiler.PhaseStart('Equations')
+
+        if (parameters.progressDiagnostics):
+            print('Equations ...')
+
+        for regionIdx in range(parameters.numberOfRegions):
+            if (parameters.progressDiagnostics):
+                print('  Creating equations {0:d} ...'.format(regionIdx+1))
+
+            equations = oc.Equations()
+            self.equationsSets[regionIdx].EquationsCreateStart(equations)
+            #equations.SparsityTypeSet(oc.EquationsSparsityTypes.FULL)
+            equations.SparsityTypeSet(oc.EquationsSparsityTypes.SPARSE)
+            if (self.equationsOutputType is not None):
+                equations.OutputTypeSet(self.equationsOutputType)
+            self.equationsSets[regionIdx].EquationsCreateFinish()
+
+        self.profiler.PhaseFinish()
+
+        if (parameters.progressDiagnostics):
+            print('Equations ... Done')
+
+    #============================================================================================================================
+    #  Interface Condition
+    #============================================================================================================================
+
+    def InterfaceConditionsCreate(self):
+        parameters = self.parameters
+        self.profiler.PhaseStart('Interface Condition')
+
+        if (parameters.progressDiagnostics):
+            print('Interface Condition ...')
+
+        self.interfaceConditions = []
+        self.interfaceLagrangeFields = []
+        for interfaceIdx in range(self.numberOfInterfaces):
+            if (parameters.progressDiagnostics):
+                print('  Creating interface condition {0:d} ...'.format(interfaceIdx+1))
+
+            # Create an interface condition between the two equations sets either side of the interface
+            interfaceCondition = oc.InterfaceCondition()
+            interfaceCondition.CreateStart(interfaceConditionUserNumber,self.interfaces[interfaceIdx],
+                                           self.interfaceGeometricFields[interfaceIdx])
+            # Specify the method for the interface condition
+            interfaceCondition.MethodSet(oc.InterfaceConditionMethods.LAGRANGE_MULTIPLIERS)
+            # Specify the type of interface condition operator
+            interfaceCondition.OperatorSet(oc.InterfaceConditionOperators.FIELD_CONTINUITY)
+            # Add in the dependent variables from the equations sets
+            interfaceCondition.DependentVariableAdd(self.mesh1Indices[interfaceIdx],self.equationsSets[interfaceIdx],
+                                                    oc.FieldVariableTypes.U)
+            interfaceCondition.DependentVariableAdd(self.mesh2Indices[interfaceIdx],self.equationsSets[interfaceIdx+1],
+                                                    oc.FieldVariableTypes.U)
+            # Set the label
+            interfaceCondition.LabelSet('InterfaceCondition{0:d}'.format(interfaceIdx+1))
+            # Set the output type
+            if (self.interfaceConditionOutputType is not None):
+                interfaceCondition.OutputTypeSet(self.interfaceConditionOutputType)
+            # Finish creating the interface condition
+            interfaceCondition.CreateFinish()
+
+            if (parameters.progressDiagnostics):
+                print('  Creating Lagrange field {0:d} ...'.format(interfaceIdx+1))
+
+            # Create the Lagrange multipliers field
+            interfaceLagrangeField = oc.Field()
+            interfaceCondition.LagrangeFieldCreateStart(lagrangeFieldUserNumber,interfaceLagrangeField)
+            interfaceLagrangeField.VariableLabelSet(oc.FieldVariableTypes.U,'InterfaceLagrange{0:d}'.format(interfaceIdx+1))
+            # Finish the Lagrange multipliers field
+            interfaceCondition.LagrangeFieldCreateFinish()
+
+            if (parameters.progressDiagnostics):
+                print('  Creating interface equations {0:d} ...'.format(interfaceIdx+1))
+
+            # Create the interface condition equations
+            interfaceEquations = oc.InterfaceEquations()
+            interfaceCondition.EquationsCreateStart(interfaceEquations)
+            # Set the interface equations sparsity
+            #interfaceEquations.sparsityType = oc.EquationsSparsityTypes.FULL
+            interfaceEquations.sparsityType = oc.EquationsSparsityTypes.SPARSE
+            # Set the interface equations output
+            if (self.interfaceEquationsOutputType is not None):
+                interfaceEquations.outputType = self.interfaceEquationsOutputType
+            # Finish creating the interface equations
+            interfaceCondition.EquationsCreateFinish()
+            self.interfaceConditions.append(interfaceCondition)
+            self.interfaceLagrangeFields.append(interfaceLagrangeField)
+
+        self.profiler.PhaseFinish()
+
+        if (parameters.progressDiagnostics):
+            print('Interface condition ... Done')
+
+    #============================================================================================================================
+    #  Problem
+    #============================================================================================================================
+
+    def ProblemsCreate(self):
+        parameters = self.parameters
+        self.profiler.PhaseStart('Problem')
+
+        if (parameters.progressDiagnostics):
+            print('Problem ...')
+
+        # The regions of each problem: one problem of all the regions for the Lagrange multiplier coupling or one problem
+        # for each region for the Dirichlet-Neumann coupling
+        if (parameters.couplingMethod == 'lagrange'):
+            self.problemRegions = [list(range(parameters.numberOfRegions))]
+        else:
+            self.problemRegions = [[regionIdx] for regionIdx in range(parameters.numberOfRegions)]
+        self.regionProblemIndices = [problemIdx for problemIdx,regionIndices in enumerate(self.problemRegions) \
+                                     for regionIdx in regionIndices]
+
+        # Create the problems
+        for problemIdx in range(len(self.problemRegions)):
+            problem = oc.Problem()
+            problemSpecification = [ oc.ProblemClasses.CLASSICAL_FIELD,
+                                     oc.ProblemTypes.LAPLACE_EQUATION,
+                                     oc.ProblemSubtypes.STANDARD_LAPLACE ]
+            problem.CreateStart(problemUserNumber+problemIdx,self.context,problemSpecification)
+            problem.CreateFinish()
+            self.problems.append(problem)
+        # The problem of all the regions of the Lagrange multiplier coupling
+        self.problem = self.problems[0]
+        # The problems the solves go through, wrapped to report on every solve if there is telemetry
+        self.solveProblems = list(self.problems)
+
+        self.profiler.PhaseFinish()
+
+        if (parameters.progressDiagnostics):
+            print('Problems ... Done')
+
+    #============================================================================================================================
+    #  Control Loop
+    #============================================================================================================================
+
+    def ControlLoopsCreate(self):
+        self.profiler.PhaseStart('Control Loop')
+
+        if (self.parameters.progressDiagnostics):
+            print('Control Loops ...')
+
+        # Create the problem control loops
+        for problem in self.problems:
+            problem.ControlLoopCreateStart()
+            problem.ControlLoopCreateFinish()
+
+        self.profiler.PhaseFinish()
+
+        if (self.parameters.progressDiagnostics):
+            print('Control Loops ... Done')
+
+    #============================================================================================================================
+    #  Solvers
+    #============================================================================================================================
+
+    def SolversCreate(self):
+        parameters = self.parameters
+        self.profiler.PhaseStart('Solvers')
+
+        if (parameters.progressDiagnostics):
+            print('Solvers ...')
+
+        self.solvers = []
+        for problem in self.problems:
+            solver = oc.Solver()
+            problem.SolversCreateStart()
+            problem.SolverGet([oc.ControlLoopIdentifiers.NODE],1,solver)
+            if (self.coupledSolverOutputType is not None):
+                solver.OutputTypeSet(self.coupledSolverOutputType)
+            if (parameters.linearSolverType == 'direct'):
+                solver.LinearTypeSet(oc.LinearSolverTypes.DIRECT)
+                solver.LibraryTypeSet(oc.SolverLibraries.MUMPS)
+            else:
+                solver.LinearTypeSet(oc.LinearSolverTypes.ITERATIVE)
+                solver.LibraryTypeSet(oc.SolverLibraries.PETSC)
+                solver.LinearIterativeTypeSet(oc.IterativeLinearSolverTypes.GMRES)
+                solver.LinearIterativePreconditionerTypeSet(self.linearPreconditionerTypes[parameters.linearPreconditionerType])
+                solver.LinearIterativeMaximumIterationsSet(parameters.linearMaximumIterations)
+                solver.LinearIterativeRelativeToleranceSet(parameters.linearRelativeTolerance)
+                solver.LinearIterativeAbsoluteToleranceSet(parameters.linearAbsoluteTolerance)
+                solver.LinearIterativeDivergenceToleranceSet(parameters.linearDivergenceTolerance)
+                solver.LinearIterativeGMRESRestartSet(parameters.linearRestartValue)
+            # Finish the creation of the problem solver
+            problem.SolversCreateFinish()
+            self.solvers.append(solver)
+
+        self.profiler.PhaseFinish()
+
+        if (parameters.progressDiagnostics):
+            print('Solvers ... Done')
+
+    #============================================================================================================================
+    #  Solver Equations
+    #============================================================================================================================
+
+    def SolverEquationsCreate(self):
+        self.profiler.PhaseStart('Solver Equations')
+
+        if (self.parameters.progressDiagnostics):
+            print('Solver Equations ...')
+
+        # Start the creation of the problem solver equations. The interface conditions are added to the one problem of
+        # the Lagrange multiplier coupling.
+        self.solverEquationsList = []
+        for problem,solver,regionIndices in zip(self.problems,self.solvers,self.problemRegions):
+            solverEquations = oc.SolverEquations()
+            problem.SolverEquationsCreateStart()
+            solver.SolverEquationsGet(solverEquations)
+            #solverEquations.SparsityTypeSet(oc.SolverEquationsSparsityTypes.FULL)
+            solverEquations.SparsityTypeSet(oc.SolverEquationsSparsityTypes.SPARSE)
+            solverEquationsIndices = [solverEquations.EquationsSetAdd(self.equationsSets[regionIdx]) \
+                                      for regionIdx in regionIndices]
+            interfaceConditionIndices = [solverEquations.InterfaceConditionAdd(interfaceCondition) \
+                                         for interfaceCondition in self.interfaceConditions]
+            # Finish the creation of the problem solver equations
+            problem.SolverEquationsCreateFinish()
+            self.solverEquationsList.append(solverEquations)
+
+        self.profiler.PhaseFinish()
+
+        if (self.parameters.progressDiagnostics):
+            print('Solver Equations ... Done')
+
+    #============================================================================================================================
+    #  DOF labels
+    #============================================================================================================================
+
+    # Label the local DOFs of the fields with their nodes and map the global nodes onto the owned local DOFs, for the
+    # boundary conditions, the boundary case results, the Dirichlet-Neumann coupling, the post-processing, the solution
+    # arrays and the binary export. Labelling takes a binding call per node, so it is only done the first time the DOF
+    # maps are needed. It is timed in a phase of its own unless the caller times it as part of its phase.
+    def DofLabelsSet(self,phase=True):
+        parameters = self.parameters
+        if (self.dofMaps is not None):
+            return
+        self.dofMaps = [None]*parameters.numberOfRegions
+        self.lagrangeDofMaps = [None]*self.numberOfInterfaces
+
+        if phase:
+            self.profiler.PhaseStart('DOF labels')
+
+        for regionIdx in range(parameters.numberOfRegions):
+            FieldDofLabelsSet(self.dependentFields[regionIdx],self.decompositions[regionIdx],self.regionNumberOfNodes[regionIdx],
+                              self.regionNumberOfNodeDerivatives[regionIdx],self.computationalNodeNumber)
+            self.dofMaps[regionIdx] = FieldDofMap(self.dependentFields[regionIdx],self.regionNumberOfNodes[regionIdx],
+                                                  self.regionNumberOfNodeDerivatives[regionIdx])
+        for interfaceIdx in range(self.numberOfInterfaces):
+            FieldDofLabelsSet(self.interfaceLagrangeFields[interfaceIdx],self.interfaceDecompositions[interfaceIdx],
+                              self.numberOfInterfaceNodes,self.numberOfInterfaceNodeDerivatives,self.computationalNodeNumber)
+            self.lagrangeDofMaps[interfaceIdx] = FieldDofMap(self.interfaceLagrangeFields[interfaceIdx],
+                                                             self.numberOfInterfaceNodes,self.numberOfInterfaceNodeDerivatives)
+
+        if phase:
+            self.profiler.PhaseFinish()
+
+    #============================================================================================================================
+    #  Boundary Conditions
+    #============================================================================================================================
+
+    def BoundaryConditionsCreate(self):
+        parameters = self.parameters
+        self.profiler.PhaseStart('Boundary Conditions')
+
+        if (parameters.progressDiagnostics):
+            print('Boundary Conditions ...')
+
+        computationalNodeNumber = self.computationalNodeNumber
+        dependentFields = self.dependentFields
+        decompositions = self.decompositions
+        # Without the DOF maps the nodes are looked up one at a time through the decompositions
+        dofMaps = self.dofMaps or [None]*parameters.numberOfRegions
+        # Start the creation of the boundary conditions of each problem
+        boundaryConditionsList = []
+        for solverEquations in self.solverEquationsList:
+            boundaryConditions = oc.BoundaryConditions()
+            solverEquations.BoundaryConditionsCreateStart(boundaryConditions)
+            boundaryConditionsList.append(boundaryConditions)
+        regionBoundaryConditions = [boundaryConditionsList[problemIdx] for problemIdx in self.regionProblemIndices]
+        self.firstNodeNumber = 1
+        lastNodes = oc.Nodes()
+        self.regions[-1].NodesGet(lastNodes)
+        self.lastNodeNumber = lastNodes.NumberOfNodesGet()
+        regionFixedNodes = [numpy.zeros(0,dtype=numpy.int64) for regionIdx in range(parameters.numberOfRegions)]
+        if (parameters.boundaryFaces):
+            # Fix whole faces of the meshes
+            for regionNumber,face,value in parameters.boundaryFaces:
+                faceNodes = LatticeFaceNodesGet(self.regionNumberOfGlobalNodes[regionNumber-1],face)
+                BoundaryNodesSet(regionBoundaryConditions[regionNumber-1],dependentFields[regionNumber-1],faceNodes,
+                                 value,computationalNodeNumber=computationalNodeNumber,
+                                 decomposition=decompositions[regionNumber-1],dofMap=dofMaps[regionNumber-1])
+                regionFixedNodes[regionNumber-1] = numpy.concatenate([regionFixedNodes[regionNumber-1],faceNodes])
+        else:
+            # Set the first node of the first region to 0.0
+            BoundaryNodesSet(regionBoundaryConditions[0],dependentFields[0],[self.firstNodeNumber],0.0,
+                             computationalNodeNumber=computationalNodeNumber,decomposition=decompositions[0],dofMap=dofMaps[0])
+            # Set the last node of the last region to 1.0
+            BoundaryNodesSet(regionBoundaryConditions[-1],dependentFields[-1],[self.lastNodeNumber],1.0,
+                             computationalNodeNumber=computationalNodeNumber,decomposition=decompositions[-1],dofMap=dofMaps[-1])
+            regionFixedNodes[0] = numpy.array([self.firstNodeNumber])
+            regionFixedNodes[-1] = numpy.array([self.lastNodeNumber])
+        self.couplingInterfaces = []
+        if (parameters.couplingMethod == 'dirichlet-neumann'):
+            # Fix the x+ face of each region but the last to the interface values and load the x- face of the region
+            # after it with the flux through the interface. Interface nodes already fixed in either region are left out.
+            # The regions all have the same interpolation type so the interface nodes match.
+            dirichletNodes = LatticeFaceNodesGet(self.regionNumberOfGlobalNodes[0],'x+')
+            neumannNodes = LatticeFaceNodesGet(self.regionNumberOfGlobalNodes[0],'x-')
+            for regionIdx in range(parameters.numberOfRegions-1):
+                coupled = ~(numpy.isin(dirichletNodes,regionFixedNodes[regionIdx]) | \
+                            numpy.isin(neumannNodes,regionFixedNodes[regionIdx+1]))
+                BoundaryNodesSet(regionBoundaryConditions[regionIdx],dependentFields[regionIdx],dirichletNodes[coupled],0.0,
+                                 computationalNodeNumber=computationalNodeNumber,decomposition=decompositions[regionIdx],
+                                 dofMap=dofMaps[regionIdx])
+                BoundaryNodesSet(regionBoundaryConditions[regionIdx+1],dependentFields[regionIdx+1],neumannNodes[coupled],0.0,
+                                 conditionType=oc.BoundaryConditionsTypes.NEUMANN_POINT,
+                                 computationalNodeNumber=computationalNodeNumber,decomposition=decompositions[regionIdx+1],
+                                 dofMap=dofMaps[regionIdx+1],variableType=oc.FieldVariableTypes.DELUDELN)
+                self.couplingInterfaces.append(DirichletNeumannInterface(dependentFields[regionIdx],dofMaps[regionIdx],
+                                                                         dirichletNodes[coupled],dependentFields[regionIdx+1],
+                                                                         dofMaps[regionIdx+1],neumannNodes[coupled]))
+        for solverEquations in self.solverEquationsList:
+            solverEquations.BoundaryConditionsCreateFinish()
+
+        self.profiler.PhaseFinish()
+
+        if (parameters.progressDiagnostics):
+            print('Boundary Conditions ... Done')
+
+    #============================================================================================================================
+    #  Telemetry
+    #============================================================================================================================
+
+    # The blocks of the system solved by each problem, with their rows and structural nonzeros. The nonzeros of an
+    # interface block are those of its coupling to the regions on both sides, in both the rows and the columns of the
+    # Lagrange multipliers; the Lagrange multiplier block itself is zero.
+    def SystemBlocksCalculate(self):
+        regionElementNodes,interfaceElementNodes = self.ElementNodesGet()
+        regionBlocks = [{ 'name' : 'region{0:d}'.format(regionIdx+1),
+                          'rows' : self.regionNumberOfDofs[regionIdx],
+                          'nonzeros' : MeshNonzerosCalculate(regionElementNodes[regionIdx],
+                                                             self.regionNumberOfNodeDerivatives[regionIdx]) } \
+                        for regionIdx in range(self.parameters.numberOfRegions)]
+        interfaceBlocks = []
+        for interfaceIdx,interfaceConnectivity in enumerate(self.interfaceConnectivities):
+            interfaceElementNumbers,mesh1ElementNumbers,mesh1Xi,mesh2ElementNumbers,mesh2Xi = interfaceConnectivity
+            numberOfCouplingNonzeros = sum(CouplingNonzerosCalculate(interfaceElementNodes[interfaceIdx],interfaceElementNumbers,
+                                                                     regionElementNodes[regionIdx],coupledElementNumbers,
+                                                                     self.numberOfInterfaceNodeDerivatives,
+                                                                     self.regionNumberOfNodeDerivatives[regionIdx]) \
+                                           for regionIdx,coupledElementNumbers in [(interfaceIdx,mesh1ElementNumbers),
+                                                                                   (interfaceIdx+1,mesh2ElementNumbers)])
+            interfaceBlocks.append({ 'name' : 'interface{0:d}'.format(interfaceIdx+1),
+                                     'rows' : self.numberOfInterfaceDofs,
+                                     'nonzeros' : 2*numberOfCouplingNonzeros })
+        return [[regionBlocks[regionIdx] for regionIdx in regionIndices]+interfaceBlocks \
+                for regionIndices in self.problemRegions]
+
+    # Wrap the problems so that every solve writes a telemetry record to the telemetry destination
+    def TelemetryCreate(self):
+        parameters = self.parameters
+        self.profiler.PhaseStart('Telemetry')
+
+        # Only rank 0 writes the records so only rank 0 opens the file or socket
+        self.telemetrySink = TelemetrySink(parameters.telemetryDestination) if self.computationalNodeNumber == 0 else None
+        run = uuid.uuid4().hex
+        # The factorisation (or preconditioner) of the first solve of a problem is reused by its later solves
+        preconditionerReuse = parameters.boundaryCasesFilename is not None or parameters.couplingMethod == 'dirichlet-neumann'
+        self.solveProblems = []
+        for problemIdx,(problem,blocks) in enumerate(zip(self.problems,self.SystemBlocksCalculate())):
+            record = { 'run' : run,
+                       'pid' : os.getpid(),
+                       'problem' : 'coupled' if parameters.couplingMethod == 'lagrange' else 'region{0:d}'.format(problemIdx+1),
+                       'numberOfRanks' : self.numberOfComputationalNodes,
+                       'couplingMethod' : parameters.couplingMethod,
+                       'linearSolverType' : parameters.linearSolverType,
+                       'linearPreconditionerType' : self.profiler.metadata.get('linearPreconditionerType'),
+                       'regionInterpolationTypes' : parameters.regionInterpolationTypes,
+                       'interfaceInterpolationType' : parameters.interfaceInterpolationType,
+                       'rows' : sum(block['rows'] for block in blocks),
+                       'nonzeros' : sum(block['nonzeros'] for block in blocks),
+                       'blocks' : blocks }
+            self.solveProblems.append(SolveTelemetry(problem,self.telemetrySink,record,self.computationalNodeNumber,
+                                                     self.numberOfComputationalNodes,preconditionerReuse,
+                                                     parameters.solverViewFilename,
+                                                     parameters.residualHistoryFilename \
+                                                     if parameters.linearSolverType != 'direct' else None))
+
+        self.profiler.PhaseFinish()
+
+    #============================================================================================================================
+    #  Export geometry
+    #============================================================================================================================
+
+    def GeometryExport(self):
+        parameters = self.parameters
+        # The export files are CoupledLaplace<region number> for the regions and CoupledLaplaceInterface for the
+        # interface, or CoupledLaplaceInterface<interface number> if there is more than one interface
+        self.regionExportNames = ['CoupledLaplace{0:d}'.format(regionIdx+1) for regionIdx in range(parameters.numberOfRegions)]
+        if (self.numberOfInterfaces == 1):
+            self.interfaceExportNames = ['CoupledLaplaceInterface']
+        else:
+            self.interfaceExportNames = ['CoupledLaplaceInterface{0:d}'.format(interfaceIdx+1) \
+                                         for interfaceIdx in range(self.numberOfInterfaces)]
+
+        # All the fields have been defined now so the element topology is written once here and reused by the geometry
+        # and solution node exports
+        self.regionFields = []
+        self.interfaceFields = []
+        if (parameters.exportPolicy == 'none' or parameters.exportFormat not in ['text','both']):
+            return
+
+        self.profiler.PhaseStart('Export geometry')
+
+        for region,exportName in zip(self.regions,self.regionExportNames):
+            fields = oc.Fields()
+            fields.CreateRegion(region)
+            fields.ElementsExport(exportName,"FORTRAN")
+            self.regionFields.append(fields)
+
+        for interface,exportName in zip(self.interfaces,self.interfaceExportNames):
+            fields = oc.Fields()
+            fields.CreateInterface(interface)
+            fields.ElementsExport(exportName,"FORTRAN")
+            self.interfaceFields.append(fields)
+
+        if (parameters.exportPolicy in ['geometry','both']):
+            for fields,exportName in zip(self.regionFields+self.interfaceFields,
+                                         self.regionExportNames+self.interfaceExportNames):
+                fields.NodesExport(exportName+"Geometry","FORTRAN")
+
+        self.profiler.PhaseFinish()
+
+    #============================================================================================================================
+    #  Run Solvers
+    #============================================================================================================================
+
+    # Solve the problem, or the batch of boundary cases against it. Returns the wall time of the solve.
+    def Solve(self):
+        parameters = self.parameters
+        computationalNodeNumber = self.computationalNodeNumber
+        profiler = self.profiler
+        if (parameters.boundaryCasesFilename is None):
+            profiler.PhaseStart('Run Solvers')
+
+            # Solve the problem
+            if (parameters.progressDiagnostics):
+                print('Solving problem...')
+            if (parameters.linearSolverType != 'direct' and computationalNodeNumber == 0):
+                if os.path.exists(parameters.residualHistoryFilename):
+                    os.remove(parameters.residualHistoryFilename)
+            start = time.time()
+            if (parameters.couplingMethod == 'dirichlet-neumann'):
+                # Iterate the separately solved regions to agreement on the interfaces
+                couplingConverged,couplingHistory = \
+                    DirichletNeumannSolve(self.solveProblems,self.couplingInterfaces,parameters.couplingTolerance,
+                                          parameters.couplingMaximumIterations,parameters.couplingRelaxation,
+                                          parameters.couplingAcceleration,
+                                          CouplingRecordPrint if computationalNodeNumber == 0 else None)
+            else:
+                self.solveProblems[0].Solve()
+            end = time.time()
+            elapsed = end - start
+            print('Calculation Time = %3.4f' %elapsed)
+            if (parameters.couplingMethod == 'dirichlet-neumann'):
+                print('Coupling iterations = %d' %len(couplingHistory))
+                if (not couplingConverged):
+                    print('WARNING: The Dirichlet-Neumann coupling did not converge to %e in %d iterations' \
+                          %(parameters.couplingTolerance,parameters.couplingMaximumIterations))
+                profiler.MetadataSet('couplingIterations',len(couplingHistory))
+                profiler.MetadataSet('couplingConverged',couplingConverged)
+                profiler.MetadataSet('couplingHistory',couplingHistory)
+        else:
+            profiler.PhaseStart('Run boundary cases')
+
+            # Solve a batch of boundary value cases against the problem. Only the fixed values change between the cases
+            # so the factorisation of the first solve is reused by the others.
+            start = time.time()
+            boundaryCases = BoundaryCasesRead(parameters.boundaryCasesFilename,2)
+            if (parameters.progressDiagnostics):
+                print('Solving {0:d} boundary cases...'.format(boundaryCases.shape[0]))
+            if (parameters.linearSolverType != 'direct' and computationalNodeNumber == 0):
+                if os.path.exists(parameters.residualHistoryFilename):
+                    os.remove(parameters.residualHistoryFilename)
+            boundaryDofs = [(self.dependentFields[0],self.decompositions[0],self.firstNodeNumber),
+                            (self.dependentFields[-1],self.decompositions[-1],self.lastNodeNumber)]
+            resultFields = [('dependentField{0:d}'.format(regionIdx+1),self.dependentFields[regionIdx],
+                             self.regionNumberOfNodeDerivatives[regionIdx]) \
+                            for regionIdx in range(parameters.numberOfRegions)]+ \
+                           [('interfaceLagrangeField{0:d}'.format(interfaceIdx+1),self.interfaceLagrangeFields[interfaceIdx],
+                             self.numberOfInterfaceNodeDerivatives) for interfaceIdx in range(self.numberOfInterfaces)]
+            # The boundary DOFs are the only fixed DOFs (boundary faces cannot be used with the boundary cases) and there
+            # is no source so the solution for zero boundary values is zero
+            homogeneous = not parameters.boundaryFaces
+            boundaryCasesMethod = BoundaryCasesMethodGet(parameters.boundaryCasesMethod,boundaryCases.shape[0],
+                                                         len(boundaryDofs),homogeneous)
+            profiler.MetadataSet('boundaryCasesMethod',boundaryCasesMethod)
+            if (boundaryCasesMethod == 'block'):
+                solveTimes,totalTime,boundaryCaseResults = BoundaryCasesBlockSolve(self.solveProblems[0],boundaryDofs,
+                                                                                   boundaryCases.T,computationalNodeNumber,
+                                                                                   resultFields,parameters.exportChunkSize,
+                                                                                   homogeneous)
+                boundaryCaseResults = { name : (nodes,derivatives,values.T) \
+                                        for name,(nodes,derivatives,values) in boundaryCaseResults.items() }
+                solveTimesSummary = BlockSolveTimesSummarise(solveTimes,boundaryCases.shape[0],totalTime)
+            else:
+                solveTimes,boundaryCaseResults = BoundaryCasesSolve(self.solveProblems[0],boundaryDofs,boundaryCases,
+                                                                    computationalNodeNumber,resultFields,
+                                                                    parameters.exportChunkSize)
+                solveTimesSummary = SolveTimesSummarise(solveTimes)
+            elapsed = time.time() - start
+            print('Boundary cases = %d' %solveTimesSummary['numberOfBoundaryCases'])
+            print('First solve time = %3.4f' %solveTimesSummary['firstSolveTime'])
+            if (solveTimesSummary['repeatSolveTime'] is not None):
+                print('Repeat solve time = %3.4f' %solveTimesSummary['repeatSolveTime'])
+            print('Solves per second = %3.4f' %solveTimesSummary['solvesPerSecond'])
+            for name,value in solveTimesSummary.items():
+                profiler.MetadataSet(name,value)
+            if (parameters.exportPolicy in ['solution','both']):
+                BoundaryCaseResultsWrite(parameters.boundaryCasesResultsFilename,computationalNodeNumber,boundaryCases,
+                                         solveTimes,boundaryCaseResults)
+        if (parameters.linearSolverType != 'direct' and computationalNodeNumber == 0):
+            residualHistory = ResidualHistoryRead(parameters.residualHistoryFilename)
+            if (len(residualHistory) > 0):
+                print('Linear iterations = %d' %(len(residualHistory)-1))
+                print('Final residual norm = %e' %residualHistory[-1])
+                profiler.MetadataSet('linearIterations',len(residualHistory)-1)
+                profiler.MetadataSet('residualHistory',residualHistory)
+        if (parameters.progressDiagnostics):
+            print('Problem solved!')
+
+        profiler.PhaseFinish()
+        return elapsed
+
+    #============================================================================================================================
+    #  Post-process
+    #============================================================================================================================
+
+    # Work on the solution in place through views of the fields. Returns the max/rms norms of the solution of each
+    # region and the jump and flux across each interface.
+    def PostProcess(self):
+        parameters = self.parameters
+        self.DofLabelsSet()
+        self.profiler.PhaseStart('Post-process')
+
+        numberOfRegions = parameters.numberOfRegions
+        if (self.numberOfDimensions == 2):
+            # Simplex lines have the same nodes and weights as Lagrange lines
+            interfaceWeights = InterfaceWeightsCalculate([parameters.numberOfGlobalYElements],self.interfaceNumberOfNodesXi,
+                                                         [parameters.height])
+        elif (self.simplex):
+            # The interfaces are all meshed alike
+            interfaceWeights = None
+            if (self.numberOfInterfaces > 0):
+                interfaceWeights = TriangleWeightsCalculate(self.simplexInterfaceMeshArrays[0].nodeCoordinates,
+                                                            self.simplexInterfaceMeshArrays[0].elementNodes,
+                                                            self.interfaceNumberOfNodesXi)
+        else:
+            interfaceWeights = InterfaceWeightsCalculate([parameters.numberOfGlobalYElements,parameters.numberOfGlobalZElements],
+                                                         self.interfaceNumberOfNodesXi,[parameters.height,parameters.length])
+        # Each interface is the last x face of the mesh before it and the first x face of the mesh after it. Where the two
+        # meshes have different interpolation types the jump is taken at the face nodes they share, e.g. the element
+        # vertices.
+        interfaceNodes1 = []
+        interfaceNodes2 = []
+        for interfaceIdx in range(numberOfRegions-1):
+            numberOfNodesXi1 = self.regionNumberOfNodesXi[interfaceIdx]
+            numberOfNodesXi2 = self.regionNumberOfNodesXi[interfaceIdx+1]
+            commonDivisor = int(numpy.gcd(numberOfNodesXi1-1,numberOfNodesXi2-1))
+            interfaceNodes1.append(LatticeFaceNodesGet(self.regionNumberOfGlobalNodes[interfaceIdx],'x+',
+                                                       (numberOfNodesXi1-1)//commonDivisor))
+            interfaceNodes2.append(LatticeFaceNodesGet(self.regionNumberOfGlobalNodes[interfaceIdx+1],'x-',
+                                                       (numberOfNodesXi2-1)//commonDivisor))
+        dofMaps = self.dofMaps
+        with contextlib.ExitStack() as viewStack:
+            values = [viewStack.enter_context(FieldParameterSetView(dependentField)) for dependentField in self.dependentFields]
+            lagrangeValues = [viewStack.enter_context(FieldParameterSetView(interfaceLagrangeField)) \
+                              for interfaceLagrangeField in self.interfaceLagrangeFields]
+            solutionNorms = [ValuesNormsCalculate(dofMaps[regionIdx].OwnedValuesGet(values[regionIdx],1)) \
+                             for regionIdx in range(numberOfRegions)]
+            interfaceJumps = [InterfaceJumpCalculate(dofMaps[interfaceIdx],values[interfaceIdx],interfaceNodes1[interfaceIdx],
+                                                     dofMaps[interfaceIdx+1],values[interfaceIdx+1],
+                                                     interfaceNodes2[interfaceIdx]) \
+                              for interfaceIdx in range(numberOfRegions-1)]
+            if (parameters.couplingMethod == 'lagrange'):
+                interfaceFluxes = [InterfaceFluxCalculate(self.lagrangeDofMaps[interfaceIdx],lagrangeValues[interfaceIdx],
+                                                          interfaceWeights) for interfaceIdx in range(self.numberOfInterfaces)]
+            else:
+                # The flux through each interface is the sum of the reactions at its fixed nodes
+                interfaceFluxes = [float(numpy.nansum(couplingInterface.FluxesGet())) \
+                                   for couplingInterface in self.couplingInterfaces]
+        if (self.computationalNodeNumber == 0):
+            for regionIdx in range(numberOfRegions):
+                print('Solution max norm: region %d = %e' %(regionIdx+1,solutionNorms[regionIdx]['max']))
+            for interfaceIdx in range(numberOfRegions-1):
+                if (interfaceJumps[interfaceIdx]['max'] is not None):
+                    print('Interface %d jump: max = %e, rms = %e' %(interfaceIdx+1,interfaceJumps[interfaceIdx]['max'],
+                                                                     interfaceJumps[interfaceIdx]['rms']))
+                print('Interface %d flux = %e' %(interfaceIdx+1,interfaceFluxes[interfaceIdx]))
+        self.profiler.MetadataSet('solutionNorms',solutionNorms)
+        self.profiler.MetadataSet('interfaceJumps',interfaceJumps)
+        self.profiler.MetadataSet('interfaceFluxes',interfaceFluxes)
+
+        self.profiler.PhaseFinish()
+        return { 'solutionNorms' : solutionNorms,
+                 'interfaceJumps' : interfaceJumps,
+                 'interfaceFluxes' : interfaceFluxes }
+
+    # The solution of each region and the Lagrange multipliers of each interface as (nodes, derivatives) arrays of the
+    # node values, NaN where this rank does not own the node.
+    def SolutionGet(self):
+        self.DofLabelsSet()
+        solutions = {}
+        for name,fields,dofMaps,numbersOfNodes in [('region',self.dependentFields,self.dofMaps,self.regionNumberOfNodes),
+                                                   ('interface',self.interfaceLagrangeFields,self.lagrangeDofMaps,
+                                                    [self.numberOfInterfaceNodes]*self.numberOfInterfaces)]:
+            for fieldIdx,(field,dofMap,numberOfNodes) in enumerate(zip(fields,dofMaps,numbersOfNodes)):
+                nodes = numpy.arange(1,numberOfNodes+1)
+                with FieldParameterSetView(field) as values:
+                    solutions[name+'{0:d}'.format(fieldIdx+1)] = \
+                        numpy.stack([dofMap.NodeValuesGet(values,nodes,derivative) \
+                                     for derivative in range(1,dofMap.numberOfDerivatives+1)],axis=1)
+        return solutions
+
+    #============================================================================================================================
+    #  Export solution
+    #============================================================================================================================
+
+    # Export the solution as set by the export policy and format
+    def Export(self):
+        parameters = self.parameters
+        if (parameters.exportPolicy not in ['solution','both']):
+            return
+
+        # Export the fields. Only the nodes are written as the element topology was written before the solve.
+        if (parameters.exportFormat in ['text','both']):
+            self.profiler.PhaseStart('Export solution')
+
+            textExportBytes = 0
+            for fields,exportName in zip(self.regionFields+self.interfaceFields,self.regionExportNames+self.interfaceExportNames):
+                fields.NodesExport(exportName,"FORTRAN")
+                textExportBytes += TextExportSizeGet(exportName,self.computationalNodeNumber)
+            self.profiler.MetadataSet('textExportBytes',textExportBytes)
+
+            self.profiler.PhaseFinish()
+
+        if (parameters.exportFormat in ['binary','both']):
+            self.profiler.PhaseStart('Export solution binary')
+
+            # The binary export needs the DOF maps, so labelling them is part of its cost unless they were already set up
+            self.DofLabelsSet(phase=False)
+
+            # Each rank streams the values of the nodes it owns to its own file in chunks of exportChunkSize DOFs
+            binaryExportBytes = 0
+            for dependentField,numberOfNodeDerivatives,exportName in zip(self.dependentFields,self.regionNumberOfNodeDerivatives,
+                                                                         self.regionExportNames):
+                binaryExportBytes += FieldBinaryExport(exportName,dependentField,numberOfNodeDerivatives,
+                                                       self.computationalNodeNumber,self.numberOfComputationalNodes,
+                                                       parameters.exportChunkSize)
+            for interfaceLagrangeField,exportName in zip(self.interfaceLagrangeFields,self.interfaceExportNames):
+                binaryExportBytes += FieldBinaryExport(exportName,interfaceLagrangeField,self.numberOfInterfaceNodeDerivatives,
+                                                       self.computationalNodeNumber,self.numberOfComputationalNodes,
+                                                       parameters.exportChunkSize)
+            self.profiler.MetadataSet('binaryExportBytes',binaryExportBytes)
+
+            self.profiler.PhaseFinish()
+
+    #============================================================================================================================
+    #  Teardown
+    #============================================================================================================================
+
+    # Destroy the OpenCMISS objects of the problem, leaving the context and the shared bases for the next problem. The
+    # regions and interfaces take their meshes, decompositions, fields, equations sets and interface conditions with them.
+    def Teardown(self):
+        self.profiler.PhaseStart('Teardown')
+
+        for problem in self.problems:
+            problem.Destroy()
+        if self.telemetrySink is not None:
+            self.telemetrySink.Close()
+            self.telemetrySink = None
+        for interface in self.interfaces:
+            interface.Destroy()
+        for decomposer in self.decomposers:
+            decomposer.Destroy()
+        for region in self.regions:
+            region.Destroy()
+        for coordinateSystem in self.coordinateSystems+[self.interfaceCoordinateSystem]:
+            if coordinateSystem is not None:
+                coordinateSystem.Destroy()
+        self.problems = []
+        self.solveProblems = []
+        self.dofMaps = None
+        self.lagrangeDofMaps = None
+        self.interfaces = []
+        self.decomposers = []
+        self.regions = []
+        self.coordinateSystems = []
+        self.interfaceCoordinateSystem = None
+
+        self.profiler.PhaseFinish()
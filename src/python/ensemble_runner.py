@@ -0,0 +1,189 @@
+#> Process pool ensemble runner for independent coupled Laplace cases.
+#>
+#> Ensembles of small problems, e.g. the default 2x2 elements with varied extents, are too small for MPI to help but
+#> keep a many-core node busy when the cases are spread over a local pool of processes. Every worker process creates one
+#> CoupledLaplaceContext (coupled_laplace.py) when it starts and builds, solves and tears down the cases it is handed in
+#> it. The cases are streamed in as JSON lines, one object of CoupledLaplaceParameters keyword arguments per line, over
+#> the defaults given by --parameters. The results, the timings, the post-processing and the solution arrays of each
+#> case, are streamed out as JSON lines in the order the cases finish, with the index of the case in the input. The
+#> aggregate throughput in cases per second is printed at the end.
+#>
+#> The PETSc options are read when a worker's context is created so they come from the defaults, not from the cases. A
+#> case that needs other PETSc options, e.g. another linear solver, is reported as an error, as is any other failure of
+#> a case, so the rest of the ensemble still runs.
+#> Each worker runs in its own scratch directory and its output is discarded unless --worker-output is given.
+#>
+#> Usage: python ensemble_runner.py [--cases cases.jsonl] [--output results.jsonl] [--processes N]
+#>                                  [--parameters '{"numberOfRegions": 2}'] [--no-solutions] [--chunk-size 1]
+#>
+#>   python -c "import json; [print(json.dumps({'height' : 1.0+0.1*i})) for i in range(100)]" | \
+#>     python ensemble_runner.py --output results.jsonl
+#>
+
+import argparse,json,multiprocessing,os,shutil,statistics,sys,tempfile,time
+
+# Defaults of the cases of an ensemble over those of CoupledLaplaceParameters. The cases are run quietly and only the
+# results are kept.
+ENSEMBLE_PARAMETERS = { 'setupOutput' : False,
+                        'diagnostics' : 'quiet',
+                        'exportPolicy' : 'none',
+                        'postProcessing' : True }
+
+# The context and parameters of a worker process, set by WorkerInitialise
+workerState = {}
+
+#================================================================================================================================
+#  Workers
+#================================================================================================================================
+
+# Start a worker process: move into a scratch directory of its own, redirect its output and create its context
+def WorkerInitialise(defaultParameters,scratchDirectory,workerOutput):
+    os.chdir(tempfile.mkdtemp(prefix='worker',dir=scratchDirectory))
+    # OpenCMISS writes to the file descriptor directly so redirect that, not just sys.stdout
+    outputFilename = os.devnull
+    if workerOutput is not None:
+        outputFilename = os.path.join(workerOutput,'worker{0:d}.log'.format(os.getpid()))
+    outputFile = open(outputFilename,'w')
+    sys.stdout.flush()
+    os.dup2(outputFile.fileno(),1)
+    sys.stdout = outputFile
+    start = time.perf_counter()
+    from coupled_laplace import CoupledLaplaceParameters,CoupledLaplaceContext
+    parameters = CoupledLaplaceParameters(**defaultParameters)
+    parameters.Resolve()
+    workerState['defaultParameters'] = defaultParameters
+    workerState['context'] = CoupledLaplaceContext(parameters.PetscOptionsGet(),parameters.diagnostics)
+    workerState['startupTime'] = time.perf_counter()-start
+    workerState['numberOfCases'] = 0
+
+# Convert NumPy arrays and scalars in a result to lists and floats for JSON. NaN (a node another rank owns) becomes None.
+def JsonValueGet(value):
+    if isinstance(value,dict):
+        return { key : JsonValueGet(item) for key,item in value.items() }
+    if isinstance(value,(list,tuple)):
+        return [JsonValueGet(item) for item in value]
+    if hasattr(value,'tolist'):
+        return JsonValueGet(value.tolist())
+    if isinstance(value,float) and value != value:
+        return None
+    return value
+
+# Run one case in the worker's context. Returns the result of the case, with the error if the case failed. A case that
+# needs other PETSc options than the worker's context was created with, from the defaults, is rejected by the problem.
+def CaseRun(indexedCase):
+    from coupled_laplace import CoupledLaplaceParameters,CoupledLaplaceProblem
+    from profiling import PhaseProfiler
+    caseIdx,case,keepSolutions = indexedCase
+    result = { 'index' : caseIdx,
+               'case' : case,
+               'worker' : os.getpid() }
+    start = time.perf_counter()
+    profiler = PhaseProfiler()
+    laplaceProblem = None
+    try:
+        parameters = dict(workerState['defaultParameters'])
+        parameters.update(case)
+        laplaceProblem = CoupledLaplaceProblem(CoupledLaplaceParameters(**parameters),workerState['context'],profiler)
+        laplaceProblem.Build()
+        laplaceProblem.Solve()
+        if (laplaceProblem.parameters.postProcessing):
+            result['postProcessing'] = JsonValueGet(laplaceProblem.PostProcess())
+        if keepSolutions:
+            result['solutions'] = JsonValueGet(laplaceProblem.SolutionGet())
+        result['numberOfDofs'] = laplaceProblem.numberOfDofs
+    except Exception as error:
+        result['error'] = str(error)
+    finally:
+        if laplaceProblem is not None:
+            try:
+                laplaceProblem.Teardown()
+            except Exception as error:
+                result.setdefault('error',str(error))
+    result['phases'] = { phase['name'] : phase['wallTime'] for phase in profiler.phases }
+    result['caseTime'] = time.perf_counter()-start
+    result['workerStartupTime'] = workerState['startupTime'] if workerState['numberOfCases'] == 0 else 0.0
+    workerState['numberOfCases'] += 1
+    return result
+
+#================================================================================================================================
+#  Streams
+#================================================================================================================================
+
+# The cases of a JSON lines stream, one parameters object per line, skipping blank lines
+def CasesRead(casesFile,keepSolutions):
+    for lineNumber,line in enumerate(casesFile,1):
+        if not line.strip():
+            continue
+        case = json.loads(line)
+        if not isinstance(case,dict):
+            raise ValueError('Line {0:d} of the cases is not a JSON object of parameters.'.format(lineNumber))
+        yield (lineNumber-1,case,keepSolutions)
+
+# Summarise the results of an ensemble: the number of cases, the throughput and the case time percentiles
+def ResultsSummarise(caseTimes,numberOfErrors,wallTime):
+    summary = { 'numberOfCases' : len(caseTimes),
+                'numberOfErrors' : numberOfErrors,
+                'wallTime' : wallTime,
+                'casesPerSecond' : len(caseTimes)/wallTime if wallTime > 0.0 else None }
+    if caseTimes:
+        sortedCaseTimes = sorted(caseTimes)
+        summary['medianCaseTime'] = statistics.median(sortedCaseTimes)
+        summary['p95CaseTime'] = sortedCaseTimes[min(len(sortedCaseTimes)-1,int(0.95*len(sortedCaseTimes)))]
+        summary['maximumCaseTime'] = sortedCaseTimes[-1]
+    return summary
+
+def EnsembleRun(arguments,casesFile,resultsFile):
+    defaultParameters = dict(ENSEMBLE_PARAMETERS)
+    defaultParameters.update(json.loads(arguments.parameters))
+    # The workers run in scratch directories so a telemetry file is kept where the ensemble was started
+    telemetryDestination = defaultParameters.get('telemetryDestination')
+    if telemetryDestination is not None and '://' not in telemetryDestination:
+        defaultParameters['telemetryDestination'] = os.path.abspath(telemetryDestination)
+    caseTimes = []
+    numberOfErrors = 0
+    scratchDirectory = tempfile.mkdtemp(prefix='coupled_laplace_ensemble_')
+    start = time.perf_counter()
+    try:
+        with multiprocessing.Pool(arguments.processes,WorkerInitialise,
+                                  (defaultParameters,scratchDirectory,arguments.worker_output)) as pool:
+            for result in pool.imap_unordered(CaseRun,CasesRead(casesFile,arguments.solutions),arguments.chunk_size):
+                resultsFile.write(json.dumps(result)+'\n')
+                resultsFile.flush()
+                caseTimes.append(result['caseTime'])
+                if 'error' in result:
+                    numberOfErrors += 1
+    finally:
+        shutil.rmtree(scratchDirectory,ignore_errors=True)
+    return ResultsSummarise(caseTimes,numberOfErrors,time.perf_counter()-start)
+
+#================================================================================================================================
+#  Ensemble runner
+#================================================================================================================================
+
+def ArgumentParserCreate():
+    parser = argparse.ArgumentParser(description='Run an ensemble of independent coupled Laplace cases over a process pool.')
+    parser.add_argument('--cases',default='-',help='JSON lines file of the cases, one object of parameters per line (- for stdin).')
+    parser.add_argument('--output',default='-',help='JSON lines file to stream the results to (- for stdout).')
+    parser.add_argument('--processes',type=int,default=os.cpu_count(),help='Number of worker processes.')
+    parser.add_argument('--parameters',default='{}',help='JSON object of the default parameters of all the cases.')
+    parser.add_argument('--no-solutions',action='store_false',dest='solutions',help='Leave the solution arrays out of the results.')
+    parser.add_argument('--chunk-size',type=int,default=1,help='Number of cases handed to a worker at a time.')
+    parser.add_argument('--worker-output',help='Directory to write the output of each worker to instead of discarding it.')
+    return parser
+
+if __name__ == '__main__':
+    arguments = ArgumentParserCreate().parse_args()
+    casesFile = sys.stdin if arguments.cases == '-' else open(arguments.cases)
+    resultsFile = sys.stdout if arguments.output == '-' else open(arguments.output,'w')
+    with casesFile,resultsFile:
+        summary = EnsembleRun(arguments,casesFile,resultsFile)
+    # Keep the summary off a results stream on stdout
+    summaryFile = sys.stderr if arguments.output == '-' else sys.stdout
+    print('Cases = {0:d} ({1:d} failed)'.format(summary['numberOfCases'],summary['numberOfErrors']),file=summaryFile)
+    print('Wall time = {0:.4f}'.format(summary['wallTime']),file=summaryFile)
+    if summary['casesPerSecond'] is not None:
+        print('Cases per second = {0:.4f}'.format(summary['casesPerSecond']),file=summaryFile)
+    if summary['numberOfCases'] > 0:
+        print('Case time: median = {0:.4f}, p95 = {1:.4f}, max = {2:.4f}'.format(summary['medianCaseTime'],
+              summary['p95CaseTime'],summary['maximumCaseTime']),file=summaryFile)
+    sys.exit(1 if summary['numberOfErrors'] > 0 else 0)
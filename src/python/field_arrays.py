@@ -0,0 +1,197 @@
+#> NumPy views of field parameter sets and vectorised post-processing for the coupled Laplace example.
+#>
+#> FieldParameterSetView gives the local DOFs of a field parameter set as a NumPy array backed directly by the
+#> OpenCMISS storage, with no per-node getter calls and no copy. The view is only valid inside the with block.
+#>
+#> FieldDofMap maps between the global nodes and the local DOFs this rank owns. It is built once from the DOF labels
+#> written by field_export.FieldDofLabelsSet. Owned DOFs only are mapped, so reductions over them count every DOF once
+#> across the ranks. Post-processing such as norms, interface continuity and interface flux then works on whole arrays
+#> in-process. Reductions across ranks use mpi4py when it is available. FieldNodeValuesSet writes node values back
+#> through a view, e.g. to change boundary values between solves.
+#>
+
+import contextlib
+import numpy
+
+from opencmiss.opencmiss import OpenCMISS_Python as oc
+
+from field_export import DOF_LABEL_SET_TYPE
+from profiling import WorldCommunicatorGet
+
+# Weights of the closed Newton-Cotes rules for 2, 3 and 4 nodes per element, i.e., the integrals of the linear,
+# quadratic and cubic Lagrange basis functions over a unit element
+NEWTON_COTES_WEIGHTS = { 2 : [1.0/2.0,1.0/2.0],
+                         3 : [1.0/6.0,4.0/6.0,1.0/6.0],
+                         4 : [1.0/8.0,3.0/8.0,3.0/8.0,1.0/8.0] }
+
+# Integrals of the linear, quadratic and cubic triangle basis functions over a unit area triangle at the vertices, the
+# edge nodes and the centroid
+TRIANGLE_WEIGHTS = { 2 : (1.0/3.0,None,None),
+                     3 : (0.0,1.0/3.0,None),
+                     4 : (1.0/30.0,3.0/40.0,9.0/20.0) }
+
+#================================================================================================================================
+#  Views and maps
+#================================================================================================================================
+
+# View the local DOFs of a parameter set of a field variable as a NumPy array backed by the field storage
+@contextlib.contextmanager
+def FieldParameterSetView(field,fieldSetType=oc.FieldParameterSetTypes.VALUES,variableType=oc.FieldVariableTypes.U):
+    view = field.ParameterSetDataGetDP(variableType,fieldSetType)
+    try:
+        yield numpy.asarray(view)
+    finally:
+        field.ParameterSetDataRestoreDP(variableType,fieldSetType,view)
+
+class FieldDofMap(object):
+    """Map between the global nodes and derivatives and the owned local DOFs of a labelled field"""
+
+    def __init__(self,field,numberOfNodes,numberOfDerivatives):
+        with FieldParameterSetView(field,DOF_LABEL_SET_TYPE) as labels:
+            self.localDofs = numpy.flatnonzero(labels > 0.5)
+            dofLabels = numpy.rint(labels[self.localDofs]).astype(numpy.int64)-1
+        self.numberOfNodes = numberOfNodes
+        self.numberOfDerivatives = numberOfDerivatives
+        self.nodes = dofLabels//numberOfDerivatives+1
+        self.derivatives = dofLabels%numberOfDerivatives+1
+        # Local DOF of each (node, derivative), -1 if the DOF is not owned by this rank
+        self.nodeLocalDofs = numpy.full((numberOfNodes+1,numberOfDerivatives),-1,dtype=numpy.int64)
+        self.nodeLocalDofs[self.nodes,self.derivatives-1] = self.localDofs
+
+    # Local DOFs of a derivative of an array of nodes, -1 where this rank does not own the node
+    def LocalDofsGet(self,nodes,derivative=1):
+        return self.nodeLocalDofs[numpy.asarray(nodes,dtype=numpy.int64),derivative-1]
+
+    # Values of the owned DOFs of a derivative (all derivatives if derivative is None)
+    def OwnedValuesGet(self,values,derivative=None):
+        if derivative is None:
+            return values[self.localDofs]
+        return values[self.localDofs[self.derivatives == derivative]]
+
+    # Values of a derivative at an array of nodes, NaN where this rank does not own the node
+    def NodeValuesGet(self,values,nodes,derivative=1):
+        localDofs = self.LocalDofsGet(nodes,derivative)
+        nodeValues = numpy.full(localDofs.shape,numpy.nan)
+        owned = localDofs >= 0
+        nodeValues[owned] = values[localDofs[owned]]
+        return nodeValues
+
+#================================================================================================================================
+#  Reductions across ranks
+#================================================================================================================================
+
+# Combine per-rank arrays of node values that are NaN where a rank does not own the node into the global array. Each
+# node is owned by exactly one rank. Without mpi4py the values of the other ranks stay NaN.
+def NodeValuesGather(nodeValues,communicator=None):
+    if communicator is None:
+        communicator = WorldCommunicatorGet()
+    if communicator is None or communicator.Get_size() == 1:
+        return nodeValues
+    owned = ~numpy.isnan(nodeValues)
+    values = numpy.where(owned,nodeValues,0.0)
+    counts = owned.astype(numpy.int64)
+    globalValues = numpy.empty_like(values)
+    globalCounts = numpy.empty_like(counts)
+    communicator.Allreduce(values,globalValues)
+    communicator.Allreduce(counts,globalCounts)
+    globalValues[globalCounts == 0] = numpy.nan
+    return globalValues
+
+# Sum of each of a list of local scalars over the ranks
+def ScalarsSum(scalars,communicator=None):
+    if communicator is None:
+        communicator = WorldCommunicatorGet()
+    scalars = numpy.asarray(scalars,dtype=numpy.float64)
+    if communicator is None or communicator.Get_size() == 1:
+        return scalars
+    globalScalars = numpy.empty_like(scalars)
+    communicator.Allreduce(scalars,globalScalars)
+    return globalScalars
+
+#================================================================================================================================
+#  Post-processing
+#================================================================================================================================
+
+# Discrete norms of the owned DOF values of a field over all ranks
+def ValuesNormsCalculate(ownedValues,communicator=None):
+    if communicator is None:
+        communicator = WorldCommunicatorGet()
+    sumOfSquares,numberOfValues = ScalarsSum([numpy.dot(ownedValues,ownedValues),ownedValues.shape[0]],communicator)
+    maximum = float(numpy.max(numpy.abs(ownedValues))) if ownedValues.shape[0] > 0 else 0.0
+    if communicator is not None and communicator.Get_size() > 1:
+        maximum = communicator.allreduce(maximum,op=max)
+    norms = {}
+    norms['l2'] = float(numpy.sqrt(sumOfSquares))
+    norms['rms'] = float(numpy.sqrt(sumOfSquares/numberOfValues)) if numberOfValues > 0 else 0.0
+    norms['max'] = maximum
+    return norms
+
+# Integration weights of the value DOFs of the nodes of a line of numberOfElements elements of length elementLength
+# with numberOfNodesXi nodes each, i.e., the integrals of the nodal basis functions. For cubic Hermite
+# (numberOfNodesXi = 2) the derivative basis functions integrate to zero in the interior and are not included.
+def LineWeightsCalculate(numberOfElements,numberOfNodesXi,elementLength):
+    elementWeights = numpy.array(NEWTON_COTES_WEIGHTS[numberOfNodesXi])*elementLength
+    weights = numpy.zeros(numberOfElements*(numberOfNodesXi-1)+1)
+    for localNodeIdx in range(numberOfNodesXi):
+        weights[localNodeIdx:localNodeIdx+numberOfElements*(numberOfNodesXi-1):numberOfNodesXi-1] += \
+            elementWeights[localNodeIdx]
+    return weights
+
+# Integration weights of the interface nodes for an interface with numberOfElements elements in each interface
+# direction of the given lengths. The weights are ordered as the interface nodes, the first direction fastest.
+def InterfaceWeightsCalculate(numberOfElements,numberOfNodesXi,lengths):
+    weights = numpy.ones(1)
+    for elementsXi,lengthXi in zip(numberOfElements,lengths):
+        weights = numpy.outer(LineWeightsCalculate(elementsXi,numberOfNodesXi,lengthXi/elementsXi),weights).ravel()
+    return weights
+
+# Integration weights of the nodes of an interface of triangles with numberOfNodesXi nodes along each edge. nodeCoordinates
+# is the (nodes, coordinates) array of the node positions and elementNodes the (elements, element nodes) array of the
+# node numbers of each triangle with its three vertices first. The other nodes are told apart by their position.
+def TriangleWeightsCalculate(nodeCoordinates,elementNodes,numberOfNodesXi):
+    vertexWeight,edgeWeight,centroidWeight = TRIANGLE_WEIGHTS[numberOfNodesXi]
+    elementCoordinates = nodeCoordinates[elementNodes-1]
+    vertices = elementCoordinates[:,:3,:]
+    areas = 0.5*numpy.linalg.norm(numpy.cross(vertices[:,1,:]-vertices[:,0,:],vertices[:,2,:]-vertices[:,0,:]),axis=1)
+    localWeights = numpy.full(elementNodes.shape,edgeWeight if edgeWeight is not None else 0.0)
+    localWeights[:,:3] = vertexWeight
+    if centroidWeight is not None:
+        centroids = numpy.mean(vertices,axis=1)
+        atCentroid = numpy.all(numpy.isclose(elementCoordinates,centroids[:,None,:]),axis=2)
+        localWeights[atCentroid] = centroidWeight
+    weights = numpy.zeros(nodeCoordinates.shape[0])
+    numpy.add.at(weights,elementNodes-1,localWeights*areas[:,None])
+    return weights
+
+# Total flux through the interface, the integral of the Lagrange multipliers over the interface, summed over the ranks
+def InterfaceFluxCalculate(lagrangeDofMap,lagrangeValues,interfaceWeights,communicator=None):
+    nodes = numpy.arange(1,interfaceWeights.shape[0]+1)
+    nodeValues = lagrangeDofMap.NodeValuesGet(lagrangeValues,nodes)
+    owned = ~numpy.isnan(nodeValues)
+    return float(ScalarsSum([numpy.dot(nodeValues[owned],interfaceWeights[owned])],communicator)[0])
+
+# Jump in the solution across the interface between the matching nodes of the two regions. Returns the max and rms of
+# the jump over the interface nodes.
+def InterfaceJumpCalculate(dofMap1,values1,interfaceNodes1,dofMap2,values2,interfaceNodes2,communicator=None):
+    jump = NodeValuesGather(dofMap1.NodeValuesGet(values1,interfaceNodes1),communicator)- \
+           NodeValuesGather(dofMap2.NodeValuesGet(values2,interfaceNodes2),communicator)
+    jump = jump[~numpy.isnan(jump)]
+    if jump.shape[0] == 0:
+        return { 'max' : None, 'rms' : None }
+    return { 'max' : float(numpy.max(numpy.abs(jump))), 'rms' : float(numpy.sqrt(numpy.mean(jump*jump))) }
+
+#================================================================================================================================
+#  Updates
+#================================================================================================================================
+
+# Set the values of a derivative at an array of nodes of a field variable through a view of the parameter set and
+# update the ghost DOFs of the other ranks. Only the nodes this rank owns are set. The DOF map is that of the U variable,
+# the other variables of a field are laid out the same.
+def FieldNodeValuesSet(field,dofMap,nodes,values,derivative=1,fieldSetType=oc.FieldParameterSetTypes.VALUES,
+                       variableType=oc.FieldVariableTypes.U):
+    localDofs = dofMap.LocalDofsGet(nodes,derivative)
+    owned = localDofs >= 0
+    with FieldParameterSetView(field,fieldSetType,variableType) as fieldValues:
+        fieldValues[localDofs[owned]] = numpy.broadcast_to(values,localDofs.shape)[owned]
+    field.ParameterSetUpdateStart(variableType,fieldSetType)
+    field.ParameterSetUpdateFinish(variableType,fieldSetType)
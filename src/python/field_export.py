@@ -0,0 +1,146 @@
+#> Binary export of field values for the coupled Laplace example.
+#>
+#> Every rank writes the values of the nodes it owns to its own NumPy .npy file, <filename>.part<rank>.npy, in
+#> parallel with the other ranks. The files hold a structured array of (node, derivative, value) records so they can be
+#> memory mapped with numpy.load(..., mmap_mode='r'). Rank 0 also writes a small JSON index, <filename>.index.json,
+#> describing the partitions.
+#>
+#> The export streams: the local DOFs are walked in fixed-size chunks through a pipeline of generators and each chunk
+#> is written as soon as it is made, so the memory used by the export is bounded by the chunk size and does not grow
+#> with the mesh. The field values are read through views of the OpenCMISS parameter set storage rather
+#> than copies.
+#>
+
+import json,os
+import numpy
+
+from opencmiss.opencmiss import OpenCMISS_Python as oc
+
+DOF_RECORD_TYPE = numpy.dtype([('node',numpy.int64),('derivative',numpy.int32),('value',numpy.float64)])
+
+# Parameter set used to label the local DOFs of a field with their node and derivative. It is not used by the
+# static Laplace problem.
+DOF_LABEL_SET_TYPE = oc.FieldParameterSetTypes.INITIAL_VALUES
+
+DEFAULT_CHUNK_SIZE = 65536
+
+#================================================================================================================================
+#  Local DOF labels
+#================================================================================================================================
+
+# Label the DOFs of the nodes this rank owns in component 1 of the U variable of a nodally interpolated field with
+# (node-1)*numberOfDerivatives+derivative. The labels are not updated onto the ghost DOFs so they stay zero, which
+# marks them as not owned.
+def FieldDofLabelsSet(field,decomposition,numberOfNodes,numberOfDerivatives,computationalNodeNumber):
+    field.ParameterSetCreate(oc.FieldVariableTypes.U,DOF_LABEL_SET_TYPE)
+    for nodeNumber in range(1,numberOfNodes+1):
+        if (decomposition.NodeDomainGet(1,nodeNumber) != computationalNodeNumber):
+            continue
+        for derivative in range(1,numberOfDerivatives+1):
+            field.ParameterSetUpdateNodeDP(oc.FieldVariableTypes.U,DOF_LABEL_SET_TYPE,1,derivative,nodeNumber,1,
+                                           float((nodeNumber-1)*numberOfDerivatives+derivative))
+
+#================================================================================================================================
+#  Streaming pipeline
+#================================================================================================================================
+
+# Generate (start,stop) views of the local DOFs of the label and values parameter sets in chunks. The parameter set
+# storage is viewed, not copied, and restored once the chunks have been consumed.
+def ParameterSetChunksGenerate(field,fieldSetTypes,chunkSize=DEFAULT_CHUNK_SIZE):
+    views = []
+    try:
+        for fieldSetType in fieldSetTypes:
+            views.append((fieldSetType,field.ParameterSetDataGetDP(oc.FieldVariableTypes.U,fieldSetType)))
+        arrays = [numpy.asarray(view) for fieldSetType,view in views]
+        numberOfDofs = arrays[0].shape[0]
+        for start in range(0,numberOfDofs,chunkSize):
+            yield [array[start:start+chunkSize] for array in arrays]
+    finally:
+        for fieldSetType,view in views:
+            field.ParameterSetDataRestoreDP(oc.FieldVariableTypes.U,fieldSetType,view)
+
+# Generate chunks of (node, derivative, value) records for the owned DOFs of a labelled field
+def FieldRecordChunksGenerate(field,numberOfDerivatives,chunkSize=DEFAULT_CHUNK_SIZE):
+    for labels,values in ParameterSetChunksGenerate(field,[DOF_LABEL_SET_TYPE,oc.FieldParameterSetTypes.VALUES],chunkSize):
+        owned = labels > 0.5
+        dofLabels = numpy.rint(labels[owned]).astype(numpy.int64)-1
+        records = numpy.empty(dofLabels.shape[0],dtype=DOF_RECORD_TYPE)
+        records['node'] = dofLabels//numberOfDerivatives+1
+        records['derivative'] = dofLabels%numberOfDerivatives+1
+        records['value'] = values[owned]
+        yield records
+
+# Count the owned DOFs of a labelled field
+def FieldOwnedDofsCount(field,chunkSize=DEFAULT_CHUNK_SIZE):
+    numberOfOwnedDofs = 0
+    for labels, in ParameterSetChunksGenerate(field,[DOF_LABEL_SET_TYPE],chunkSize):
+        numberOfOwnedDofs += int(numpy.count_nonzero(labels > 0.5))
+    return numberOfOwnedDofs
+
+# Gather the (node, derivative, value) records of the owned DOFs of a labelled field into a single array
+def FieldRecordsGet(field,numberOfDerivatives,chunkSize=DEFAULT_CHUNK_SIZE):
+    recordChunks = list(FieldRecordChunksGenerate(field,numberOfDerivatives,chunkSize))
+    if not recordChunks:
+        return numpy.empty(0,dtype=DOF_RECORD_TYPE)
+    return numpy.concatenate(recordChunks)
+
+# Write numberOfRecords records arriving in chunks to a .npy file. Returns the number of bytes written.
+def RecordChunksWrite(filename,recordChunks,numberOfRecords):
+    with open(filename,'wb') as npyFile:
+        numpy.lib.format.write_array_header_1_0(npyFile,{ 'descr' : numpy.lib.format.dtype_to_descr(DOF_RECORD_TYPE),
+                                                          'fortran_order' : False,
+                                                          'shape' : (numberOfRecords,) })
+        numberOfRecordsWritten = 0
+        for records in recordChunks:
+            npyFile.write(records.tobytes())
+            numberOfRecordsWritten += records.shape[0]
+    if (numberOfRecordsWritten != numberOfRecords):
+        raise RuntimeError('Expected to write {0:d} records to {1:s} but {2:d} were written.'. \
+                           format(numberOfRecords,filename,numberOfRecordsWritten))
+    return os.path.getsize(filename)
+
+#================================================================================================================================
+#  Export
+#================================================================================================================================
+
+# Stream the values of the owned DOFs of the U variable of a labelled field to <filename>.part<rank>.npy and, on
+# rank 0, write the partition index. Returns the number of bytes written by this rank.
+def FieldBinaryExport(filename,field,numberOfDerivatives,computationalNodeNumber,numberOfComputationalNodes,
+                      chunkSize=DEFAULT_CHUNK_SIZE):
+    partFilename = filename+'.part{0:d}.npy'.format(computationalNodeNumber)
+    numberOfBytes = RecordChunksWrite(partFilename,FieldRecordChunksGenerate(field,numberOfDerivatives,chunkSize),
+                                      FieldOwnedDofsCount(field,chunkSize))
+    if (computationalNodeNumber == 0):
+        numberOfBytes += IndexWrite(filename,numberOfComputationalNodes)
+    return numberOfBytes
+
+# Write the JSON index describing the partitions of a binary export. Returns the number of bytes written.
+def IndexWrite(filename,numberOfComputationalNodes):
+    index = { 'format' : 'npy',
+              'recordType' : [(name,DOF_RECORD_TYPE[name].str) for name in DOF_RECORD_TYPE.names],
+              'numberOfParts' : numberOfComputationalNodes,
+              'parts' : [os.path.basename(filename)+'.part{0:d}.npy'.format(partIdx) \
+                         for partIdx in range(numberOfComputationalNodes)] }
+    with open(filename+'.index.json','w') as indexFile:
+        json.dump(index,indexFile,indent=2)
+        indexFile.write('\n')
+    return os.path.getsize(filename+'.index.json')
+
+# Read a binary export back in as a single record array sorted by node and derivative. To work on an export too large
+# to read in, memory map its parts with numpy.load(part,mmap_mode='r') instead.
+def FieldBinaryRead(filename):
+    with open(filename+'.index.json') as indexFile:
+        index = json.load(indexFile)
+    directory = os.path.dirname(filename)
+    parts = [numpy.load(os.path.join(directory,part)) for part in index['parts']]
+    records = numpy.concatenate(parts)
+    return records[numpy.lexsort((records['derivative'],records['node']))]
+
+# Number of bytes in the text export files of this rank
+def TextExportSizeGet(filename,computationalNodeNumber):
+    numberOfBytes = 0
+    for extension in ['exnode','exelem']:
+        partFilename = filename+'.part{0:d}.'.format(computationalNodeNumber)+extension
+        if os.path.exists(partFilename):
+            numberOfBytes += os.path.getsize(partFilename)
+    return numberOfBytes
@@ -0,0 +1,67 @@
+#> Interface mesh connectivity for the coupled Laplace example.
+#>
+#> The connectivity of the interface to the coupled meshes is calculated for all interface elements at once as NumPy
+#> arrays: the interface element numbers, the numbers of the coupled mesh elements they map to and an
+#> (elements, interface element nodes, coupled mesh xi) tensor of the xi location in the coupled mesh element of each
+#> node of each interface element. The arrays are then applied to an OpenCMISS interface mesh connectivity in one call.
+#>
+
+import numpy
+
+# Calculate the xi coordinates of the nodes of a tensor product interface element with numberOfNodesXi nodes in each
+# of numberOfInterfaceDimensions directions. The first xi direction varies fastest. Returns a (nodes, xi) array.
+def InterfaceElementNodesXiCalculate(numberOfInterfaceDimensions,numberOfNodesXi):
+    localXi = numpy.linspace(0.0,1.0,numberOfNodesXi)
+    nodesXi = numpy.meshgrid(*([localXi]*numberOfInterfaceDimensions),indexing='ij')
+    return numpy.stack([nodesXi[xiIdx].ravel(order='F') for xiIdx in range(numberOfInterfaceDimensions)],axis=1)
+
+# Calculate the connectivity of the interface between two regular generated meshes with numberOfGlobalElements
+# elements that are placed side by side in the x direction, i.e., the interface is the x = 1 face of mesh 1 and the
+# x = 0 face of mesh 2. The interface elements are numbered in the y direction then the z direction.
+#
+# Returns (interfaceElementNumbers,mesh1ElementNumbers,mesh1Xi,mesh2ElementNumbers,mesh2Xi).
+def GeneratedInterfaceConnectivityCalculate(numberOfGlobalElements,numberOfNodesXi):
+    numberOfDimensions = len(numberOfGlobalElements)
+    numberOfGlobalXElements = numberOfGlobalElements[0]
+    numberOfGlobalYElements = numberOfGlobalElements[1]
+    if (numberOfDimensions == 2):
+        numberOfGlobalZElements = 1
+    else:
+        numberOfGlobalZElements = numberOfGlobalElements[2]
+    zElementIdx,yElementIdx = numpy.meshgrid(numpy.arange(1,numberOfGlobalZElements+1),
+                                             numpy.arange(1,numberOfGlobalYElements+1),indexing='ij')
+    yElementIdx = yElementIdx.ravel()
+    zElementIdx = zElementIdx.ravel()
+    interfaceElementNumbers = yElementIdx+(zElementIdx-1)*numberOfGlobalYElements
+    mesh1ElementNumbers = yElementIdx*numberOfGlobalXElements+(zElementIdx-1)*numberOfGlobalXElements*numberOfGlobalYElements
+    mesh2ElementNumbers = 1+(yElementIdx-1)*numberOfGlobalXElements+ \
+                          (zElementIdx-1)*numberOfGlobalXElements*numberOfGlobalYElements
+    # The interface xi directions are the y and z xi directions of the coupled elements
+    nodesXi = InterfaceElementNodesXiCalculate(numberOfDimensions-1,numberOfNodesXi)
+    numberOfInterfaceElements = interfaceElementNumbers.shape[0]
+    mesh1Xi = numpy.empty((numberOfInterfaceElements,nodesXi.shape[0],numberOfDimensions))
+    mesh1Xi[:,:,0] = 1.0
+    mesh1Xi[:,:,1:] = nodesXi
+    mesh2Xi = numpy.empty((numberOfInterfaceElements,nodesXi.shape[0],numberOfDimensions))
+    mesh2Xi[:,:,0] = 0.0
+    mesh2Xi[:,:,1:] = nodesXi
+    return (interfaceElementNumbers,mesh1ElementNumbers,mesh1Xi,mesh2ElementNumbers,mesh2Xi)
+
+# Apply the mapping of the interface elements onto the elements of the coupled mesh meshIndex. xi is an
+# (elements, interface element nodes, coupled mesh xi) array. OpenCMISS only has per-element setters so the arrays
+# are converted to Python lists once here and the setters are called from a single tight loop.
+def InterfaceMeshConnectivitySet(interfaceMeshConnectivity,meshIndex,interfaceElementNumbers,coupledElementNumbers,xi):
+    interfaceElementNumbers = numpy.asarray(interfaceElementNumbers,dtype=numpy.int64)
+    coupledElementNumbers = numpy.asarray(coupledElementNumbers,dtype=numpy.int64)
+    xi = numpy.asarray(xi,dtype=numpy.float64)
+    if (interfaceElementNumbers.shape != coupledElementNumbers.shape or xi.ndim != 3 or
+        xi.shape[0] != interfaceElementNumbers.shape[0]):
+        raise ValueError('Inconsistent interface connectivity arrays: {0} interface elements, {1} coupled elements '
+                         'and a {2} xi array.'.format(interfaceElementNumbers.shape,coupledElementNumbers.shape,xi.shape))
+    elementNumberSet = interfaceMeshConnectivity.ElementNumberSet
+    elementXiSet = interfaceMeshConnectivity.ElementXiSet
+    for interfaceElementNumber,coupledElementNumber,elementXi in zip(interfaceElementNumbers.tolist(),
+                                                                     coupledElementNumbers.tolist(),xi.tolist()):
+        elementNumberSet(interfaceElementNumber,meshIndex,coupledElementNumber)
+        for localNodeIdx,nodeXi in enumerate(elementXi):
+            elementXiSet(interfaceElementNumber,meshIndex,coupledElementNumber,localNodeIdx+1,1,nodeXi)
@@ -0,0 +1,277 @@
+#> Geometric detection of the interface connectivity between coupled meshes.
+#>
+#> Rather than relying on the element numbering of the generated meshes the interface elements are matched to the
+#> faces of the coupled mesh elements geometrically. The centroids of the element faces of the coupled mesh are put in
+#> a k-d tree (or a spatial hash if SciPy is not available) and the centroid of each interface element is looked up in
+#> it, so the matching is O(n log n) (O(n) for the hash) in the number of elements. The xi location of each interface
+#> node in the matched coupled element is then found by inverting the multilinear geometric map of the element, or
+#> for simplex elements from the area coordinates of the node.
+#>
+#> The meshes are described by NumPy arrays (see MeshArrays) so imported meshes can be coupled by handing over the
+#> same node coordinates and element nodes that were used to create them.
+#>
+
+import itertools,math
+import numpy
+
+try:
+    from scipy.spatial import cKDTree
+except ImportError:
+    cKDTree = None
+
+#================================================================================================================================
+#  Mesh arrays
+#================================================================================================================================
+
+# Number of nodes of a simplex element of numberOfXi xi directions with numberOfNodesXi nodes along each edge
+def SimplexNumberOfNodesGet(numberOfXi,numberOfNodesXi):
+    return math.comb(numberOfNodesXi-1+numberOfXi,numberOfXi)
+
+# The nodes and elements of a tensor product (Lagrange/Hermite) or simplex mesh.
+#
+#   nodeCoordinates   (nodes, coordinates) array of the node positions
+#   elementNodes      (elements, element nodes) array of the node numbers of each element, with the first xi direction
+#                     varying fastest (tensor product) or the xi+1 vertices first (simplex)
+#   numberOfNodesXi   number of element nodes in each xi direction (along each edge for a simplex)
+#   elementNumbers    element numbers of the rows of elementNodes (default 1..elements)
+#   nodeNumbers       node numbers of the rows of nodeCoordinates (default 1..nodes)
+#   simplex           whether the elements are simplices (lines, triangles or tetrahedra)
+class MeshArrays(object):
+
+    def __init__(self,nodeCoordinates,elementNodes,numberOfNodesXi,elementNumbers=None,nodeNumbers=None,simplex=False):
+        self.nodeCoordinates = numpy.asarray(nodeCoordinates,dtype=numpy.float64)
+        self.elementNodes = numpy.asarray(elementNodes,dtype=numpy.int64)
+        self.numberOfNodesXi = numberOfNodesXi
+        self.simplex = simplex
+        if simplex:
+            numberOfXis = [numberOfXi for numberOfXi in range(1,4) \
+                           if SimplexNumberOfNodesGet(numberOfXi,numberOfNodesXi) == self.elementNodes.shape[1]]
+            if not numberOfXis:
+                raise ValueError('Elements with {0:d} nodes are not simplex elements with {1:d} nodes along each '
+                                 'edge.'.format(self.elementNodes.shape[1],numberOfNodesXi))
+            self.numberOfXi = numberOfXis[0]
+        else:
+            self.numberOfXi = int(round(numpy.log(self.elementNodes.shape[1])/numpy.log(numberOfNodesXi)))
+            if (numberOfNodesXi**self.numberOfXi != self.elementNodes.shape[1]):
+                raise ValueError('Elements with {0:d} nodes are not tensor product elements with {1:d} nodes in each '
+                                 'xi direction.'.format(self.elementNodes.shape[1],numberOfNodesXi))
+        if elementNumbers is None:
+            elementNumbers = numpy.arange(1,self.elementNodes.shape[0]+1)
+        self.elementNumbers = numpy.asarray(elementNumbers,dtype=numpy.int64)
+        if nodeNumbers is None:
+            nodeNumbers = numpy.arange(1,self.nodeCoordinates.shape[0]+1)
+        self.nodeNumbers = numpy.asarray(nodeNumbers,dtype=numpy.int64)
+
+    # Coordinates of the nodes of each element as an (elements, element nodes, coordinates) array
+    def ElementNodeCoordinatesGet(self,elementNodes=None):
+        if elementNodes is None:
+            elementNodes = self.elementNodes
+        sortedIdx = numpy.argsort(self.nodeNumbers)
+        nodeIdx = sortedIdx[numpy.searchsorted(self.nodeNumbers,elementNodes,sorter=sortedIdx)]
+        if not numpy.array_equal(self.nodeNumbers[nodeIdx],elementNodes):
+            raise ValueError('Elements reference nodes that are not in the mesh.')
+        return self.nodeCoordinates[nodeIdx]
+
+    # Local node numbers (zero based) of the 2^xi corner nodes of the elements, with the first xi direction varying
+    # fastest, or the xi+1 vertices of simplex elements. Also returns the (corners, xi) corner xi coordinates.
+    def CornerNodesGet(self):
+        if self.simplex:
+            # Vertex k has area coordinate L(k) = 1 and xi(j) = 1 - L(j) for j <= xi
+            cornersXi = numpy.vstack([1.0-numpy.eye(self.numberOfXi),numpy.ones((1,self.numberOfXi))])
+            return numpy.arange(self.numberOfXi+1),cornersXi
+        cornersXi = numpy.array(list(itertools.product([0,1],repeat=self.numberOfXi)))[:,::-1]
+        localNodes = numpy.zeros(cornersXi.shape[0],dtype=numpy.int64)
+        for xiIdx in range(self.numberOfXi):
+            localNodes += cornersXi[:,xiIdx]*(self.numberOfNodesXi-1)*self.numberOfNodesXi**xiIdx
+        return localNodes,cornersXi.astype(numpy.float64)
+
+# Calculate the arrays of a regular generated mesh with the same node and element numbering as
+# GeneratedMeshTypes.REGULAR. The mesh xi directions follow the coordinate directions that have a non-zero extent,
+# e.g., an interface mesh with origin [width,0,0] and extent [0,height,length] lies in the y-z plane at x = width.
+def GeneratedMeshArraysCalculate(origin,extent,numberOfElements,numberOfNodesXi):
+    origin = numpy.asarray(origin,dtype=numpy.float64)
+    extent = numpy.asarray(extent,dtype=numpy.float64)
+    numberOfXi = len(numberOfElements)
+    xiCoordinates = numpy.nonzero(extent)[0]
+    if (xiCoordinates.shape[0] != numberOfXi):
+        raise ValueError('The extent {0} does not span {1:d} xi directions.'.format(extent.tolist(),numberOfXi))
+    numberOfNodes = [count*(numberOfNodesXi-1)+1 for count in numberOfElements]
+    # Node coordinates, first direction varying fastest
+    latticeIdx = numpy.meshgrid(*[numpy.arange(count) for count in numberOfNodes],indexing='ij')
+    latticeIdx = [idx.ravel(order='F') for idx in latticeIdx]
+    nodeCoordinates = numpy.tile(origin,(latticeIdx[0].shape[0],1))
+    for xiIdx,coordinateIdx in enumerate(xiCoordinates):
+        nodeCoordinates[:,coordinateIdx] += latticeIdx[xiIdx]*extent[coordinateIdx]/(numberOfNodes[xiIdx]-1)
+    # Element nodes, first direction varying fastest for both the elements and the element nodes
+    elementIdx = numpy.meshgrid(*[numpy.arange(count) for count in numberOfElements],indexing='ij')
+    elementIdx = [idx.ravel(order='F') for idx in elementIdx]
+    localIdx = numpy.meshgrid(*([numpy.arange(numberOfNodesXi)]*numberOfXi),indexing='ij')
+    localIdx = [idx.ravel(order='F') for idx in localIdx]
+    elementNodes = numpy.zeros((elementIdx[0].shape[0],localIdx[0].shape[0]),dtype=numpy.int64)
+    stride = 1
+    for xiIdx in range(numberOfXi):
+        elementNodes += (elementIdx[xiIdx][:,None]*(numberOfNodesXi-1)+localIdx[xiIdx][None,:])*stride
+        stride *= numberOfNodes[xiIdx]
+    return MeshArrays(nodeCoordinates,elementNodes+1,numberOfNodesXi)
+
+# The arrays of a generated simplex mesh. The generated mesh splits every cell of the same node lattice as
+# GeneratedMeshArraysCalculate into simplices and numbers them itself, so the element nodes are read back through
+# meshElements (the MeshElements of the mesh) while the node coordinates are those of the lattice.
+def GeneratedSimplexMeshArraysGet(meshElements,numberOfElements,origin,extent,numberOfLatticeElements,numberOfNodesXi):
+    latticeArrays = GeneratedMeshArraysCalculate(origin,extent,numberOfLatticeElements,numberOfNodesXi)
+    numberOfElementNodes = SimplexNumberOfNodesGet(len(numberOfLatticeElements),numberOfNodesXi)
+    nodesGet = meshElements.NodesGet
+    elementNodes = numpy.array([nodesGet(elementNumber,numberOfElementNodes) \
+                                for elementNumber in range(1,numberOfElements+1)],dtype=numpy.int64)
+    return MeshArrays(latticeArrays.nodeCoordinates,elementNodes,numberOfNodesXi,simplex=True)
+
+#================================================================================================================================
+#  Multilinear geometric map
+#================================================================================================================================
+
+# Multilinear basis functions of the corners and their xi derivatives at the (points, xi) locations xi
+def MultilinearBasisEvaluate(xi,cornersXi):
+    # (points, corners, xi) factors xi or 1-xi for each corner
+    factors = numpy.where(cornersXi[None,:,:] == 1.0,xi[:,None,:],1.0-xi[:,None,:])
+    signs = numpy.where(cornersXi == 1.0,1.0,-1.0)
+    basis = numpy.prod(factors,axis=2)
+    derivatives = numpy.empty(factors.shape)
+    for xiIdx in range(xi.shape[1]):
+        otherFactors = numpy.delete(factors,xiIdx,axis=2)
+        derivatives[:,:,xiIdx] = signs[None,:,xiIdx]*numpy.prod(otherFactors,axis=2)
+    return basis,derivatives
+
+# Find the xi locations of the (points, coordinates) positions x in the elements with (points, corners, coordinates)
+# corner positions by Newton iteration on the multilinear map. Works for elements of lower dimension than the
+# coordinates (e.g. faces) in the least squares sense.
+def MultilinearXiCalculate(x,cornerCoordinates,cornersXi,initialXi,maximumIterations=20,tolerance=1.0e-12):
+    xi = numpy.array(initialXi,dtype=numpy.float64)
+    for iteration in range(maximumIterations):
+        basis,derivatives = MultilinearBasisEvaluate(xi,cornersXi)
+        residual = numpy.einsum('pc,pcd->pd',basis,cornerCoordinates)-x
+        jacobian = numpy.einsum('pci,pcd->pdi',derivatives,cornerCoordinates)
+        delta = numpy.linalg.solve(numpy.einsum('pdi,pdj->pij',jacobian,jacobian),
+                                   numpy.einsum('pdi,pd->pi',jacobian,residual)[:,:,None])[:,:,0]
+        xi -= delta
+        if (numpy.max(numpy.abs(delta)) < tolerance):
+            break
+    # Remove round off at the element boundaries
+    xi[numpy.abs(xi) < 1.0e-10] = 0.0
+    xi[numpy.abs(xi-1.0) < 1.0e-10] = 1.0
+    return xi
+
+# Find the xi locations of the (points, coordinates) positions x in the simplex elements with (points, vertices,
+# coordinates) vertex positions. The map is affine so the area coordinates L are found directly (in the least squares
+# sense for faces) and xi(j) = 1 - L(j) for j <= xi, the OpenCMISS simplex xi coordinates.
+def SimplexXiCalculate(x,vertexCoordinates):
+    edges = vertexCoordinates[:,:-1,:]-vertexCoordinates[:,-1:,:]
+    areaCoordinates = numpy.linalg.solve(numpy.einsum('pid,pjd->pij',edges,edges),
+                                         numpy.einsum('pid,pd->pi',edges,x-vertexCoordinates[:,-1,:])[:,:,None])[:,:,0]
+    xi = 1.0-areaCoordinates
+    # Remove round off at the element boundaries
+    xi[numpy.abs(xi) < 1.0e-10] = 0.0
+    xi[numpy.abs(xi-1.0) < 1.0e-10] = 1.0
+    return xi
+
+#================================================================================================================================
+#  Face matching
+#================================================================================================================================
+
+# Enumerate the 2*xi faces of every element. Returns the (faces,) element row of each face, the (faces,) xi
+# direction normal to the face, the (faces,) xi value of the face (0 or 1) and the (faces, coordinates) face centroids.
+# Simplex elements have xi+1 faces, one opposite each vertex, which are not faces of constant xi (direction -1).
+def ElementFacesCalculate(mesh):
+    localCornerNodes,cornersXi = mesh.CornerNodesGet()
+    cornerCoordinates = mesh.ElementNodeCoordinatesGet(mesh.elementNodes[:,localCornerNodes])
+    numberOfElements = mesh.elementNodes.shape[0]
+    faceElements = []
+    faceXiDirections = []
+    faceXiValues = []
+    faceCentroids = []
+    if mesh.simplex:
+        for vertexIdx in range(mesh.numberOfXi+1):
+            faceElements.append(numpy.arange(numberOfElements))
+            faceXiDirections.append(numpy.full(numberOfElements,-1))
+            faceXiValues.append(numpy.full(numberOfElements,numpy.nan))
+            faceCentroids.append(numpy.mean(numpy.delete(cornerCoordinates,vertexIdx,axis=1),axis=1))
+        return (numpy.concatenate(faceElements),numpy.concatenate(faceXiDirections),numpy.concatenate(faceXiValues),
+                numpy.concatenate(faceCentroids))
+    for xiIdx in range(mesh.numberOfXi):
+        for xiValue in [0.0,1.0]:
+            faceCorners = numpy.nonzero(cornersXi[:,xiIdx] == xiValue)[0]
+            faceElements.append(numpy.arange(numberOfElements))
+            faceXiDirections.append(numpy.full(numberOfElements,xiIdx))
+            faceXiValues.append(numpy.full(numberOfElements,xiValue))
+            faceCentroids.append(numpy.mean(cornerCoordinates[:,faceCorners,:],axis=1))
+    return (numpy.concatenate(faceElements),numpy.concatenate(faceXiDirections),numpy.concatenate(faceXiValues),
+            numpy.concatenate(faceCentroids))
+
+# Find the nearest of the (candidates, coordinates) points to each of the (queries, coordinates) points. Returns the
+# index of the nearest candidate or -1 if there is none within tolerance.
+def NearestPointsFind(candidates,queries,tolerance):
+    if cKDTree is not None:
+        distances,indices = cKDTree(candidates).query(queries,distance_upper_bound=tolerance)
+        return numpy.where(numpy.isfinite(distances),indices,-1)
+    # Spatial hash with cells of size tolerance. A query can only match candidates in its own or neighbouring cells.
+    cellSize = tolerance
+    cells = {}
+    for candidateIdx,cell in enumerate(map(tuple,numpy.floor(candidates/cellSize).astype(numpy.int64).tolist())):
+        cells.setdefault(cell,[]).append(candidateIdx)
+    offsets = list(itertools.product([-1,0,1],repeat=candidates.shape[1]))
+    nearest = numpy.full(queries.shape[0],-1,dtype=numpy.int64)
+    queryCells = numpy.floor(queries/cellSize).astype(numpy.int64).tolist()
+    for queryIdx,queryCell in enumerate(queryCells):
+        nearestDistance = tolerance
+        for offset in offsets:
+            for candidateIdx in cells.get(tuple(cell+delta for cell,delta in zip(queryCell,offset)),[]):
+                distance = numpy.linalg.norm(candidates[candidateIdx]-queries[queryIdx])
+                if (distance <= nearestDistance):
+                    nearestDistance = distance
+                    nearest[queryIdx] = candidateIdx
+    return nearest
+
+# Characteristic length of a mesh, the smallest distance between the first two corners of its elements
+def MeshLengthScaleGet(mesh):
+    localCornerNodes,cornersXi = mesh.CornerNodesGet()
+    cornerCoordinates = mesh.ElementNodeCoordinatesGet(mesh.elementNodes[:,localCornerNodes[:2]])
+    return numpy.min(numpy.linalg.norm(cornerCoordinates[:,1,:]-cornerCoordinates[:,0,:],axis=1))
+
+# Detect the connectivity of an interface mesh to a coupled mesh. Every interface element must coincide with a face
+# of an element of the coupled mesh. relativeTolerance is relative to the smallest interface element size.
+#
+# Returns (interfaceElementNumbers,coupledElementNumbers,xi) in the form used by InterfaceMeshConnectivitySet.
+def InterfaceConnectivityDetect(interfaceMesh,coupledMesh,relativeTolerance=1.0e-6):
+    if (interfaceMesh.numberOfXi != coupledMesh.numberOfXi-1):
+        raise ValueError('A {0:d}D interface cannot be coupled to a {1:d}D mesh.'. \
+                         format(interfaceMesh.numberOfXi,coupledMesh.numberOfXi))
+    if (interfaceMesh.simplex != coupledMesh.simplex and interfaceMesh.numberOfXi > 1):
+        raise ValueError('Simplex and tensor product meshes cannot be coupled.')
+    tolerance = relativeTolerance*MeshLengthScaleGet(interfaceMesh)
+    faceElements,faceXiDirections,faceXiValues,faceCentroids = ElementFacesCalculate(coupledMesh)
+    interfaceCornerNodes,interfaceCornersXi = interfaceMesh.CornerNodesGet()
+    interfaceCentroids = numpy.mean(interfaceMesh.ElementNodeCoordinatesGet( \
+        interfaceMesh.elementNodes[:,interfaceCornerNodes]),axis=1)
+    matchedFaces = NearestPointsFind(faceCentroids,interfaceCentroids,tolerance)
+    unmatched = numpy.nonzero(matchedFaces < 0)[0]
+    if (unmatched.shape[0] > 0):
+        raise ValueError('{0:d} interface elements (e.g. element {1:d}) do not coincide with a face of the coupled '
+                         'mesh.'.format(unmatched.shape[0],interfaceMesh.elementNumbers[unmatched[0]]))
+    coupledElementRows = faceElements[matchedFaces]
+    # Find the xi location of every interface element node in its coupled element
+    numberOfInterfaceElements,numberOfInterfaceElementNodes = interfaceMesh.elementNodes.shape
+    interfaceNodeCoordinates = interfaceMesh.ElementNodeCoordinatesGet().reshape(-1,interfaceMesh.nodeCoordinates.shape[1])
+    coupledCornerNodes,coupledCornersXi = coupledMesh.CornerNodesGet()
+    coupledCornerCoordinates = coupledMesh.ElementNodeCoordinatesGet( \
+        coupledMesh.elementNodes[coupledElementRows][:,coupledCornerNodes])
+    coupledCornerCoordinates = numpy.repeat(coupledCornerCoordinates,numberOfInterfaceElementNodes,axis=0)
+    if coupledMesh.simplex:
+        xi = SimplexXiCalculate(interfaceNodeCoordinates,coupledCornerCoordinates)
+        xi = xi.reshape(numberOfInterfaceElements,numberOfInterfaceElementNodes,coupledMesh.numberOfXi)
+        return (interfaceMesh.elementNumbers,coupledMesh.elementNumbers[coupledElementRows],xi)
+    initialXi = numpy.full((interfaceNodeCoordinates.shape[0],coupledMesh.numberOfXi),0.5)
+    pointRows = numpy.repeat(numpy.arange(numberOfInterfaceElements),numberOfInterfaceElementNodes)
+    initialXi[numpy.arange(initialXi.shape[0]),faceXiDirections[matchedFaces][pointRows]] = \
+        faceXiValues[matchedFaces][pointRows]
+    xi = MultilinearXiCalculate(interfaceNodeCoordinates,coupledCornerCoordinates,coupledCornersXi,initialXi)
+    xi = xi.reshape(numberOfInterfaceElements,numberOfInterfaceElementNodes,coupledMesh.numberOfXi)
+    return (interfaceMesh.elementNumbers,coupledMesh.elementNumbers[coupledElementRows],xi)
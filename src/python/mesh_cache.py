@@ -0,0 +1,107 @@
+#> Persistent on-disk cache of mesh setup data for the coupled Laplace example.
+#>
+#> Entries are NumPy .npz files of named arrays keyed by a hash of the problem parameters that determine them. The
+#> cache is bounded in size: whenever an entry is stored the least recently used entries are evicted until the total
+#> size of the cache is within its limit. Entries are written to a temporary file and renamed into place so readers
+#> never see partial entries. An entry that cannot be read or lacks an expected array is removed and counts as a miss.
+#>
+#> The ranks of a parallel run must agree on whether an entry is in the cache, even when their views of the cache
+#> directory differ, so rank 0 loads the entry and broadcasts it to the other ranks.
+#>
+
+import glob,hashlib,json,os,tempfile,zipfile
+import numpy
+
+from profiling import WorldCommunicatorGet
+
+CACHE_FORMAT_VERSION = 1
+
+DEFAULT_MAXIMUM_BYTES = 1024**3
+
+# Hash a dictionary of (JSON serialisable) parameters into a cache key
+def CacheKeyCalculate(parameters):
+    parameters = dict(parameters,cacheFormatVersion=CACHE_FORMAT_VERSION)
+    return hashlib.sha256(json.dumps(parameters,sort_keys=True).encode('utf-8')).hexdigest()
+
+class MeshCache(object):
+
+    def __init__(self,directory,maximumBytes=DEFAULT_MAXIMUM_BYTES):
+        self.directory = directory
+        self.maximumBytes = maximumBytes
+        os.makedirs(directory,exist_ok=True)
+
+    def EntryFilenameGet(self,key):
+        return os.path.join(self.directory,key+'.npz')
+
+    # Load the arrays of an entry. Returns None if the entry is not in the cache. An entry that is corrupt or does not
+    # hold all of the arrays in names is removed and also returns None.
+    def Load(self,key,names=None):
+        filename = self.EntryFilenameGet(key)
+        try:
+            with numpy.load(filename) as entry:
+                arrays = { name : entry[name] for name in entry.files }
+        except FileNotFoundError:
+            return None
+        except (IOError,OSError,ValueError,EOFError,zipfile.BadZipFile):
+            self.Remove(key)
+            return None
+        if (names is not None and any(name not in arrays for name in names)):
+            self.Remove(key)
+            return None
+        # Mark the entry as recently used
+        try:
+            os.utime(filename,None)
+        except OSError:
+            pass
+        return arrays
+
+    # Load an entry on rank 0 and broadcast it to the other ranks so they all see the same entry, or all miss. A run on
+    # more than one rank without mpi4py cannot share an entry and always misses.
+    def SharedLoad(self,key,names,computationalNodeNumber,numberOfComputationalNodes):
+        if (numberOfComputationalNodes == 1):
+            return self.Load(key,names)
+        communicator = WorldCommunicatorGet()
+        if communicator is None:
+            return None
+        arrays = self.Load(key,names) if computationalNodeNumber == 0 else None
+        return communicator.bcast(arrays,root=0)
+
+    # Remove an entry, if it is still there
+    def Remove(self,key):
+        try:
+            os.remove(self.EntryFilenameGet(key))
+        except OSError:
+            pass
+
+    # Store the arrays of an entry and evict the least recently used entries if the cache is over its size limit
+    def Store(self,key,arrays):
+        fileDescriptor,temporaryFilename = tempfile.mkstemp(dir=self.directory,suffix='.tmp')
+        try:
+            with os.fdopen(fileDescriptor,'wb') as temporaryFile:
+                numpy.savez(temporaryFile,**arrays)
+            os.replace(temporaryFilename,self.EntryFilenameGet(key))
+        except:
+            os.remove(temporaryFilename)
+            raise
+        self.Evict(keep=key)
+
+    # Remove the least recently used entries until the cache fits in maximumBytes. The entry keep is never removed.
+    def Evict(self,keep=None):
+        entries = []
+        for filename in glob.glob(os.path.join(self.directory,'*.npz')):
+            try:
+                status = os.stat(filename)
+            except OSError:
+                continue
+            entries.append((status.st_mtime,status.st_size,filename))
+        totalBytes = sum(size for modifiedTime,size,filename in entries)
+        for modifiedTime,size,filename in sorted(entries):
+            if (totalBytes <= self.maximumBytes):
+                break
+            if (keep is not None and filename == self.EntryFilenameGet(keep)):
+                continue
+            try:
+                os.remove(filename)
+            except OSError:
+                continue
+            totalBytes -= size
@@ -0,0 +1,121 @@
+#> Partitioned Dirichlet-Neumann coupling of the regions of the coupled Laplace example.
+#>
+#> Instead of one monolithic system with Lagrange multipliers every region is solved as a problem of its own and the
+#> regions are coupled by iterating on the values of the interfaces. Interface i is the x+ face of region i and the x-
+#> face of region i+1. Region i takes the interface values as Dirichlet conditions and region i+1 takes the flux through
+#> the interface, equal and opposite to the reaction of region i at the fixed interface nodes, as Neumann point
+#> conditions. A sweep solves the regions along the strip in turn and the interface values are then updated from the
+#> solution of the regions after the interfaces:
+#>
+#>   g(k+1) = g(k) + omega(k)*(u(k) - g(k))
+#>
+#> with the relaxation omega either constant or from Aitken's dynamic relaxation of the last two residuals u(k) - g(k).
+#> Only the boundary values change between the solves, so with the factorisation reuse options each region is only
+#> factorised once.
+#>
+#> The interface values and fluxes are read and written through views of the field parameter sets and gathered across
+#> the ranks with mpi4py, which is needed on more than one rank.
+#>
+
+import time
+import numpy
+
+from opencmiss.opencmiss import OpenCMISS_Python as oc
+
+from field_arrays import FieldParameterSetView,FieldNodeValuesSet,NodeValuesGather
+
+# Bounds the Aitken relaxation is kept within
+MINIMUM_RELAXATION = 0.01
+MAXIMUM_RELAXATION = 1.0
+
+class DirichletNeumannInterface(object):
+    """The interface between the fixed interface nodes of one region and the interface nodes of the next region that
+    are loaded with the flux through the interface"""
+
+    def __init__(self,dirichletField,dirichletDofMap,dirichletNodes,neumannField,neumannDofMap,neumannNodes):
+        self.dirichletField = dirichletField
+        self.dirichletDofMap = dirichletDofMap
+        self.dirichletNodes = numpy.asarray(dirichletNodes,dtype=numpy.int64)
+        self.neumannField = neumannField
+        self.neumannDofMap = neumannDofMap
+        self.neumannNodes = numpy.asarray(neumannNodes,dtype=numpy.int64)
+        self.numberOfNodes = self.dirichletNodes.shape[0]
+
+    # Fix the interface nodes of the region before the interface to the interface values
+    def ValuesSet(self,values):
+        FieldNodeValuesSet(self.dirichletField,self.dirichletDofMap,self.dirichletNodes,values)
+
+    # Solution at the interface nodes of the region after the interface
+    def ValuesGet(self,communicator=None):
+        with FieldParameterSetView(self.neumannField) as values:
+            nodeValues = self.neumannDofMap.NodeValuesGet(values,self.neumannNodes)
+        return NodeValuesGather(nodeValues,communicator)
+
+    # Reactions at the fixed interface nodes of the region before the interface
+    def FluxesGet(self,communicator=None):
+        with FieldParameterSetView(self.dirichletField,variableType=oc.FieldVariableTypes.DELUDELN) as fluxes:
+            nodeFluxes = self.dirichletDofMap.NodeValuesGet(fluxes,self.dirichletNodes)
+        return NodeValuesGather(nodeFluxes,communicator)
+
+    # Load the interface nodes of the region after the interface with the opposite of the reactions
+    def FluxesSet(self,fluxes):
+        FieldNodeValuesSet(self.neumannField,self.neumannDofMap,self.neumannNodes,-fluxes,
+                           variableType=oc.FieldVariableTypes.DELUDELN)
+
+# Aitken's dynamic relaxation from the relaxation of the last update and the residuals before and after it
+def AitkenRelaxationCalculate(relaxation,residual,previousResidual):
+    difference = residual-previousResidual
+    denominator = numpy.dot(difference,difference)
+    if (denominator <= 0.0):
+        return relaxation
+    relaxation = -relaxation*numpy.dot(previousResidual,difference)/denominator
+    return float(min(max(relaxation,MINIMUM_RELAXATION),MAXIMUM_RELAXATION))
+
+# Solve the region problems, in order along the strip, coupled through interfaces[i] between problems[i] and
+# problems[i+1] until the rms of the interface residual is within tolerance. monitor, if given, is called with the record
+# of each iteration.
+#
+# Returns (converged,history) with a record of the iteration, residual norm, relaxation and time of each iteration.
+def DirichletNeumannSolve(problems,interfaces,tolerance=1.0e-6,maximumIterations=100,relaxation=0.5,
+                          acceleration='aitken',monitor=None,communicator=None):
+    interfaceValues = [numpy.zeros(interface.numberOfNodes) for interface in interfaces]
+    previousResidual = None
+    history = []
+    converged = False
+    for iteration in range(1,maximumIterations+1):
+        start = time.perf_counter()
+        fluxes = None
+        for problemIdx,problem in enumerate(problems):
+            if (problemIdx > 0):
+                interfaces[problemIdx-1].FluxesSet(fluxes)
+            if (problemIdx < len(interfaces)):
+                interfaces[problemIdx].ValuesSet(interfaceValues[problemIdx])
+            problem.Solve()
+            if (problemIdx < len(interfaces)):
+                fluxes = interfaces[problemIdx].FluxesGet(communicator)
+        residual = numpy.concatenate([interface.ValuesGet(communicator)-values \
+                                      for interface,values in zip(interfaces,interfaceValues)])
+        if (previousResidual is not None and acceleration == 'aitken'):
+            relaxation = AitkenRelaxationCalculate(relaxation,residual,previousResidual)
+        residualNorm = float(numpy.sqrt(numpy.mean(residual*residual))) if residual.shape[0] > 0 else 0.0
+        record = { 'iteration' : iteration,
+                   'residualNorm' : residualNorm,
+                   'relaxation' : relaxation,
+                   'time' : time.perf_counter()-start }
+        history.append(record)
+        if monitor is not None:
+            monitor(record)
+        if (residualNorm <= tolerance):
+            converged = True
+            break
+        offset = 0
+        for values in interfaceValues:
+            values += relaxation*residual[offset:offset+values.shape[0]]
+            offset += values.shape[0]
+        previousResidual = residual
+    return (converged,history)
+
+# Print the record of an iteration, for monitoring the convergence
+def CouplingRecordPrint(record):
+    print('Coupling iteration %d: residual = %e, relaxation = %f, time = %3.4f' \
+          %(record['iteration'],record['residualNorm'],record['relaxation'],record['time']))
@@ -0,0 +1,134 @@
+#> Helpers for passing options through to the PETSc solvers underneath OpenCMISS.
+#>
+#> OpenCMISS calls KSPSetFromOptions after it has configured each linear solver so anything in the PETSC_OPTIONS
+#> environment variable is applied on top of the OpenCMISS settings. The options must be set before the OpenCMISS
+#> context is created as that is when PETSc is initialised.
+#>
+
+import os,re
+
+# Set the PETSc options database environment variable to the options it had followed by options. Returns the value it
+# had, None if it was not set, to restore with PetscOptionsRestore.
+def PetscOptionsSet(options):
+    originalOptions = os.environ.get('PETSC_OPTIONS')
+    if options:
+        os.environ['PETSC_OPTIONS'] = ' '.join((originalOptions or '').split()+list(options))
+    return originalOptions
+
+# Restore the PETSc options database environment variable to the value returned by PetscOptionsSet
+def PetscOptionsRestore(originalOptions):
+    if originalOptions is None:
+        os.environ.pop('PETSC_OPTIONS',None)
+    else:
+        os.environ['PETSC_OPTIONS'] = originalOptions
+
+# Options to write the residual norm of each Krylov iteration to a file
+def ResidualHistoryOptionsGet(filename):
+    return ['-ksp_monitor','ascii:'+filename,'-ksp_converged_reason']
+
+# Options to keep the factorisation (or preconditioner) of the first solve for the later solves. The coupled matrix does
+# not change between solves that only change boundary values, so later solves are just forward/back substitutions.
+def FactorisationReuseOptionsGet():
+    return ['-ksp_reuse_preconditioner']
+
+residualNormPattern = re.compile(r'^\s*(\d+)\s+KSP\s+.*[Rr]esid(?:ual)? norm\s+([-+0-9.eEnaif]+)')
+
+# Read the residual history written by -ksp_monitor. Returns the list of residual norms of the last solve.
+def ResidualHistoryRead(filename):
+    residuals = []
+    if not os.path.exists(filename):
+        return residuals
+    with open(filename) as historyFile:
+        for line in historyFile:
+            match = residualNormPattern.match(line)
+            if match is None:
+                continue
+            if int(match.group(1)) == 0:
+                residuals = []
+            residuals.append(float(match.group(2)))
+    return residuals
+
+# Options to write the PETSc view of the outer Krylov solver, its preconditioner and its matrix to a file after every
+# solve. For a MUMPS direct solve the view includes the MUMPS statistics of the factorisation.
+def SolverViewOptionsGet(filename):
+    return ['-ksp_view','ascii:'+filename]
+
+# The MUMPS statistics in the view of a direct solver and the names they are reported under. The memory is in MB.
+MUMPS_STATISTICS = { 'INFOG(16)' : 'estimatedMemoryMaximum',
+                     'INFOG(17)' : 'estimatedMemoryTotal',
+                     'INFOG(18)' : 'allocatedMemoryMaximum',
+                     'INFOG(19)' : 'allocatedMemoryTotal',
+                     'INFOG(20)' : 'estimatedFactorEntries',
+                     'INFOG(21)' : 'usedMemoryMaximum',
+                     'INFOG(22)' : 'usedMemoryTotal',
+                     'INFOG(28)' : 'nullPivots',
+                     'INFOG(29)' : 'factorEntries',
+                     'RINFOG(1)' : 'estimatedFlops',
+                     'RINFOG(3)' : 'factorisationFlops' }
+
+mumpsStatisticPattern = re.compile(r'^\s*(R?INFOG\(\d+\)).*:\s*([-+0-9.eE]+)\s*$')
+viewTypePattern = re.compile(r'^\s*type:\s*(\S+)')
+viewSizePattern = re.compile(r'rows=(\d+)')
+viewNonzerosPattern = re.compile(r'total: nonzeros=(\d+)')
+
+# Read the view written by -ksp_view. Returns the Krylov and preconditioner types, the rows and nonzeros of the matrix
+# and the MUMPS statistics of the last solve in the file, or an empty dict if there is no view.
+def SolverViewRead(filename):
+    if not os.path.exists(filename):
+        return {}
+    with open(filename) as viewFile:
+        lines = viewFile.read().splitlines()
+    # The view of each solve starts with an unindented KSP header, the nested solvers of a preconditioner are indented
+    starts = [lineIdx for lineIdx,line in enumerate(lines) if line.startswith('KSP Object')]
+    if not starts:
+        return {}
+    lines = lines[starts[-1]:]
+    view = {}
+    # The first type after the KSP header is that of the Krylov solver and the first after the PC header that of its
+    # preconditioner
+    for name,header in [('kspType','KSP Object'),('pcType','PC Object')]:
+        headers = [lineIdx for lineIdx,line in enumerate(lines) if line.lstrip().startswith(header)]
+        if not headers:
+            continue
+        for line in lines[headers[0]:]:
+            match = viewTypePattern.match(line)
+            if match is not None:
+                view[name] = match.group(1)
+                break
+    # The matrix of the outer solver is viewed last
+    matrixLines = [lineIdx for lineIdx,line in enumerate(lines) if 'linear system matrix' in line]
+    if matrixLines:
+        matrixView = '\n'.join(lines[matrixLines[-1]:])
+        sizeMatch = viewSizePattern.search(matrixView)
+        nonzerosMatch = viewNonzerosPattern.search(matrixView)
+        if sizeMatch is not None:
+            view['rows'] = int(sizeMatch.group(1))
+        if nonzerosMatch is not None:
+            view['nonzeros'] = int(nonzerosMatch.group(1))
+    mumps = {}
+    for line in lines:
+        match = mumpsStatisticPattern.match(line)
+        if match is not None and match.group(1) in MUMPS_STATISTICS:
+            mumps[MUMPS_STATISTICS[match.group(1)]] = float(match.group(2))
+    if mumps:
+        view['mumps'] = mumps
+    return view
+
+# Options for a Schur complement field split preconditioner of the Lagrange multiplier saddle point system
+#
+#   [ K  B^T ]   K = blockdiag(K1,K2), the two Laplace stiffness matrices
+#   [ B  0   ]   B = the interface coupling of the Lagrange multipliers
+#
+# The splits are detected from the zero diagonal of the Lagrange multiplier block. The Laplace block is preconditioned
+# with blockPreconditioner (K1 and K2 are uncoupled so e.g. AMG treats them independently) and the Schur complement
+# S = -B diag(K)^-1 B^T is assembled from the diagonal of K and preconditioned with Jacobi.
+def FieldSplitOptionsGet(blockPreconditioner='gamg'):
+    return ['-pc_type','fieldsplit',
+            '-pc_fieldsplit_detect_saddle_point',
+            '-pc_fieldsplit_type','schur',
+            '-pc_fieldsplit_schur_fact_type','lower',
+            '-pc_fieldsplit_schur_precondition','selfp',
+            '-fieldsplit_0_ksp_type','preonly',
+            '-fieldsplit_0_pc_type',blockPreconditioner,
+            '-fieldsplit_1_ksp_type','preonly',
+            '-fieldsplit_1_pc_type','jacobi']
@@ -0,0 +1,133 @@
+#> Placement of the subdomains of the coupled Laplace example onto the ranks.
+#>
+#> The regions of a strip are given to contiguous groups of ranks: with at least as many ranks as regions each region
+#> gets its own group and its elements are split between the ranks of the group in slabs along x, and with fewer ranks
+#> than regions neighbouring regions share a rank. A group with more ranks than slabs splits the slabs as well. The
+#> elements of each interface are placed on the ranks that own the elements of the region before it that they couple
+#> to, so the interface terms are assembled without communication.
+#>
+#> With co-located placement the regions are partitioned by the decomposer first and the elements of each interface
+#> then follow the partitioned region elements they couple to.
+#>
+#> The element domains are returned as NumPy arrays, indexed by element number - 1, to be applied to user defined
+#> decompositions.
+#>
+#> The communication volume of a placement is reported per rank as the ghost nodes of the meshes, the nodes a rank
+#> needs for its elements that are owned by another rank, and the interface elements whose coupled mesh element is on
+#> another rank.
+#>
+
+import numpy
+
+# Contiguous groups of ranks for each of numberOfRegions regions. Returns a list of arrays of ranks.
+def RegionRanksCalculate(numberOfRegions,numberOfRanks):
+    if (numberOfRanks >= numberOfRegions):
+        return [numpy.arange(regionIdx*numberOfRanks//numberOfRegions,(regionIdx+1)*numberOfRanks//numberOfRegions)
+                for regionIdx in range(numberOfRegions)]
+    return [numpy.array([regionIdx*numberOfRanks//numberOfRegions]) for regionIdx in range(numberOfRegions)]
+
+# Domains of the elements of a regular generated mesh with numberOfGlobalElements elements in each direction (x fastest)
+# split into slabs along x between ranks. For meshes numbered otherwise, e.g. simplex meshes, elementXIdx gives the x
+# index of the lattice cell of each element.
+def SlabElementDomainsCalculate(numberOfGlobalElements,ranks,elementXIdx=None):
+    numberOfGlobalXElements = numberOfGlobalElements[0]
+    if elementXIdx is None:
+        numberOfElements = int(numpy.prod(numberOfGlobalElements))
+        elementXIdx = numpy.arange(numberOfElements)%numberOfGlobalXElements
+    if (ranks.shape[0] <= numberOfGlobalXElements):
+        return ranks[elementXIdx*ranks.shape[0]//numberOfGlobalXElements]
+    # With more ranks than slabs a slab would leave ranks without elements, so the elements are split evenly between
+    # the ranks in x order instead
+    numberOfElements = elementXIdx.shape[0]
+    elementDomains = numpy.empty(numberOfElements,dtype=ranks.dtype)
+    elementDomains[numpy.argsort(elementXIdx,kind='stable')] = \
+        ranks[numpy.arange(numberOfElements)*ranks.shape[0]//numberOfElements]
+    return elementDomains
+
+# Domains of the interface elements placed with the coupled mesh elements they map onto
+def CoupledElementDomainsCalculate(interfaceElementNumbers,coupledElementNumbers,coupledElementDomains):
+    interfaceElementDomains = numpy.empty(interfaceElementNumbers.shape[0],dtype=coupledElementDomains.dtype)
+    interfaceElementDomains[numpy.asarray(interfaceElementNumbers)-1] = \
+        coupledElementDomains[numpy.asarray(coupledElementNumbers)-1]
+    return interfaceElementDomains
+
+# Domains of the interface elements co-located with the elements of a partitioned coupled mesh they map onto
+def ColocatedElementDomainsGet(interfaceElementNumbers,coupledElementNumbers,coupledDecomposition):
+    elementDomainGet = coupledDecomposition.ElementDomainGet
+    coupledElementDomains = numpy.array([elementDomainGet(elementNumber) \
+                                         for elementNumber in numpy.asarray(coupledElementNumbers).tolist()],dtype=numpy.int64)
+    interfaceElementDomains = numpy.empty(coupledElementDomains.shape[0],dtype=numpy.int64)
+    interfaceElementDomains[numpy.asarray(interfaceElementNumbers)-1] = coupledElementDomains
+    return interfaceElementDomains
+
+# Element domains of the regions and interfaces of a strip. interfaceConnectivities is a list of
+# (interfaceElementNumbers,mesh1ElementNumbers) of each interface. Returns (regionElementDomains,interfaceElementDomains).
+def StripElementDomainsCalculate(numberOfRegions,numberOfGlobalElements,numberOfRanks,interfaceConnectivities,
+                                 elementXIdx=None):
+    regionElementDomains = [SlabElementDomainsCalculate(numberOfGlobalElements,ranks,elementXIdx) \
+                            for ranks in RegionRanksCalculate(numberOfRegions,numberOfRanks)]
+    interfaceElementDomains = [CoupledElementDomainsCalculate(interfaceElementNumbers,mesh1ElementNumbers,
+                                                              regionElementDomains[interfaceIdx]) \
+                               for interfaceIdx,(interfaceElementNumbers,mesh1ElementNumbers) \
+                               in enumerate(interfaceConnectivities)]
+    return (regionElementDomains,interfaceElementDomains)
+
+#================================================================================================================================
+#  Communication volume
+#================================================================================================================================
+
+# Domains of elements 1..numberOfElements of a decomposition
+def DecompositionElementDomainsGet(decomposition,numberOfElements):
+    elementDomainGet = decomposition.ElementDomainGet
+    return numpy.array([elementDomainGet(elementNumber) for elementNumber in range(1,numberOfElements+1)],
+                       dtype=numpy.int64)
+
+# Domains of nodes 1..numberOfNodes of a decomposition
+def DecompositionNodeDomainsGet(decomposition,numberOfNodes):
+    nodeDomainGet = decomposition.NodeDomainGet
+    return numpy.array([nodeDomainGet(1,nodeNumber) for nodeNumber in range(1,numberOfNodes+1)],dtype=numpy.int64)
+
+# Ghost nodes of a partitioned mesh. elementNodes is the (elements, element nodes) array of node numbers. Returns the
+# number of ghost nodes of each rank and the (rank, owning rank) pairs they are received over.
+def GhostNodesCalculate(elementNodes,elementDomains,nodeDomains,numberOfRanks):
+    numberOfElementNodes = elementNodes.shape[1]
+    rankNodes = numpy.unique(numpy.stack([numpy.repeat(elementDomains,numberOfElementNodes),elementNodes.ravel()]),axis=1)
+    ranks = rankNodes[0]
+    owners = nodeDomains[rankNodes[1]-1]
+    ghost = owners != ranks
+    ghostNodes = numpy.bincount(ranks[ghost],minlength=numberOfRanks)
+    neighbours = numpy.unique(numpy.stack([ranks[ghost],owners[ghost]]),axis=1)
+    return ghostNodes,neighbours
+
+# Interface elements of each rank and those of them whose coupled mesh element is on another rank
+def RemoteCouplingsCalculate(interfaceElementNumbers,coupledElementNumbers,interfaceElementDomains,coupledElementDomains,
+                             numberOfRanks):
+    ranks = interfaceElementDomains[numpy.asarray(interfaceElementNumbers)-1]
+    remote = ranks != coupledElementDomains[numpy.asarray(coupledElementNumbers)-1]
+    return numpy.bincount(ranks,minlength=numberOfRanks),numpy.bincount(ranks[remote],minlength=numberOfRanks)
+
+# Communication volume of each rank. meshes is a list of (elementNodes,elementDomains,nodeDomains) of the region and
+# interface meshes and couplings a list of (interfaceElementNumbers,coupledElementNumbers,interfaceElementDomains,
+# coupledElementDomains) of each side of each interface. Returns a list of dictionaries, one for each rank.
+def CommunicationVolumeCalculate(meshes,couplings,numberOfRanks):
+    elements = numpy.zeros(numberOfRanks,dtype=numpy.int64)
+    ghostNodes = numpy.zeros(numberOfRanks,dtype=numpy.int64)
+    neighbours = [numpy.zeros((2,0),dtype=numpy.int64)]
+    for elementNodes,elementDomains,nodeDomains in meshes:
+        elements += numpy.bincount(elementDomains,minlength=numberOfRanks)
+        meshGhostNodes,meshNeighbours = GhostNodesCalculate(elementNodes,elementDomains,nodeDomains,numberOfRanks)
+        ghostNodes += meshGhostNodes
+        neighbours.append(meshNeighbours)
+    neighbourRanks = numpy.bincount(numpy.unique(numpy.concatenate(neighbours,axis=1),axis=1)[0],minlength=numberOfRanks)
+    interfaceElements = numpy.zeros(numberOfRanks,dtype=numpy.int64)
+    remoteCouplings = numpy.zeros(numberOfRanks,dtype=numpy.int64)
+    for coupling in couplings:
+        couplingElements,couplingRemote = RemoteCouplingsCalculate(*(coupling+(numberOfRanks,)))
+        interfaceElements += couplingElements
+        remoteCouplings += couplingRemote
+    return [ { 'rank' : rank,
+               'elements' : int(elements[rank]),
+               'ghostNodes' : int(ghostNodes[rank]),
+               'neighbourRanks' : int(neighbourRanks[rank]),
+               'interfaceCouplings' : int(interfaceElements[rank]),
+               'remoteInterfaceCouplings' : int(remoteCouplings[rank]) } for rank in range(numberOfRanks) ]
@@ -0,0 +1,152 @@
+#> Phase timing and memory instrumentation for the coupled Laplace example.
+#>
+#> Records the wall time, CPU time and peak resident set size of each named phase of the setup/solve pipeline and
+#> writes them out as a JSON report in which every quantity is reduced (min/max/mean) across the MPI ranks.
+#>
+#> If mpi4py is available the reduction is done in-process and rank 0 writes <filename>.json. Otherwise every rank
+#> writes its own <filename>.part<rank>.json and the parts can be reduced afterwards with
+#>
+#>   python profiling.py <filename>.json <filename>.part*.json
+#>
+
+import json,resource,sys,time
+
+#================================================================================================================================
+#  Helpers
+#================================================================================================================================
+
+# Peak resident set size of this process in bytes (ru_maxrss is in kilobytes on Linux and bytes on macOS)
+def PeakRssGet():
+    peakRss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        return int(peakRss)
+    return int(peakRss)*1024
+
+# Reduce a list of per-rank values to min/max/mean
+def ValuesReduce(values):
+    return { 'min' : min(values), 'max' : max(values), 'mean' : sum(values)/len(values) }
+
+# Get the mpi4py communicator if mpi4py is available. MPI has already been initialised by OpenCMISS so make sure
+# mpi4py neither initialises nor finalises it.
+def WorldCommunicatorGet():
+    try:
+        import mpi4py
+        mpi4py.rc.initialize = False
+        mpi4py.rc.finalize = False
+        from mpi4py import MPI
+    except ImportError:
+        return None
+    if not MPI.Is_initialized():
+        return None
+    return MPI.COMM_WORLD
+
+# Reduce the raw (unreduced) reports of all ranks into a single report
+def ReportsReduce(rankReports):
+    rankReports = sorted(rankReports,key=lambda rankReport: rankReport['rank'])
+    phaseNames = [phase['name'] for phase in rankReports[0]['phases']]
+    for rankReport in rankReports:
+        if [phase['name'] for phase in rankReport['phases']] != phaseNames:
+            raise ValueError('Rank {0:d} recorded a different sequence of phases to rank {1:d}.'. \
+                             format(rankReport['rank'],rankReports[0]['rank']))
+    report = {}
+    report['numberOfRanks'] = len(rankReports)
+    report['metadata'] = rankReports[0]['metadata']
+    report['phases'] = []
+    for phaseIdx,phaseName in enumerate(phaseNames):
+        phase = { 'name' : phaseName }
+        for quantity in ['wallTime','cpuTime','peakRss']:
+            phase[quantity] = ValuesReduce([rankReport['phases'][phaseIdx][quantity] for rankReport in rankReports])
+        report['phases'].append(phase)
+    report['total'] = {}
+    for quantity in ['wallTime','cpuTime']:
+        report['total'][quantity] = ValuesReduce([sum(phase[quantity] for phase in rankReport['phases']) \
+                                                  for rankReport in rankReports])
+    report['total']['peakRss'] = ValuesReduce([max([phase['peakRss'] for phase in rankReport['phases']]+[0]) \
+                                               for rankReport in rankReports])
+    return report
+
+#================================================================================================================================
+#  Phase profiler
+#================================================================================================================================
+
+class PhaseProfiler(object):
+
+    def __init__(self):
+        self.computationalNodeNumber = 0
+        self.numberOfComputationalNodes = 1
+        self.metadata = {}
+        self.phases = []
+        self.currentPhase = None
+
+    # Set the rank of this process and the number of ranks the report will be reduced across
+    def RankSet(self,computationalNodeNumber,numberOfComputationalNodes):
+        self.computationalNodeNumber = computationalNodeNumber
+        self.numberOfComputationalNodes = numberOfComputationalNodes
+
+    # Store a (JSON serialisable) value describing the run in the report
+    def MetadataSet(self,key,value):
+        self.metadata[key] = value
+
+    # Start timing a phase. Any phase still running is finished first.
+    def PhaseStart(self,name):
+        if self.currentPhase is not None:
+            self.PhaseFinish()
+        self.currentPhase = (name,time.perf_counter(),time.process_time())
+
+    # Finish timing the current phase
+    def PhaseFinish(self):
+        if self.currentPhase is None:
+            raise RuntimeError('No profiling phase has been started.')
+        name,wallStart,cpuStart = self.currentPhase
+        self.phases.append({ 'name' : name,
+                             'wallTime' : time.perf_counter()-wallStart,
+                             'cpuTime' : time.process_time()-cpuStart,
+                             'peakRss' : PeakRssGet() })
+        self.currentPhase = None
+
+    # Get the wall time of this rank for a finished phase
+    def PhaseWallTimeGet(self,name):
+        for phase in self.phases:
+            if phase['name'] == name:
+                return phase['wallTime']
+        raise KeyError('Profiling phase '+name+' has not been recorded.')
+
+    # The unreduced report of this rank
+    def RankReportGet(self):
+        return { 'rank' : self.computationalNodeNumber,
+                 'metadata' : self.metadata,
+                 'phases' : self.phases }
+
+    # Reduce the phases across the ranks and write the JSON report. Collective over all ranks.
+    def ReportWrite(self,filename):
+        if self.currentPhase is not None:
+            self.PhaseFinish()
+        rankReport = self.RankReportGet()
+        if self.numberOfComputationalNodes == 1:
+            ReportFileWrite(filename+'.json',ReportsReduce([rankReport]))
+            return
+        worldCommunicator = WorldCommunicatorGet()
+        if worldCommunicator is None:
+            ReportFileWrite(filename+'.part{0:d}.json'.format(self.computationalNodeNumber),rankReport)
+            return
+        rankReports = worldCommunicator.gather(rankReport,root=0)
+        if self.computationalNodeNumber == 0:
+            ReportFileWrite(filename+'.json',ReportsReduce(rankReports))
+
+def ReportFileWrite(filename,report):
+    with open(filename,'w') as reportFile:
+        json.dump(report,reportFile,indent=2)
+        reportFile.write('\n')
+
+#================================================================================================================================
+#  Offline reduction of per-rank reports
+#================================================================================================================================
+
+if __name__ == '__main__':
+    if len(sys.argv) < 3:
+        sys.exit('Usage: python profiling.py reducedReport.json rankReport.part0.json [rankReport.part1.json ...]')
+    rankReports = []
+    for rankReportFilename in sys.argv[2:]:
+        with open(rankReportFilename) as rankReportFile:
+            rankReports.append(json.load(rankReportFile))
+    ReportFileWrite(sys.argv[1],ReportsReduce(rankReports))
@@ -0,0 +1,219 @@
+#> Mesh refinement study for the coupled Laplace example.
+#>
+#> Runs coupled_laplace_equation.py on a sequence of meshes, doubling the element counts in every direction from one
+#> level to the next, for each of the chosen interpolation types. The solution of every level is exported in the binary
+#> format and compared against a reference at the nodes the level shares with the reference mesh:
+#>
+#>   finest   the finest level of the same interpolation type
+#>   linear   the linear solution of a strip with its x- face fixed to 0 and its x+ face fixed to 1. Every
+#>            interpolation type represents it exactly, so the errors should be round-off (a patch test).
+#>
+#> The max and rms errors of the solution and the jump across the interfaces (from the example's post-processing) are
+#> tabulated with the observed order of convergence between successive levels, next to the DOFs, setup time, solve time
+#> and peak memory of each level. With --target-error the cheapest level and interpolation type whose rms solution
+#> error is within the target is reported.
+#>
+#> Usage: python refinement_study.py [--elements 2x2x0] [--levels 4] [--interpolation-types 1 2]
+#>                                   [--reference finest|linear] [--number-of-regions 2] [--target-error 1e-4]
+#>                                   [--options "..."] [--output refinement.csv]
+#>
+
+import argparse,math,os,shlex,sys
+import numpy
+
+from bases import LINEAR_LAGRANGE,INTERPOLATION_TYPES,InterpolationNameGet,NumberOfNodesXiGet
+from benchmark_sweep import CaseRun,CsvWrite,ElementsParse,ReportSummarise
+from field_export import FieldBinaryRead
+
+# Width of each region of the example's strip
+REGION_WIDTH = 2.0
+
+#================================================================================================================================
+#  Solutions
+#================================================================================================================================
+
+# Element counts of a refinement level
+def LevelElementsGet(elements,level):
+    return tuple(count*2**level for count in elements)
+
+# Number of nodes in each direction of the lattice of a generated mesh. Directions without elements are left out.
+def LatticeNodesGet(elements,interpolationType):
+    return [count*(NumberOfNodesXiGet(interpolationType)-1)+1 for count in elements if count > 0]
+
+# Read the nodal values (derivative 1) of the regions from the binary export in a working directory. Returns a list of
+# arrays indexed by node number - 1.
+def SolutionRead(workingDirectory,numberOfRegions):
+    solutions = []
+    for regionIdx in range(numberOfRegions):
+        records = FieldBinaryRead(os.path.join(workingDirectory,'CoupledLaplace{0:d}'.format(regionIdx+1)))
+        records = records[records['derivative'] == 1]
+        values = numpy.full(int(records['node'].max()),numpy.nan)
+        values[records['node']-1] = records['value']
+        solutions.append(values)
+    return solutions
+
+# Node numbers of the nodes of a lattice at the given indices in each direction, x fastest
+def LatticeNodeNumbersGet(latticeNodes,directionIndices):
+    latticeIdx = numpy.meshgrid(*directionIndices,indexing='ij')
+    nodes = numpy.zeros(int(numpy.prod([len(indices) for indices in directionIndices])),dtype=numpy.int64)
+    stride = 1
+    for idx,count in zip(latticeIdx,latticeNodes):
+        nodes += idx.ravel(order='F')*stride
+        stride *= count
+    return nodes+1
+
+# Node numbers of a lattice refined refinement times in every direction at the nodes of the coarse lattice, in the
+# order of the coarse node numbers (x fastest)
+def RefinedNodesGet(coarseNodes,refinement):
+    fineNodes = [(count-1)*refinement+1 for count in coarseNodes]
+    return LatticeNodeNumbersGet(fineNodes,[numpy.arange(count)*refinement for count in coarseNodes])
+
+# The nodes of a lattice that coincide with nodes of another lattice over the same extent, e.g. of a different
+# interpolation type, and the node numbers of the nodes they coincide with. Returns (nodes,otherNodes).
+def CoincidentNodesGet(latticeNodes,otherLatticeNodes):
+    directionIndices = []
+    otherDirectionIndices = []
+    for count,otherCount in zip(latticeNodes,otherLatticeNodes):
+        scaledIdx = numpy.arange(count)*(otherCount-1)
+        coincident = scaledIdx%(count-1) == 0
+        directionIndices.append(numpy.arange(count)[coincident])
+        otherDirectionIndices.append(scaledIdx[coincident]//(count-1))
+    return (LatticeNodeNumbersGet(latticeNodes,directionIndices),
+            LatticeNodeNumbersGet(otherLatticeNodes,otherDirectionIndices))
+
+# Linear solution of a strip of regions fixed to 0 on its x- face and 1 on its x+ face, at the nodes of a region
+def LinearSolutionCalculate(latticeNodes,regionIdx,numberOfRegions):
+    xIdx = numpy.arange(int(numpy.prod(latticeNodes)))%latticeNodes[0]
+    x = REGION_WIDTH*(regionIdx+xIdx/float(latticeNodes[0]-1))
+    return x/(REGION_WIDTH*numberOfRegions)
+
+# Max and rms of the error of a solution against a reference
+def ErrorNormsCalculate(values,referenceValues):
+    error = values-referenceValues
+    error = error[~numpy.isnan(error)]
+    return { 'max' : float(numpy.max(numpy.abs(error))), 'rms' : float(numpy.sqrt(numpy.mean(error*error))) }
+
+# Observed order of convergence between successive levels of halved element size
+def ObservedOrdersCalculate(errors):
+    orders = [None]
+    for coarseError,fineError in zip(errors[:-1],errors[1:]):
+        if coarseError is None or fineError is None or coarseError <= 0.0 or fineError <= 0.0:
+            orders.append(None)
+        else:
+            orders.append(math.log(coarseError/fineError)/math.log(2.0))
+    return orders
+
+#================================================================================================================================
+#  Study
+#================================================================================================================================
+
+def LevelsRun(interpolationType,arguments):
+    extraArguments = ['--number-of-regions',str(arguments.number_of_regions),'--export','solution',
+                      '--export-format','binary','--post-processing']+shlex.split(arguments.options)
+    if (arguments.reference == 'linear'):
+        extraArguments += ['--boundary-face','1:x-=0.0','--boundary-face','{0:d}:x+=1.0'.format(arguments.number_of_regions)]
+    launcher = shlex.split(arguments.launcher)
+    levels = []
+    for level in range(arguments.levels):
+        elements = LevelElementsGet(arguments.elements,level)
+        print('Running '+InterpolationNameGet(interpolationType)+' level {0:d} ('.format(level)+
+              'x'.join(str(count) for count in elements)+') ...')
+        report = CaseRun(elements,interpolationType,extraArguments,launcher,timeout=arguments.timeout,
+                         outputRead=lambda workingDirectory: SolutionRead(workingDirectory,arguments.number_of_regions))
+        levels.append((elements,report))
+    return levels
+
+# Tabulate the errors and orders of the levels of one interpolation type
+def LevelsCompare(interpolationType,levels,arguments):
+    finestElements,finestReport = levels[-1]
+    finestNodes = LatticeNodesGet(finestElements,interpolationType)
+    rows = []
+    for level,(elements,report) in enumerate(levels):
+        latticeNodes = LatticeNodesGet(elements,interpolationType)
+        errors = []
+        for regionIdx,values in enumerate(report['output']):
+            if (arguments.reference == 'linear'):
+                referenceValues = LinearSolutionCalculate(latticeNodes,regionIdx,arguments.number_of_regions)
+            elif (level < len(levels)-1):
+                refinedNodes = RefinedNodesGet(latticeNodes,2**(len(levels)-1-level))
+                referenceValues = finestReport['output'][regionIdx][refinedNodes-1]
+            else:
+                continue
+            errors.append(ErrorNormsCalculate(values,referenceValues))
+        interfaceJumps = report['metadata'].get('interfaceJumps') or []
+        row = { 'interpolationType' : InterpolationNameGet(interpolationType),
+                'level' : level,
+                'elements' : 'x'.join(str(count) for count in elements) }
+        row.update(ReportSummarise(report))
+        row['solutionErrorMax'] = max(error['max'] for error in errors) if errors else None
+        row['solutionErrorRms'] = math.sqrt(sum(error['rms']**2 for error in errors)/len(errors)) if errors else None
+        row['interfaceJumpMax'] = max(jump['max'] for jump in interfaceJumps if jump['max'] is not None) \
+                                  if any(jump['max'] is not None for jump in interfaceJumps) else None
+        rows.append(row)
+    for name in ['solutionErrorMax','solutionErrorRms','interfaceJumpMax']:
+        for row,order in zip(rows,ObservedOrdersCalculate([row[name] for row in rows])):
+            row[name+'Order'] = order
+    return rows
+
+# The cheapest level, by setup and solve time, whose rms solution error is within the target
+def CheapestRowGet(rows,targetError):
+    candidates = [row for row in rows if row['solutionErrorRms'] is not None and row['solutionErrorRms'] <= targetError]
+    if not candidates:
+        return None
+    return min(candidates,key=lambda row: row['setupTime']+row['solveTime'])
+
+def ValueFormat(value,valueFormat='{0:>12.4e}'):
+    if value is None:
+        return '{0:>12s}'.format('-')
+    return valueFormat.format(value)
+
+def StudyPrint(rows):
+    print('{0:<20s} {1:>5s} {2:<12s} {3:>10s} {4:>12s} {5:>12s} {6:>12s} {7:>12s} {8:>12s} {9:>12s} {10:>12s}'. \
+          format('interpolation','level','elements','dofs','setup time','solve time','peak rss','error rms','order',
+                 'jump max','order'))
+    for row in rows:
+        print('{0:<20s} {1:>5d} {2:<12s} {3:>10d} '.format(row['interpolationType'],row['level'],row['elements'],
+                                                            int(row['numberOfDofs'] or 0))+
+              ' '.join([ValueFormat(row['setupTime'],'{0:>12.4f}'),ValueFormat(row['solveTime'],'{0:>12.4f}'),
+                        ValueFormat(row['peakRss'],'{0:>12.0f}'),ValueFormat(row['solutionErrorRms']),
+                        ValueFormat(row['solutionErrorRmsOrder'],'{0:>12.2f}'),ValueFormat(row['interfaceJumpMax']),
+                        ValueFormat(row['interfaceJumpMaxOrder'],'{0:>12.2f}')]))
+
+def ArgumentParserCreate():
+    parser = argparse.ArgumentParser(description='Mesh refinement study of the coupled Laplace example.')
+    parser.add_argument('--elements',type=ElementsParse,default=ElementsParse('2x2x0'),
+                        help='Element counts of the coarsest level as XxYxZ (Z = 0 for 2D).')
+    parser.add_argument('--levels',type=int,default=4,help='Number of levels, each doubling the element counts.')
+    parser.add_argument('--interpolation-types',nargs='+',type=int,default=[LINEAR_LAGRANGE],
+                        choices=sorted(INTERPOLATION_TYPES),help='Interpolation types to refine.')
+    parser.add_argument('--reference',choices=['finest','linear'],default='finest',
+                        help='Compare against the finest level or the linear solution of fixed x faces.')
+    parser.add_argument('--number-of-regions',type=int,default=2,help='Number of regions in the strip.')
+    parser.add_argument('--target-error',type=float,help='Report the cheapest level within this rms solution error.')
+    parser.add_argument('--options',default='',help='Extra options passed to the example.')
+    parser.add_argument('--launcher',default='',help='Command used to launch each case, e.g. "mpiexec -n 4".')
+    parser.add_argument('--output',default='refinement.csv',help='CSV file to write the results to.')
+    parser.add_argument('--timeout',type=float,help='Timeout in seconds for each run.')
+    return parser
+
+if __name__ == '__main__':
+    arguments = ArgumentParserCreate().parse_args()
+    if (arguments.levels < 2 and arguments.reference == 'finest'):
+        sys.exit('Error: At least two levels are needed to compare against the finest level.')
+    rows = []
+    for interpolationType in arguments.interpolation_types:
+        rows += LevelsCompare(interpolationType,LevelsRun(interpolationType,arguments),arguments)
+    CsvWrite(arguments.output,rows)
+    print(' ')
+    StudyPrint(rows)
+    print(' ')
+    print('Results written to '+arguments.output)
+    if arguments.target_error is not None:
+        cheapestRow = CheapestRowGet(rows,arguments.target_error)
+        if cheapestRow is None:
+            print('No level is within an rms error of {0:e}'.format(arguments.target_error))
+        else:
+            print('Cheapest within an rms error of {0:e}: {1:s} {2:s} ({3:d} DOFs, {4:.4f} s)'. \
+                  format(arguments.target_error,cheapestRow['interpolationType'],cheapestRow['elements'],
+                         int(cheapestRow['numberOfDofs'] or 0),cheapestRow['setupTime']+cheapestRow['solveTime']))
+    sys.exit(0)
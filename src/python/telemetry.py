@@ -0,0 +1,354 @@
+#> Structured telemetry of the solves of the coupled Laplace example.
+#>
+#> Every solve of a problem wrapped in a SolveTelemetry emits one record, a JSON object on a line of its own, to a
+#> telemetry sink: a JSON lines file the records are appended to or a socket a collector listens on (tcp://host:port,
+#> udp://host:port or unix:///path). A record holds the rows and structural nonzeros of each block of the solved system,
+#> the wall time of the solve on every rank and the imbalance between the ranks, whether the factorisation (or the
+#> preconditioner) was computed or reused, the PETSc view of the solver with the MUMPS memory and flop statistics of a
+#> direct solve, and the iterations and residual norms of an iterative solve.
+#>
+#> PETSc only times the factorisation and the triangular solves inside a solve in its -log_view summary at the end of a
+#> run, so the factorisation time is split off between solves instead: the solves that reuse the factorisation of an
+#> earlier solve (the boundary cases and the Dirichlet-Neumann iterations) are only the triangular solves, and the
+#> aggregator takes the difference of the median factorising and reusing solve times as the factorisation time.
+#>
+#> Run as a script it is that aggregator. It summarises the records of any number of runs, from JSON lines files or
+#> collected from a socket, into the throughput and the latency percentiles of the solves.
+#>
+#> Usage: python telemetry.py [telemetry.jsonl ...] [--listen tcp://127.0.0.1:5170 [--output collected.jsonl]]
+#>                            [--by linearSolverType rows]
+#>
+
+import argparse,json,os,socket,socketserver,statistics,sys,threading,time
+import numpy
+
+from profiling import WorldCommunicatorGet
+from petsc_options import ResidualHistoryRead,SolverViewRead
+
+TELEMETRY_SCHEMA = 1
+
+# Latency percentiles of the aggregator
+LATENCY_PERCENTILES = [50,90,99]
+
+#================================================================================================================================
+#  Sinks
+#================================================================================================================================
+
+# Split a telemetry destination into its scheme (file/tcp/udp/unix) and address. Raises ValueError if it is malformed.
+def TelemetryDestinationParse(destination):
+    scheme,separator,address = destination.partition('://')
+    if not separator:
+        return 'file',destination
+    if scheme in ['tcp','udp']:
+        host,separator,port = address.rpartition(':')
+        if not separator or not port.isdigit():
+            raise ValueError('The telemetry destination ' + destination + ' should be ' + scheme + '://host:port.')
+        return scheme,(host or '127.0.0.1',int(port))
+    if scheme == 'unix':
+        return scheme,address
+    raise ValueError('Unknown telemetry destination scheme ' + scheme + '. The scheme should be tcp, udp or unix.')
+
+class TelemetrySink(object):
+    """A JSON lines file or a socket the telemetry records are written to. A record that cannot be sent to a socket is
+    dropped with a warning rather than failing the solve it reports on."""
+
+    def __init__(self,destination):
+        self.destination = destination
+        self.scheme,self.address = TelemetryDestinationParse(destination)
+        self.numberOfDroppedRecords = 0
+        self.file = None
+        self.socket = None
+        try:
+            if (self.scheme == 'file'):
+                self.file = open(self.address,'a')
+            elif (self.scheme == 'tcp'):
+                self.socket = socket.create_connection(self.address)
+            elif (self.scheme == 'udp'):
+                self.socket = socket.socket(socket.AF_INET,socket.SOCK_DGRAM)
+                self.socket.connect(self.address)
+            else:
+                self.socket = socket.socket(socket.AF_UNIX,socket.SOCK_STREAM)
+                self.socket.connect(self.address)
+        except OSError as error:
+            raise RuntimeError('Cannot open the telemetry destination ' + destination + ': ' + str(error))
+
+    def Write(self,record):
+        line = json.dumps(record)+'\n'
+        if self.file is not None:
+            self.file.write(line)
+            self.file.flush()
+            return
+        try:
+            self.socket.sendall(line.encode())
+        except OSError as error:
+            if (self.numberOfDroppedRecords == 0):
+                print('WARNING: Dropping the telemetry records sent to ' + self.destination + ': ' + str(error))
+            self.numberOfDroppedRecords += 1
+
+    def Close(self):
+        if self.file is not None:
+            self.file.close()
+        if self.socket is not None:
+            self.socket.close()
+        self.file = None
+        self.socket = None
+
+#================================================================================================================================
+#  Blocks
+#================================================================================================================================
+
+# Structural nonzeros of the stiffness matrix of a mesh: every pair of nodes of an element couples all their derivatives.
+# elementNodes is the (elements, element nodes) array of the node numbers of each element.
+def MeshNonzerosCalculate(elementNodes,numberOfNodeDerivatives):
+    elementNodes = numpy.asarray(elementNodes,dtype=numpy.int64)
+    numberOfNodes = int(elementNodes.max())+1
+    pairs = elementNodes[:,:,None]*numberOfNodes+elementNodes[:,None,:]
+    return int(numpy.unique(pairs).size)*numberOfNodeDerivatives**2
+
+# Structural nonzeros of the coupling of an interface mesh to a coupled mesh: every node of an interface element couples
+# to every node of the element it is mapped to. The element numbers are those of the interface connectivity.
+def CouplingNonzerosCalculate(interfaceElementNodes,interfaceElementNumbers,coupledElementNodes,coupledElementNumbers,
+                              numberOfInterfaceNodeDerivatives,numberOfCoupledNodeDerivatives):
+    rowNodes = numpy.asarray(interfaceElementNodes,dtype=numpy.int64)[numpy.asarray(interfaceElementNumbers)-1]
+    columnNodes = numpy.asarray(coupledElementNodes,dtype=numpy.int64)[numpy.asarray(coupledElementNumbers)-1]
+    numberOfColumns = int(columnNodes.max())+1
+    pairs = rowNodes[:,:,None]*numberOfColumns+columnNodes[:,None,:]
+    return int(numpy.unique(pairs).size)*numberOfInterfaceNodeDerivatives*numberOfCoupledNodeDerivatives
+
+#================================================================================================================================
+#  Solves
+#================================================================================================================================
+
+# The wall times of a solve on all the ranks, on rank 0. Returns None on the other ranks, or on every rank of a run on
+# more than one rank without mpi4py.
+def RankWallTimesGather(wallTime,numberOfComputationalNodes):
+    if (numberOfComputationalNodes == 1):
+        return [wallTime]
+    communicator = WorldCommunicatorGet()
+    if communicator is None:
+        return None
+    return communicator.gather(wallTime,root=0)
+
+class SolveTelemetry(object):
+    """A problem whose solves emit telemetry records. Solve solves the wrapped problem, gathers its wall time from every
+    rank and has rank 0 write a record of it to the sink, which is None on the other ranks; anything else is passed
+    through to the problem. record holds the fields common to all the solves, such as the blocks of the system. The
+    solver view and the residual history are read from the files PETSc writes them to, if they are given."""
+
+    def __init__(self,problem,sink,record,computationalNodeNumber,numberOfComputationalNodes,preconditionerReuse=False,
+                 solverViewFilename=None,residualHistoryFilename=None):
+        self.problem = problem
+        self.sink = sink
+        self.record = record
+        self.computationalNodeNumber = computationalNodeNumber
+        self.numberOfComputationalNodes = numberOfComputationalNodes
+        self.preconditionerReuse = preconditionerReuse
+        self.solverViewFilename = solverViewFilename
+        self.residualHistoryFilename = residualHistoryFilename
+        self.numberOfSolves = 0
+
+    def __getattr__(self,name):
+        return getattr(self.problem,name)
+
+    def Solve(self):
+        start = time.perf_counter()
+        self.problem.Solve()
+        wallTime = time.perf_counter()-start
+        rankWallTimes = RankWallTimesGather(wallTime,self.numberOfComputationalNodes)
+        self.numberOfSolves += 1
+        if (self.computationalNodeNumber == 0):
+            self.sink.Write(self.RecordGet(wallTime,rankWallTimes))
+
+    def RecordGet(self,wallTime,rankWallTimes):
+        record = { 'schema' : TELEMETRY_SCHEMA,
+                   'time' : time.time(),
+                   'host' : socket.gethostname(),
+                   'solve' : self.numberOfSolves }
+        record.update(self.record)
+        # The slowest rank sets the time of the solve
+        record['wallTime'] = max(rankWallTimes) if rankWallTimes else wallTime
+        record['rankWallTimes'] = rankWallTimes
+        record['rankImbalance'] = max(rankWallTimes)/statistics.mean(rankWallTimes) \
+                                  if rankWallTimes and statistics.mean(rankWallTimes) > 0.0 else None
+        record['factorised'] = not (self.preconditionerReuse and self.numberOfSolves > 1)
+        if self.solverViewFilename is not None:
+            record['solverView'] = SolverViewRead(self.solverViewFilename)
+        if self.residualHistoryFilename is not None:
+            residualHistory = ResidualHistoryRead(self.residualHistoryFilename)
+            record['iterations'] = len(residualHistory)-1 if residualHistory else None
+            record['residualHistory'] = residualHistory
+        return record
+
+#================================================================================================================================
+#  Aggregator
+#================================================================================================================================
+
+# The records of JSON lines files of telemetry, skipping blank lines
+def TelemetryRecordsRead(filenames):
+    for filename in filenames:
+        with (sys.stdin if filename == '-' else open(filename)) as telemetryFile:
+            for lineNumber,line in enumerate(telemetryFile,1):
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if not isinstance(record,dict):
+                    raise ValueError('Line {0:d} of {1:s} is not a JSON object.'.format(lineNumber,filename))
+                yield record
+
+# Collect the records sent to a tcp, udp or unix socket address into a JSON lines file until interrupted. Returns the
+# number of records collected.
+def TelemetryCollect(destination,outputFile):
+    scheme,address = TelemetryDestinationParse(destination)
+    lock = threading.Lock()
+    numberOfRecords = [0]
+
+    # The records of several connections are written a line at a time so they interleave whole
+    def LineWrite(line):
+        if not line.strip():
+            return
+        with lock:
+            outputFile.write(line.decode().rstrip('\n')+'\n')
+            outputFile.flush()
+            numberOfRecords[0] += 1
+
+    class StreamHandler(socketserver.StreamRequestHandler):
+        def handle(self):
+            for line in self.rfile:
+                LineWrite(line)
+
+    class DatagramHandler(socketserver.BaseRequestHandler):
+        def handle(self):
+            for line in self.request[0].splitlines():
+                LineWrite(line)
+
+    if (scheme == 'tcp'):
+        server = socketserver.ThreadingTCPServer(address,StreamHandler)
+    elif (scheme == 'udp'):
+        server = socketserver.UDPServer(address,DatagramHandler)
+    elif (scheme == 'unix'):
+        server = socketserver.ThreadingUnixStreamServer(address,StreamHandler)
+    else:
+        raise ValueError('The telemetry collector listens on a tcp, udp or unix socket, not a file.')
+    server.daemon_threads = True
+    print('Collecting telemetry on ' + destination + ' (Ctrl-C to stop) ...',file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if (scheme == 'unix' and os.path.exists(address)):
+            os.remove(address)
+    return numberOfRecords[0]
+
+# Nearest rank percentile of sorted values
+def PercentileGet(sortedValues,percentile):
+    return sortedValues[min(len(sortedValues)-1,int(percentile/100.0*len(sortedValues)))]
+
+def LatenciesSummarise(wallTimes):
+    sortedWallTimes = sorted(wallTimes)
+    summary = { 'p{0:d}'.format(percentile) : PercentileGet(sortedWallTimes,percentile) \
+                for percentile in LATENCY_PERCENTILES }
+    summary['max'] = sortedWallTimes[-1]
+    return summary
+
+# Summarise the records of a group of solves: the number of solves and runs, the throughput over the time the solves
+# span and over the time spent solving, the latency percentiles of all, the factorising and the reusing solves, the rank
+# imbalance, the iterations and the MUMPS memory
+def TelemetrySummarise(records):
+    wallTimes = [record['wallTime'] for record in records]
+    starts = [record['time']-record['wallTime'] for record in records]
+    ends = [record['time'] for record in records]
+    span = max(ends)-min(starts)
+    solveTime = sum(wallTimes)
+    summary = { 'numberOfSolves' : len(records),
+                'numberOfRuns' : len(set(record.get('run') for record in records)),
+                'solvesPerSecond' : len(records)/span if span > 0.0 else None,
+                'solvesPerSolveSecond' : len(records)/solveTime if solveTime > 0.0 else None,
+                'latency' : LatenciesSummarise(wallTimes) }
+    for name,factorised in [('factorisingLatency',True),('reusingLatency',False)]:
+        groupWallTimes = [record['wallTime'] for record in records if record.get('factorised',True) == factorised]
+        summary[name] = LatenciesSummarise(groupWallTimes) if groupWallTimes else None
+    if summary['factorisingLatency'] is not None and summary['reusingLatency'] is not None:
+        summary['factorisationTime'] = summary['factorisingLatency']['p50']-summary['reusingLatency']['p50']
+    rankImbalances = [record['rankImbalance'] for record in records if record.get('rankImbalance') is not None]
+    if rankImbalances:
+        summary['rankImbalance'] = { 'median' : statistics.median(rankImbalances), 'max' : max(rankImbalances) }
+    iterations = [record['iterations'] for record in records if record.get('iterations') is not None]
+    if iterations:
+        summary['iterations'] = { 'median' : statistics.median(iterations), 'max' : max(iterations) }
+    mumpsMemories = [record['solverView']['mumps']['estimatedMemoryTotal'] for record in records \
+                     if 'estimatedMemoryTotal' in record.get('solverView',{}).get('mumps',{})]
+    if mumpsMemories:
+        summary['mumpsEstimatedMemoryTotal'] = max(mumpsMemories)
+    return summary
+
+# Summarise the records grouped by the values of some of their fields
+def TelemetryGroupsSummarise(records,groupKeys=None):
+    groupKeys = list(groupKeys or [])
+    groups = {}
+    for record in records:
+        groups.setdefault(tuple(json.dumps(record.get(key)) for key in groupKeys),[]).append(record)
+    summaries = []
+    for groupValues,groupRecords in sorted(groups.items()):
+        summary = { key : json.loads(value) for key,value in zip(groupKeys,groupValues) }
+        summary.update(TelemetrySummarise(groupRecords))
+        summaries.append(summary)
+    return summaries
+
+def TelemetrySummaryPrint(summaries,groupKeys=None):
+    groupKeys = list(groupKeys or [])
+    for summary in summaries:
+        if groupKeys:
+            print(', '.join('{0:s} = {1:s}'.format(key,json.dumps(summary[key])) for key in groupKeys))
+        print('  Solves = {0:d} in {1:d} runs'.format(summary['numberOfSolves'],summary['numberOfRuns']))
+        if summary['solvesPerSecond'] is not None:
+            print('  Solves per second = {0:.4f} ({1:.4f} per second of solving)'.format(summary['solvesPerSecond'],
+                                                                           summary['solvesPerSolveSecond']))
+        for name,label in [('latency','all'),('factorisingLatency','factorising'),('reusingLatency','reusing')]:
+            if summary[name] is None:
+                continue
+            print('  Latency ({0:s}): '.format(label)+', '.join('{0:s} = {1:.4f}'.format(key,value) \
+                                                                 for key,value in summary[name].items()))
+        if 'factorisationTime' in summary:
+            print('  Factorisation time = {0:.4f}'.format(summary['factorisationTime']))
+        if 'rankImbalance' in summary:
+            print('  Rank imbalance: median = {median:.3f}, max = {max:.3f}'.format(**summary['rankImbalance']))
+        if 'iterations' in summary:
+            print('  Iterations: median = {median}, max = {max}'.format(**summary['iterations']))
+        if 'mumpsEstimatedMemoryTotal' in summary:
+            print('  MUMPS estimated memory = {0:.0f} MB'.format(summary['mumpsEstimatedMemoryTotal']))
+
+#================================================================================================================================
+#  Telemetry aggregator
+#================================================================================================================================
+
+def ArgumentParserCreate():
+    parser = argparse.ArgumentParser(description='Summarise the solve telemetry of coupled Laplace runs.')
+    parser.add_argument('files',nargs='*',help='JSON lines files of telemetry records (- for stdin).')
+    parser.add_argument('--listen',help='Collect the records sent to a tcp://host:port, udp://host:port or unix:///path '
+                                        'address until interrupted, then summarise them.')
+    parser.add_argument('--output',default='telemetry.jsonl',help='JSON lines file the collected records are appended to.')
+    parser.add_argument('--by',nargs='+',default=[],help='Record fields to group the summaries by, e.g. linearSolverType rows.')
+    parser.add_argument('--json',action='store_true',help='Write the summaries as JSON instead of a report.')
+    return parser
+
+if __name__ == '__main__':
+    arguments = ArgumentParserCreate().parse_args()
+    filenames = list(arguments.files)
+    if arguments.listen:
+        with open(arguments.output,'a') as outputFile:
+            numberOfRecords = TelemetryCollect(arguments.listen,outputFile)
+        print('Collected {0:d} records into {1:s}'.format(numberOfRecords,arguments.output),file=sys.stderr)
+        filenames.append(arguments.output)
+    if not filenames:
+        sys.exit('Error: No telemetry files given to summarise.')
+    records = list(TelemetryRecordsRead(filenames))
+    if not records:
+        sys.exit('Error: No telemetry records in '+', '.join(filenames)+'.')
+    summaries = TelemetryGroupsSummarise(records,arguments.by)
+    if arguments.json:
+        print(json.dumps(summaries,indent=2))
+    else:
+        TelemetrySummaryPrint(summaries,arguments.by)
+    sys.exit(0)
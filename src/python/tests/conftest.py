@@ -0,0 +1,4 @@
+# The modules of the example are run as scripts from src/python rather than installed, so put them on the path
+import os,sys
+
+sys.path.insert(0,os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,73 @@
+#> Tests of the geometric interface connectivity detection against the connectivity of the generated meshes.
+#>
+
+import numpy
+import pytest
+
+import interface_detection
+from interface_connectivity import GeneratedInterfaceConnectivityCalculate
+from interface_detection import GeneratedMeshArraysCalculate,InterfaceConnectivityDetect,NearestPointsFind
+
+# The meshes either side of the interface and the interface mesh of the example for the element counts, with the
+# first mesh from x = 0 to width and the second from width to 2*width
+def GeneratedMeshesCalculate(numberOfElements,numberOfNodesXi,width=2.0,extent=(1.0,3.0)):
+    numberOfDimensions = len(numberOfElements)
+    meshExtent = [width]+list(extent[:numberOfDimensions-1])
+    mesh1 = GeneratedMeshArraysCalculate([0.0]*numberOfDimensions,meshExtent,numberOfElements,numberOfNodesXi)
+    mesh2 = GeneratedMeshArraysCalculate([width]+[0.0]*(numberOfDimensions-1),meshExtent,numberOfElements,numberOfNodesXi)
+    interfaceMesh = GeneratedMeshArraysCalculate([width]+[0.0]*(numberOfDimensions-1),[0.0]+meshExtent[1:],
+                                                 numberOfElements[1:],numberOfNodesXi)
+    return (mesh1,mesh2,interfaceMesh)
+
+# Check the detected connectivity of the interface to both meshes against the connectivity of the generated meshes
+def ConnectivityCompare(numberOfElements,numberOfNodesXi):
+    mesh1,mesh2,interfaceMesh = GeneratedMeshesCalculate(numberOfElements,numberOfNodesXi)
+    interfaceElementNumbers,mesh1ElementNumbers,mesh1Xi,mesh2ElementNumbers,mesh2Xi = \
+        GeneratedInterfaceConnectivityCalculate(numberOfElements,numberOfNodesXi)
+    for mesh,elementNumbers,xi in [(mesh1,mesh1ElementNumbers,mesh1Xi),(mesh2,mesh2ElementNumbers,mesh2Xi)]:
+        detectedInterfaceElementNumbers,detectedElementNumbers,detectedXi = InterfaceConnectivityDetect(interfaceMesh,mesh)
+        numpy.testing.assert_array_equal(detectedInterfaceElementNumbers,interfaceElementNumbers)
+        numpy.testing.assert_array_equal(detectedElementNumbers,elementNumbers)
+        numpy.testing.assert_allclose(detectedXi,xi,atol=1.0e-12)
+
+@pytest.mark.parametrize('numberOfNodesXi',[2,3])
+def test_detect_matches_generated_2d(numberOfNodesXi):
+    ConnectivityCompare((3,2),numberOfNodesXi)
+
+@pytest.mark.parametrize('numberOfElements',[(2,3,2),(2,2,3),(2,2,2)])
+@pytest.mark.parametrize('numberOfNodesXi',[2,3,4])
+def test_detect_matches_generated_3d(numberOfElements,numberOfNodesXi):
+    ConnectivityCompare(numberOfElements,numberOfNodesXi)
+
+# The spatial hash used without SciPy has to find the same connectivity as the k-d tree
+@pytest.mark.parametrize('numberOfElements',[(3,2),(2,3,2)])
+def test_detect_spatial_hash(monkeypatch,numberOfElements):
+    monkeypatch.setattr(interface_detection,'cKDTree',None)
+    ConnectivityCompare(numberOfElements,2)
+
+def test_nearest_points_spatial_hash(monkeypatch):
+    monkeypatch.setattr(interface_detection,'cKDTree',None)
+    candidates = numpy.array([[0.0,0.0],[1.0,0.0],[1.0,1.0],[2.5,2.5]])
+    queries = numpy.array([[1.0,1.0e-4],[0.95,1.0],[2.5,2.4],[0.5,0.5]])
+    numpy.testing.assert_array_equal(NearestPointsFind(candidates,queries,0.2),[1,2,3,-1])
+
+def test_nearest_points_spatial_hash_matches_kd_tree(monkeypatch):
+    pytest.importorskip('scipy')
+    randomState = numpy.random.RandomState(0)
+    candidates = randomState.uniform(size=(200,3))
+    queries = candidates[randomState.permutation(200)[:50]]+randomState.uniform(-1.0e-3,1.0e-3,size=(50,3))
+    nearest = NearestPointsFind(candidates,queries,0.01)
+    monkeypatch.setattr(interface_detection,'cKDTree',None)
+    numpy.testing.assert_array_equal(NearestPointsFind(candidates,queries,0.01),nearest)
+
+# An interface away from the face between the meshes does not coincide with the faces of either mesh
+def test_detect_interface_not_coincident():
+    mesh1,mesh2,interfaceMesh = GeneratedMeshesCalculate((3,2),2)
+    interfaceMesh.nodeCoordinates[:,0] += 0.25
+    with pytest.raises(ValueError,match='do not coincide with a face of the coupled mesh'):
+        InterfaceConnectivityDetect(interfaceMesh,mesh1)
+
+def test_detect_interface_dimension_mismatch():
+    mesh1,mesh2,interfaceMesh = GeneratedMeshesCalculate((2,2,2),2)
+    with pytest.raises(ValueError,match='cannot be coupled'):
+        InterfaceConnectivityDetect(mesh1,mesh2)
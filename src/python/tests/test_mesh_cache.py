@@ -0,0 +1,109 @@
+#> Tests of the least recently used eviction and the entry checks of the mesh cache.
+#>
+
+import os
+import numpy
+
+import mesh_cache
+from mesh_cache import MeshCache,CacheKeyCalculate
+
+# Store an entry of one array of numberOfValues float64 values and date its last use to usedTime
+def EntryStore(cache,key,numberOfValues,usedTime):
+    cache.Store(key,{ 'values' : numpy.zeros(numberOfValues) })
+    os.utime(cache.EntryFilenameGet(key),(usedTime,usedTime))
+    return os.path.getsize(cache.EntryFilenameGet(key))
+
+def EntryKeysGet(cache):
+    return sorted(os.path.splitext(filename)[0] for filename in os.listdir(cache.directory) if filename.endswith('.npz'))
+
+def test_cache_key():
+    assert CacheKeyCalculate({ 'a' : 1, 'b' : [1,2] }) == CacheKeyCalculate({ 'b' : [1,2], 'a' : 1 })
+    assert CacheKeyCalculate({ 'a' : 1 }) != CacheKeyCalculate({ 'a' : 2 })
+
+def test_store_load(tmp_path):
+    cache = MeshCache(str(tmp_path))
+    cache.Store('entry',{ 'elementDomains' : numpy.arange(4), 'xi' : numpy.ones((2,3)) })
+    arrays = cache.Load('entry',['elementDomains','xi'])
+    numpy.testing.assert_array_equal(arrays['elementDomains'],numpy.arange(4))
+    numpy.testing.assert_array_equal(arrays['xi'],numpy.ones((2,3)))
+    assert cache.Load('missing') is None
+
+# The least recently used entries go first until the cache is within its size, whatever order they were stored in
+def test_evict_least_recently_used(tmp_path):
+    cache = MeshCache(str(tmp_path),maximumBytes=10**9)
+    entryBytes = EntryStore(cache,'a',1000,100.0)
+    EntryStore(cache,'b',1000,300.0)
+    EntryStore(cache,'c',1000,200.0)
+    cache.maximumBytes = 2*entryBytes
+    cache.Evict()
+    assert EntryKeysGet(cache) == ['b','c']
+    cache.maximumBytes = entryBytes
+    cache.Evict()
+    assert EntryKeysGet(cache) == ['b']
+
+# Loading an entry marks it as recently used so it outlives entries stored after it
+def test_load_marks_used(tmp_path):
+    cache = MeshCache(str(tmp_path),maximumBytes=10**9)
+    entryBytes = EntryStore(cache,'a',1000,100.0)
+    EntryStore(cache,'b',1000,200.0)
+    assert cache.Load('a') is not None
+    cache.maximumBytes = entryBytes
+    cache.Evict()
+    assert EntryKeysGet(cache) == ['a']
+
+# The kept entry survives the eviction even if it is the least recently used and bigger than the cache on its own
+def test_evict_keep(tmp_path):
+    cache = MeshCache(str(tmp_path),maximumBytes=10**9)
+    EntryStore(cache,'a',1000,100.0)
+    EntryStore(cache,'b',1000,200.0)
+    EntryStore(cache,'c',1000,300.0)
+    cache.maximumBytes = 1000
+    cache.Evict(keep='a')
+    assert EntryKeysGet(cache) == ['a']
+
+# The entry just stored is kept even if it is bigger than the cache on its own
+def test_store_keeps_new_entry(tmp_path):
+    cache = MeshCache(str(tmp_path),maximumBytes=10**9)
+    EntryStore(cache,'a',1000,100.0)
+    EntryStore(cache,'b',1000,200.0)
+    cache.maximumBytes = 1000
+    cache.Store('c',{ 'values' : numpy.zeros(1000) })
+    assert EntryKeysGet(cache) == ['c']
+    assert cache.Load('c') is not None
+
+# Corrupt, empty and incomplete entries are misses and are removed
+def test_load_bad_entries(tmp_path):
+    cache = MeshCache(str(tmp_path))
+    for key,contents in [('corrupt',b'PK\x03\x04garbage'),('empty',b''),('text',b'not an npz file')]:
+        with open(cache.EntryFilenameGet(key),'wb') as entryFile:
+            entryFile.write(contents)
+        assert cache.Load(key) is None
+        assert not os.path.exists(cache.EntryFilenameGet(key))
+    cache.Store('incomplete',{ 'elementDomains' : numpy.arange(4) })
+    assert cache.Load('incomplete',['elementDomains','xi']) is None
+    assert not os.path.exists(cache.EntryFilenameGet('incomplete'))
+
+# A stand in for an mpi4py communicator on one of several ranks whose broadcast returns what rank 0 sent
+class BroadcastCommunicator(object):
+
+    def __init__(self,rootValue):
+        self.rootValue = rootValue
+
+    def bcast(self,value,root=0):
+        return self.rootValue
+
+# The other ranks take the entry rank 0 loaded even if their own view of the cache differs
+def test_shared_load(tmp_path,monkeypatch):
+    cache = MeshCache(str(tmp_path))
+    cache.Store('entry',{ 'xi' : numpy.ones(3) })
+    rootArrays = cache.Load('entry',['xi'])
+    monkeypatch.setattr(mesh_cache,'WorldCommunicatorGet',lambda: BroadcastCommunicator(rootArrays))
+    cache.Remove('entry')
+    numpy.testing.assert_array_equal(cache.SharedLoad('entry',['xi'],1,2)['xi'],numpy.ones(3))
+    monkeypatch.setattr(mesh_cache,'WorldCommunicatorGet',lambda: BroadcastCommunicator(None))
+    cache.Store('entry',{ 'xi' : numpy.ones(3) })
+    assert cache.SharedLoad('entry',['xi'],1,2) is None
+    # Without mpi4py the ranks cannot agree on an entry so they all miss
+    monkeypatch.setattr(mesh_cache,'WorldCommunicatorGet',lambda: None)
+    assert cache.SharedLoad('entry',['xi'],0,2) is None
+    assert cache.SharedLoad('entry',['xi'],0,1) is not None
@@ -0,0 +1,58 @@
+#> Tests of the strip placement of the regions onto the ranks and of its communication volume.
+#>
+
+import numpy
+
+from interface_connectivity import GeneratedInterfaceConnectivityCalculate
+from interface_detection import GeneratedMeshArraysCalculate
+from placement import RegionRanksCalculate,SlabElementDomainsCalculate,StripElementDomainsCalculate, \
+    CommunicationVolumeCalculate
+
+def test_region_ranks():
+    assert [ranks.tolist() for ranks in RegionRanksCalculate(2,4)] == [[0,1],[2,3]]
+    assert [ranks.tolist() for ranks in RegionRanksCalculate(3,4)] == [[0],[1],[2,3]]
+    assert [ranks.tolist() for ranks in RegionRanksCalculate(4,2)] == [[0],[0],[1],[1]]
+
+def test_slab_split():
+    numpy.testing.assert_array_equal(SlabElementDomainsCalculate((4,2),numpy.array([3,4])),[3,3,4,4,3,3,4,4])
+    numpy.testing.assert_array_equal(SlabElementDomainsCalculate((3,1,2),numpy.array([0,1,2])),[0,1,2,0,1,2])
+
+# With more ranks than x elements every rank still gets elements, split in x order
+def test_slab_split_more_ranks_than_x_elements():
+    elementDomains = SlabElementDomainsCalculate((2,2),numpy.arange(4))
+    assert sorted(elementDomains.tolist()) == [0,1,2,3]
+    # The elements of the first column (1 and 3) come before those of the second (2 and 4)
+    assert max(elementDomains[[0,2]]) < min(elementDomains[[1,3]])
+    elementDomains = SlabElementDomainsCalculate((2,3),numpy.arange(3))
+    numpy.testing.assert_array_equal(numpy.bincount(elementDomains),[2,2,2])
+
+# The interface elements go to the ranks of the region elements before them
+def test_strip_interface_with_region_before():
+    numberOfGlobalElements = (2,2)
+    interfaceElementNumbers,mesh1ElementNumbers,mesh1Xi,mesh2ElementNumbers,mesh2Xi = \
+        GeneratedInterfaceConnectivityCalculate(numberOfGlobalElements,2)
+    regionElementDomains,interfaceElementDomains = \
+        StripElementDomainsCalculate(2,numberOfGlobalElements,4,[(interfaceElementNumbers,mesh1ElementNumbers)])
+    numpy.testing.assert_array_equal(regionElementDomains[0],[0,1,0,1])
+    numpy.testing.assert_array_equal(regionElementDomains[1],[2,3,2,3])
+    numpy.testing.assert_array_equal(interfaceElementDomains[0],[1,1])
+
+# A 2x2 mesh split into two slabs, with the middle column of nodes owned by rank 0, has rank 1 receive those 3 nodes.
+# The interface to a second mesh on rank 1 is on rank 0 with the first mesh so its couplings to the second are remote.
+def test_communication_volume():
+    mesh = GeneratedMeshArraysCalculate([0.0,0.0],[1.0,1.0],[2,2],2)
+    elementDomains = numpy.array([0,1,0,1])
+    nodeDomains = numpy.array([0,0,1,0,0,1,0,0,1])
+    interfaceElementNumbers,mesh1ElementNumbers,mesh1Xi,mesh2ElementNumbers,mesh2Xi = \
+        GeneratedInterfaceConnectivityCalculate((2,2),2)
+    interfaceElementDomains = numpy.array([0,0])
+    volumes = CommunicationVolumeCalculate([(mesh.elementNodes,elementDomains,nodeDomains)],
+                                           [(interfaceElementNumbers,mesh1ElementNumbers,interfaceElementDomains,
+                                             numpy.zeros(4,dtype=numpy.int64)),
+                                            (interfaceElementNumbers,mesh2ElementNumbers,interfaceElementDomains,
+                                             numpy.ones(4,dtype=numpy.int64))],2)
+    assert [volume['elements'] for volume in volumes] == [2,2]
+    assert [volume['ghostNodes'] for volume in volumes] == [0,3]
+    assert [volume['neighbourRanks'] for volume in volumes] == [0,1]
+    assert [volume['interfaceCouplings'] for volume in volumes] == [4,0]
+    assert [volume['remoteInterfaceCouplings'] for volume in volumes] == [2,0]